@@ -15,6 +15,10 @@ NEWSDATA_API_KEY = os.getenv("NEWSDATA_API_KEY")
 OPENFIGI_API_KEY = os.getenv("OPENFIGI_API_KEY")
 YFINANCE_PROXY = os.getenv("YFINANCE_PROXY")
 
+# === API Rate-Limits ===
+NEWSDATA_REQUESTS_PER_SECOND = float(os.getenv("NEWSDATA_REQUESTS_PER_SECOND", "2"))
+NEWSDATA_MAX_WORKERS = int(os.getenv("NEWSDATA_MAX_WORKERS", "8"))
+
 # === Ordnerstruktur ===
 DATA_DIR = BASE_DIR / "data"
 RAW_NEWS_DIR = DATA_DIR / "raw" / "headlines"
@@ -29,6 +33,40 @@ EMOTECT_LOGO = ASSETS_DIR / "emotect_logo.png"
 FULL_SENTIMENT_FILE = PROCESSED_DIR / "full_sentiment.csv"
 Z_SCORE_FILE = PROCESSED_DIR / "z_scores.csv"
 
+# === Processed Store (Parquet, partitioniert nach Ticker & Monat) & Wasserzeichen ===
+SENTIMENT_DATASET_DIR = PROCESSED_DIR / "sentiment"
+Z_SCORE_DATASET_DIR = PROCESSED_DIR / "z_scores"
+SENTIMENT_WATERMARK_FILE = PROCESSED_DIR / "sentiment_watermarks.json"
+DAILY_CUBE_DATASET_DIR = PROCESSED_DIR / "daily_cube"
+Z_SCORE_STATE_FILE = PROCESSED_DIR / "z_score_state.json"
+SENTIMENT_PRICE_PANEL_DIR = PROCESSED_DIR / "sentiment_price_panel"
+EVENT_STUDY_FILE = PROCESSED_DIR / "event_study.csv"
+EVENT_STUDY_CAAR_FILE = PROCESSED_DIR / "event_study_caar.csv"
+LEAD_LAG_DATASET_DIR = PROCESSED_DIR / "lead_lag"
+LEAD_LAG_SUMMARY_FILE = PROCESSED_DIR / "lead_lag_summary.csv"
+BACKTEST_RESULTS_FILE = PROCESSED_DIR / "backtest_sweep.csv"
+# Pipeline (emotect.py run): Fingerprints & Laufzeiten je Stufe, Historie aller Läufe
+PIPELINE_STATE_FILE = PROCESSED_DIR / "pipeline_state.json"
+PIPELINE_RUNS_FILE = PROCESSED_DIR / "pipeline_runs.jsonl"
+
+# === Gemeinsamer URL-Index (Dedup für Fetcher & Sentiment-Engines) ===
+URL_INDEX_FILE = DATA_DIR / "url_index.sqlite"
+
+# === Sentiment-Cache (Content-Hash → Score) ===
+SENTIMENT_CACHE_FILE = PROCESSED_DIR / "sentiment_cache.sqlite"
+SENTIMENT_CACHE_MAX_ENTRIES = 500_000
+
+# === VADER-Lexikon: offline aus data/nltk_data (NLTK-Layout) oder expliziter Pfad (.zip/.txt) ===
+NLTK_DATA_DIR = DATA_DIR / "nltk_data"
+VADER_LEXICON_PATH = os.getenv("VADER_LEXICON_PATH")
+# Scoring-Backend: "vader" (NLTK, Prozess-Pool) oder "numpy" (vektorisiert, modules/numpy_vader.py)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "vader")
+
+# === Kursdaten: Metadaten (letzter Tag & Dateigröße je Ticker) für inkrementelle Abrufe ===
+STOCK_PRICE_META_FILE = STOCK_PRICE_DIR / "_meta.json"
+# Dichte date × ticker-Kursmatrix (float32, memory-mapped) plus Index der Tage & Ticker
+PRICE_MATRIX_DIR = PROCESSED_DIR / "price_matrix"
+
 # === Analyse-Zeitraum ===
 START_DATE = datetime(2023, 1, 1)
 END_DATE = datetime.now()
@@ -37,12 +75,55 @@ END_DATE = datetime.now()
 DUMMY_HEADLINES_DIR = BASE_DIR / "data" / "raw" / "dummy_headlines"
 DUMMY_FULL_SENTIMENT_FILE = PROCESSED_DIR / "dummy_full_sentiment.csv"
 DUMMY_Z_SCORE_FILE = PROCESSED_DIR / "dummy_z_scores.csv"
+DUMMY_SENTIMENT_DATASET_DIR = PROCESSED_DIR / "dummy_sentiment"
+DUMMY_Z_SCORE_DATASET_DIR = PROCESSED_DIR / "dummy_z_scores"
+DUMMY_DAILY_CUBE_DATASET_DIR = PROCESSED_DIR / "dummy_daily_cube"
+DUMMY_Z_SCORE_STATE_FILE = PROCESSED_DIR / "dummy_z_score_state.json"
+DUMMY_SENTIMENT_PRICE_PANEL_DIR = PROCESSED_DIR / "dummy_sentiment_price_panel"
+DUMMY_EVENT_STUDY_FILE = PROCESSED_DIR / "dummy_event_study.csv"
+DUMMY_EVENT_STUDY_CAAR_FILE = PROCESSED_DIR / "dummy_event_study_caar.csv"
+DUMMY_LEAD_LAG_DATASET_DIR = PROCESSED_DIR / "dummy_lead_lag"
+DUMMY_LEAD_LAG_SUMMARY_FILE = PROCESSED_DIR / "dummy_lead_lag_summary.csv"
+DUMMY_BACKTEST_RESULTS_FILE = PROCESSED_DIR / "dummy_backtest_sweep.csv"
+DUMMY_PIPELINE_STATE_FILE = PROCESSED_DIR / "dummy_pipeline_state.json"
+DUMMY_PIPELINE_RUNS_FILE = PROCESSED_DIR / "dummy_pipeline_runs.jsonl"
+
+# === Synthetische Lasttest-Daten (dummy_modules/synthetic_data.py) ===
+SYNTHETIC_DATA_DIR = DATA_DIR / "synthetic"
+
+# === Benchmarks (tools/benchmark.py) ===
+BENCHMARK_DIR = DATA_DIR / "benchmarks"
+BENCHMARK_HISTORY_FILE = BENCHMARK_DIR / "history.jsonl"
+BENCHMARK_BASELINE_FILE = BENCHMARK_DIR / "baseline.json"
+
+# === Schlüsselwörter für Krisendruck (Volcano) und ESG-Themen (Reputation Radar) ===
+RISK_KEYWORDS = [
+    "fraud", "scandal", "layoffs", "corruption", "bribery",
+    "leak", "hack", "fine", "lawsuit", "whistleblower",
+    "investigation", "collapse", "resignation", "probe", "recession", "bad", "loss"
+]
+
+ESG_KEYWORDS = {
+    "E": ["sustainability", "emissions", "climate", "pollution", "greenwashing", "carbon"],
+    "S": ["diversity", "inclusion", "human rights", "labor", "health", "equality"],
+    "G": ["corruption", "bribery", "whistleblower", "audit", "compliance", "governance"]
+}
 
 # === Hilfsfunktionen für Dateinamen ===
-def get_news_filename(ticker: str) -> Path:
+def get_news_filename(ticker: str, base_dir=None) -> Path:
+    # base_dir: abweichendes Artikelverzeichnis (z. B. synthetische Lasttest-Daten)
+    if base_dir is not None:
+        return Path(base_dir) / f"{ticker}_trusted.json"
     #return RAW_NEWS_DIR / f"{ticker}_trusted.json"
     return DUMMY_HEADLINES_DIR / f"{ticker}_trusted.json"
 
+def get_news_segment_dir(ticker: str, base_dir=None) -> Path:
+    # Append-only Segmente liegen neben der JSON-Datei des Tickers
+    return get_news_filename(ticker, base_dir).parent / f"{ticker}_segments"
+
+# Segmente pro Ticker, ab denen beim Schreiben kompaktiert wird
+NEWS_COMPACT_AFTER_SEGMENTS = 16
+
 def get_stock_price_filename(ticker: str) -> Path:
     return STOCK_PRICE_DIR / f"{ticker}.csv"
 
@@ -1,7 +1,12 @@
+import sys
 import pandas as pd
 import numpy as np
+from pathlib import Path
 from datetime import datetime, timedelta
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from modules.rolling_stats import z_score_panel
+
 # Liste von 40 DAX-Tickers (Platzhalter – ggf. anpassen)
 dax_tickers = [
     "ADS", "BAS", "BMW", "ALV", "BAYN", "BEI", "BNR", "CON", "1COV", "DAI",
@@ -29,10 +34,10 @@ for date in date_range:
 # DataFrame bauen
 df = pd.DataFrame(records)
 
-# Rolling-Kennzahlen pro Ticker
-df["rolling_mean"] = df.groupby("ticker")["sentiment_score"].transform(lambda x: x.rolling(window=3, min_periods=1).mean())
-df["rolling_std"] = df.groupby("ticker")["sentiment_score"].transform(lambda x: x.rolling(window=3, min_periods=1).std())
-df["z_score"] = (df["sentiment_score"] - df["rolling_mean"]) / df["rolling_std"]
+# Rolling-Kennzahlen pro Ticker (3-Tage-Fenster, vektorisiert über die date × ticker-Matrix)
+df = z_score_panel(df, windows=[3], min_periods=1, value="sentiment_score").rename(columns={
+    "rolling_mean_3": "rolling_mean", "rolling_std_3": "rolling_std", "z_score_3": "z_score"
+})
 df.sort_values(by=["ticker", "date"], inplace=True)
 
 # Datei speichern
@@ -0,0 +1,266 @@
+import sys
+import time
+import shutil
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import SYNTHETIC_DATA_DIR
+from modules.article_store import append_articles
+from modules.processed_store import append_sentiment_batch, append_cube
+from modules import sentiment_engine, z_score_engine
+from modules.daily_cube import build_cube
+from modules.keyword_matcher import TAG_COLUMNS, keyword_tags
+from modules.scoring_engine import label_scores
+
+# === Synthetische Lasttest-Daten: beliebig viele Ticker × Tage, vollständig vektorisiert ===
+# Artikel pro Ticker und Tag ~ Poisson(Rate des Tickers); Krisen-Bursts erhöhen die Rate, ziehen Texte
+# aus dem Krisen-Vokabular und verschieben das Sentiment ins Negative. Die Bursts werden als
+# Ground Truth gespeichert. Ausgabe blockweise (je `block` Ticker) direkt in die Speicherformate:
+#   <out>/headlines/{ticker}_segments/  → Artikelspeicher über article_store (Segment + Manifest + URL-Index)
+#   <out>/processed/sentiment           → bewertete Artikel inkl. Keyword-Tags (Parquet, ticker/month)
+#   <out>/processed/daily_cube          → Tages-Würfel
+#   <out>/ground_truth.csv              → Krisen-Bursts (ticker, start, end, Faktor, Sentiment-Shift)
+# Mit `score=True` (--score) stammen Sentiment, Würfel und Z-Scores statt aus den synthetischen Scores
+# aus sentiment_engine/z_score_engine auf dem erzeugten Artikelspeicher (Pfade: `engine_paths`).
+# Ein bestehendes, nicht leeres Zielverzeichnis wird nur mit force=True (--force) ersetzt.
+
+# Standard-Vokabular: (Titel, Beschreibung); Texte mit Risiko-Keywords bilden das Krisen-Vokabular
+DEFAULT_VOCABULARY = [
+    ("Strong quarterly results beat expectations", "Investors welcome higher margins and a raised outlook."),
+    ("New partnership expands digital services", "The agreement gives access to new customer segments."),
+    ("Company opens new research center", "The site will focus on battery and hydrogen technology."),
+    ("Dividend increase announced", "Management cites robust cash flow and a solid balance sheet."),
+    ("Analysts upgrade the stock", "Several brokers raise their price targets after the investor day."),
+    ("Order intake rises in Asia", "Demand in China and India supports growth expectations."),
+    ("Share buyback programme extended", "The board approves a further tranche of repurchases."),
+    ("Company joins climate initiative", "The group commits to cutting carbon emissions by 2030."),
+    ("Diversity programme wins award", "The jury praises inclusion efforts across all locations."),
+    ("Supply chain pressures ease", "Logistics costs normalise after a difficult year."),
+    ("Management confirms annual guidance", "Revenue and earnings targets remain unchanged."),
+    ("Product launch draws strong demand", "Pre-orders exceed internal expectations."),
+    ("Capital markets day outlines strategy", "The company presents mid-term targets for all divisions."),
+    ("Sustainability report published", "The report details progress on pollution and health targets."),
+    ("Accounting fraud allegations surface", "A whistleblower claims revenue was booked prematurely."),
+    ("Regulators open probe into pricing", "The investigation could result in a substantial fine."),
+    ("Bribery scandal widens", "Prosecutors examine corruption in public procurement contracts."),
+    ("Massive data leak after hack", "Millions of customer records were exposed in the attack."),
+    ("Layoffs announced amid restructuring", "Thousands of jobs are at risk as losses mount."),
+    ("CEO resignation shocks investors", "The sudden departure follows an internal audit."),
+    ("Class action lawsuit filed", "Shareholders allege misleading statements on compliance."),
+    ("Greenwashing claims under investigation", "Authorities question the carbon neutrality claims."),
+    ("Profit warning after heavy loss", "The company blames a collapse in demand and recession fears."),
+    ("Labor rights violations reported", "An NGO documents human rights abuses in the supply chain.")
+]
+SOURCES = ["Boomberg", "Reuter", "BNBC", "Handelszeitung", "Financial Mimes", "Moseleck News"]
+
+# Sentiment je Artikel: Normalverteilung um die Grundstimmung des Tickers (bzw. den Burst-Shift)
+SENTIMENT_NOISE = 0.35
+CRISIS_TEXT_SHARE = 0.8   # Anteil der Burst-Artikel aus dem Krisen-Vokabular
+
+
+def load_vocabulary(path=None):
+    """Vokabular als DataFrame (title, description, crisis) plus exakte Keyword-Tags je Eintrag."""
+    if path is None:
+        vocab = pd.DataFrame(DEFAULT_VOCABULARY, columns=["title", "description"])
+    else:
+        # Eine Zeile pro Artikeltext: "Titel<TAB>Beschreibung"
+        vocab = pd.read_csv(path, sep="\t", names=["title", "description"], header=None,
+                            quoting=3, dtype=str).fillna("")
+    tags = keyword_tags(vocab)
+    vocab = pd.concat([vocab, tags], axis=1)
+    vocab["crisis"] = vocab["risk_hits"] > 0
+    if vocab["crisis"].all() or not vocab["crisis"].any():
+        raise ValueError("Vokabular braucht Texte mit und ohne Risiko-Keywords.")
+    return vocab
+
+
+def make_tickers(n_tickers):
+    width = max(4, len(str(n_tickers)))
+    return [f"SYN{i:0{width}d}" for i in range(n_tickers)]
+
+
+def make_bursts(rng, tickers, n_days, n_bursts, burst_days, burst_rate, burst_shift):
+    """Krisen-Bursts als Ground Truth: (ticker_idx, start_day, length, rate_factor, sentiment_shift)."""
+    lengths = np.clip(rng.poisson(burst_days, n_bursts), 1, n_days)
+    starts = rng.integers(0, np.maximum(n_days - lengths, 0) + 1)
+    return pd.DataFrame({
+        "ticker_idx": rng.integers(0, len(tickers), n_bursts),
+        "start_day": starts,
+        "length": lengths,
+        "rate_factor": np.full(n_bursts, burst_rate, dtype=np.float64),
+        "sentiment_shift": np.full(n_bursts, burst_shift, dtype=np.float64)
+    })
+
+
+def burst_matrices(bursts, lo, hi, n_days):
+    """Burst-Maske, Raten-Faktor und Sentiment-Shift (Tage × Ticker im Block [lo, hi))."""
+    block = bursts[(bursts["ticker_idx"] >= lo) & (bursts["ticker_idx"] < hi)]
+    active = np.zeros((n_days, hi - lo), dtype=bool)
+    factor = np.ones((n_days, hi - lo))
+    shift = np.zeros((n_days, hi - lo))
+    # Ein Slice pro Burst (wenige im Vergleich zu Tagen × Tickern); bei Überlappung gilt der letzte
+    for idx, start, length, rate_factor, sentiment_shift in block.itertuples(index=False):
+        rows = slice(start, start + length)
+        active[rows, idx - lo] = True
+        factor[rows, idx - lo] = rate_factor
+        shift[rows, idx - lo] = sentiment_shift
+    return active, factor, shift
+
+
+def generate_block(rng, vocab, tickers, dates, rates, moods, bursts, lo, hi, id_offset):
+    """Artikel für die Ticker [lo, hi) über alle Tage; eine Zeile pro Artikel, sortiert nach Ticker und Tag."""
+    n_days = len(dates)
+    in_burst, factor, shift = burst_matrices(bursts, lo, hi, n_days)
+    counts = rng.poisson(rates[lo:hi][None, :] * factor)
+
+    # Flach in Ticker-Reihenfolge: (Ticker, Tag) je Artikel
+    flat = counts.T.ravel()
+    cell = np.repeat(np.arange(flat.size), flat)
+    ticker_idx = lo + cell // n_days
+    day_idx = cell % n_days
+    n = cell.size
+    burst = in_burst[day_idx, ticker_idx - lo]
+
+    crisis_ids = np.flatnonzero(vocab["crisis"].to_numpy())
+    calm_ids = np.flatnonzero(~vocab["crisis"].to_numpy())
+    use_crisis = burst & (rng.random(n) < CRISIS_TEXT_SHARE)
+    text_idx = np.where(use_crisis,
+                        crisis_ids[rng.integers(0, len(crisis_ids), n)],
+                        calm_ids[rng.integers(0, len(calm_ids), n)])
+
+    score = np.clip(
+        moods[ticker_idx] + shift[day_idx, ticker_idx - lo] + rng.normal(0.0, SENTIMENT_NOISE, n), -1.0, 1.0
+    ).round(4)
+    ticker_arr = np.asarray(tickers, dtype=object)[ticker_idx]
+    ids = np.arange(id_offset, id_offset + n)
+
+    df = pd.DataFrame({
+        "date": dates[day_idx],
+        "ticker": ticker_arr,
+        "company_name": "Synthetic " + pd.Series(ticker_arr, dtype=object),
+        "title": vocab["title"].to_numpy()[text_idx],
+        "description": vocab["description"].to_numpy()[text_idx],
+        "url": "https://synthetic.example/" + pd.Series(ticker_arr, dtype=object) + "/" + ids.astype(str),
+        "source": np.asarray(SOURCES, dtype=object)[rng.integers(0, len(SOURCES), n)],
+        "sentiment_score": score,
+        "sentiment_label": label_scores(score)
+    })
+    # Keyword-Tags exakt aus dem Vokabular übernehmen (kein Regex-Scan pro Artikel)
+    for col in TAG_COLUMNS:
+        df[col] = vocab[col].to_numpy()[text_idx]
+    return df
+
+
+def engine_paths(out_dir):
+    """Ein- und Ausgabepfade der Engines für einen erzeugten Datensatz (statt der Live-Pfade aus config)."""
+    out_dir, processed = Path(out_dir), Path(out_dir) / "processed"
+    return {
+        "sentiment": dict(base_dir=out_dir / "headlines", output_file=processed / "full_sentiment.csv",
+                          dataset_dir=processed / "sentiment", cube_dir=processed / "daily_cube",
+                          watermark_file=processed / "sentiment_watermarks.json",
+                          cache_file=processed / "sentiment_cache.sqlite"),
+        "z_scores": dict(dataset_dir=processed / "sentiment", fallback_csv=processed / "full_sentiment.csv",
+                         z_file=processed / "z_scores.csv", z_dataset_dir=processed / "z_scores",
+                         state_file=processed / "z_score_state.json")
+    }
+
+
+def write_articles(df, headlines_dir):
+    """Schreibt die Artikel über article_store (ohne Scores → wie frisch abgerufen)."""
+    raw = df[["date", "ticker", "company_name", "title", "description", "url", "source"]].assign(
+        date=df["date"].dt.strftime("%Y-%m-%d")
+    )
+    for ticker, part in raw.groupby("ticker", sort=False):
+        append_articles(ticker, part.to_dict("records"), base_dir=headlines_dir)
+
+
+def prepare_out_dir(out_dir, force=False):
+    """Leert das Zielverzeichnis; ein erneuter Lauf würde sonst Artikel (IDs ab 0) doppelt anhängen."""
+    out_dir = Path(out_dir)
+    if out_dir.exists() and any(out_dir.iterdir()):
+        if not force:
+            raise FileExistsError(f"{out_dir} ist nicht leer – mit --force (force=True) ersetzen.")
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+
+def generate(out_dir=SYNTHETIC_DATA_DIR, n_tickers=1000, start="2023-01-01", end="2024-12-31", rate=5.0,
+             n_bursts=None, burst_days=5, burst_rate=5.0, burst_shift=-0.6, seed=42, vocab_path=None,
+             block=200, articles=True, sentiment=True, score=False, force=False):
+    """Erzeugt den kompletten Datensatz blockweise; gibt (Anzahl Artikel, Ground-Truth-DataFrame) zurück."""
+    if score and not articles:
+        raise ValueError("score=True braucht den Artikelspeicher (articles=True).")
+    rng = np.random.default_rng(seed)
+    out_dir = Path(out_dir)
+    prepare_out_dir(out_dir, force)
+    paths = engine_paths(out_dir)
+    sentiment = sentiment and not score
+    vocab = load_vocabulary(vocab_path)
+    tickers = make_tickers(n_tickers)
+    dates = pd.date_range(start, end, freq="D")
+    n_bursts = n_bursts if n_bursts is not None else max(1, n_tickers // 10)
+
+    # Heterogene Raten (Gamma, Mittelwert = rate) und Grundstimmungen je Ticker
+    rates = rng.gamma(2.0, rate / 2.0, n_tickers)
+    moods = rng.normal(0.05, 0.15, n_tickers)
+    bursts = make_bursts(rng, tickers, len(dates), n_bursts, burst_days, burst_rate, burst_shift)
+
+    total = 0
+    for lo in range(0, n_tickers, block):
+        hi = min(lo + block, n_tickers)
+        df = generate_block(rng, vocab, tickers, dates, rates, moods, bursts, lo, hi, total)
+        if articles:
+            write_articles(df, paths["sentiment"]["base_dir"])
+        if sentiment:
+            append_sentiment_batch(df, paths["sentiment"]["dataset_dir"])
+            append_cube(build_cube(df), paths["sentiment"]["cube_dir"])
+        total += len(df)
+        print(f"   Ticker {lo}–{hi - 1}: {len(df):,} Artikel (gesamt {total:,})")
+
+    truth = bursts.assign(
+        ticker=np.asarray(tickers, dtype=object)[bursts["ticker_idx"]],
+        start=dates[bursts["start_day"]],
+        end=dates[bursts["start_day"] + bursts["length"] - 1]
+    )[["ticker", "start", "end", "length", "rate_factor", "sentiment_shift"]]
+    truth.sort_values(["ticker", "start"]).to_csv(out_dir / "ground_truth.csv", index=False)
+
+    if score:
+        # Echter Pfad: Artikelspeicher → Sentiment-Engine → Z-Score-Engine
+        sentiment_engine.run_full(tickers, **paths["sentiment"])
+        z_score_engine.run_batch(**paths["z_scores"])
+    return total, truth
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetische Artikel & Sentiments für Lasttests erzeugen")
+    parser.add_argument("--out", type=Path, default=SYNTHETIC_DATA_DIR, help="Zielverzeichnis")
+    parser.add_argument("--tickers", type=int, default=1000, help="Anzahl synthetischer Ticker")
+    parser.add_argument("--start", default="2023-01-01", help="Erster Tag (YYYY-MM-DD)")
+    parser.add_argument("--end", default="2024-12-31", help="Letzter Tag (YYYY-MM-DD)")
+    parser.add_argument("--rate", type=float, default=5.0, help="Mittlere Artikel pro Ticker und Tag")
+    parser.add_argument("--bursts", type=int, help="Anzahl Krisen-Bursts (Standard: Ticker / 10)")
+    parser.add_argument("--burst-days", type=int, default=5, help="Mittlere Burst-Dauer in Tagen")
+    parser.add_argument("--burst-rate", type=float, default=5.0, help="Faktor auf die Artikelrate während eines Bursts")
+    parser.add_argument("--burst-shift", type=float, default=-0.6, help="Sentiment-Verschiebung während eines Bursts")
+    parser.add_argument("--vocab", type=Path, help="Vokabular-Datei (Titel<TAB>Beschreibung je Zeile)")
+    parser.add_argument("--seed", type=int, default=42, help="Zufalls-Seed")
+    parser.add_argument("--block", type=int, default=200, help="Ticker pro Schreibblock")
+    parser.add_argument("--no-articles", action="store_true", help="Keinen Artikelspeicher schreiben")
+    parser.add_argument("--no-sentiment", action="store_true", help="Keine Parquet-Datasets schreiben")
+    parser.add_argument("--score", action="store_true",
+                        help="Sentiment und Z-Scores mit den Engines aus dem erzeugten Artikelspeicher berechnen")
+    parser.add_argument("--force", action="store_true", help="Bestehendes Zielverzeichnis ersetzen")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    n_articles, truth = generate(
+        out_dir=args.out, n_tickers=args.tickers, start=args.start, end=args.end, rate=args.rate,
+        n_bursts=args.bursts, burst_days=args.burst_days, burst_rate=args.burst_rate, burst_shift=args.burst_shift,
+        seed=args.seed, vocab_path=args.vocab, block=args.block,
+        articles=not args.no_articles, sentiment=not args.no_sentiment, score=args.score, force=args.force
+    )
+    print(f"✅ {n_articles:,} Artikel für {args.tickers} Ticker und {len(truth)} Krisen-Bursts "
+          f"in {time.perf_counter() - started:.1f}s → {args.out}")
@@ -0,0 +1,54 @@
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from config import PIPELINE_STATE_FILE, DUMMY_PIPELINE_STATE_FILE
+from modules import pipeline
+
+# === EMOTECT-Kommandozeile ===
+#   python emotect.py run      → alle veralteten Pipeline-Stufen ausführen (Abrufe → Sentiment → Analysen)
+#   python emotect.py status   → Stufen, Abhängigkeiten und ob sie veraltet sind
+
+
+def cmd_run(args):
+    return pipeline.main(dummy=args.dummy, only=args.only, skip=args.skip, force=args.force,
+                         content_hash=args.hash, jobs=args.jobs, dry_run=args.dry_run,
+                         verbose=args.verbose, news_source=args.news_source, inline=args.inline)
+
+
+def cmd_status(args):
+    stages = pipeline.dummy_stages() if args.dummy else pipeline.live_stages(args.news_source)
+    state_file = DUMMY_PIPELINE_STATE_FILE if args.dummy else PIPELINE_STATE_FILE
+    for row in pipeline.status(stages, state_file, args.hash):
+        after = ", ".join(row["after"]) or "–"
+        last = f"{row['last_run']} ({row['last_seconds']:.1f}s)" if row["last_run"] else "nie"
+        print(f"{'🔄' if row['stale'] else '✅'} {row['stage']:<24} nach: {after:<40} letzter Lauf: {last}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="emotect", description="EMOTECT-Datenpipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--dummy", action="store_true", help="Dummy-Pipeline (ohne Abrufe) statt Live-Daten")
+    common.add_argument("--hash", action="store_true", help="Eingaben per Inhalts-Hash statt Größe/mtime vergleichen")
+    common.add_argument("--news-source", choices=list(pipeline.NEWS_SOURCES), default="newsdata",
+                        help="News-Quelle der Live-Pipeline")
+
+    run = sub.add_parser("run", parents=[common], help="Veraltete Stufen ausführen")
+    run.add_argument("--only", nargs="+", help="Nur diese Stufen (inkl. vorgelagerter)")
+    run.add_argument("--skip", nargs="+", help="Diese Stufen auslassen")
+    run.add_argument("--force", action="store_true", help="Alle Stufen unabhängig vom Fingerprint ausführen")
+    run.add_argument("--jobs", type=int, default=pipeline.DEFAULT_JOBS, help="Maximal parallel laufende Stufen")
+    run.add_argument("--dry-run", action="store_true", help="Nur anzeigen, was laufen würde")
+    run.add_argument("--verbose", action="store_true", help="Ausgabe jeder Stufe anzeigen")
+    run.add_argument("--inline", action="store_true", help="Stufen nacheinander im eigenen Prozess statt im Prozess-Pool")
+    run.set_defaults(func=cmd_run)
+
+    status = sub.add_parser("status", parents=[common], help="Stand der Stufen anzeigen")
+    status.set_defaults(func=cmd_status)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
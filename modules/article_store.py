@@ -0,0 +1,206 @@
+import os
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    NEWS_COMPACT_AFTER_SEGMENTS,
+    get_news_filename,
+    get_news_segment_dir
+)
+from modules.url_index import get_url_index, canonicalize_url
+
+# === Append-only Artikelspeicher ===
+# Pro Ticker:
+#   {ticker}_trusted.json          → bestehender Altbestand (nur gelesen, nie umgeschrieben)
+#   {ticker}_segments/seg-*.jsonl  → ein JSON-Lines-Segment pro Refresh mit ausschließlich neuen Artikeln
+#   {ticker}_segments/manifest.json → Segmentliste mit Zeilenzahlen
+# Dedupliziert wird über den gemeinsamen URL-Index (Namespace "news:{ticker}"). URLs werden erst nach
+# dem Schreiben von Segment und Manifest eingetragen; Segmente mit "indexed": false (Absturz dazwischen)
+# werden beim nächsten Anhängen nachgetragen. Ohne neue Artikel bleibt das Manifest unverändert.
+# Die Zeilenreihenfolge (Altbestand, dann Segmente) bleibt auch nach einer Kompaktierung stabil,
+# damit Offsets als Wasserzeichen verwendet werden können.
+# base_dir (optional) legt den Speicher in ein anderes Verzeichnis, z. B. für Lasttests/Benchmarks;
+# ohne eigenen `index` nutzt er dann einen eigenen URL-Index unter base_dir/_url_index.sqlite.
+
+MANIFEST_FILE = "manifest.json"
+URL_INDEX_NAME = "_url_index.sqlite"  # "_"-Präfix: von Pipeline-Fingerprints ignoriert
+
+# Zeilenzahl je Altbestand-Datei, solange Größe und mtime gleich bleiben (Lesepfade schreiben nichts)
+_legacy_rows = {}
+
+
+def _segment_name(number):
+    return f"seg-{number:06d}.jsonl"
+
+
+def _write_json_atomic(path, payload):
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_legacy(ticker, base_dir=None):
+    file_path = get_news_filename(ticker, base_dir)
+    if not os.path.exists(file_path):
+        return []
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _read_segment(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_manifest(ticker, base_dir=None):
+    """Manifest inkl. aktueller Zeilenzahl des Altbestands; schreibt nichts (persistiert wird beim Anhängen)."""
+    manifest_path = get_news_segment_dir(ticker, base_dir) / MANIFEST_FILE
+    if manifest_path.exists():
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    else:
+        manifest = {"legacy": None, "segments": [], "next_segment": 0}
+
+    # Zeilenzahl des Altbestands nur neu bestimmen, wenn sich die Datei geändert hat
+    legacy_path = get_news_filename(ticker, base_dir)
+    legacy = manifest.get("legacy")
+    if os.path.exists(legacy_path):
+        stat = os.stat(legacy_path)
+        if not legacy or legacy["mtime"] != stat.st_mtime or legacy["size"] != stat.st_size:
+            key = (str(legacy_path), stat.st_mtime, stat.st_size)
+            if key not in _legacy_rows:
+                _legacy_rows[key] = len(_read_legacy(ticker, base_dir))
+            manifest["legacy"] = {"rows": _legacy_rows[key], "mtime": stat.st_mtime, "size": stat.st_size}
+    elif legacy:
+        manifest["legacy"] = None
+    return manifest
+
+
+def _save_manifest(ticker, manifest, base_dir=None):
+    segment_dir = get_news_segment_dir(ticker, base_dir)
+    segment_dir.mkdir(parents=True, exist_ok=True)
+    _write_json_atomic(segment_dir / MANIFEST_FILE, manifest)
+
+
+def count_articles(ticker, manifest=None, base_dir=None):
+    manifest = manifest or load_manifest(ticker, base_dir)
+    legacy_rows = manifest["legacy"]["rows"] if manifest["legacy"] else 0
+    return legacy_rows + sum(seg["rows"] for seg in manifest["segments"])
+
+
+def iter_articles(ticker, start=0, base_dir=None):
+    """Liefert alle Artikel eines Tickers ab Zeilen-Offset `start`; vollständig übersprungene Dateien werden nicht gelesen."""
+    manifest = load_manifest(ticker, base_dir)
+    offset = 0
+
+    legacy_rows = manifest["legacy"]["rows"] if manifest["legacy"] else 0
+    if legacy_rows and start < legacy_rows:
+        yield from _read_legacy(ticker, base_dir)[start:]
+    offset += legacy_rows
+
+    segment_dir = get_news_segment_dir(ticker, base_dir)
+    for seg in manifest["segments"]:
+        if start < offset + seg["rows"]:
+            yield from _read_segment(segment_dir / seg["name"])[max(start - offset, 0):]
+        offset += seg["rows"]
+
+
+def read_articles(ticker, start=0, base_dir=None):
+    return list(iter_articles(ticker, start=start, base_dir=base_dir))
+
+
+def _url_namespace(ticker):
+    return f"news:{ticker}"
+
+
+def store_url_index(base_dir=None):
+    """URL-Index eines Speichers: der gemeinsame Index bzw. ein eigener unter base_dir."""
+    return get_url_index() if base_dir is None else get_url_index(Path(base_dir) / URL_INDEX_NAME)
+
+
+def _ensure_url_index(ticker, manifest, index, base_dir=None):
+    """Trägt noch nicht indexierte Bestände nach; gibt zurück, ob sich das Manifest geändert hat."""
+    namespace = _url_namespace(ticker)
+    if not manifest.get("url_index_ready"):
+        # Einmaliger Import des gesamten Bestands in den gemeinsamen URL-Index
+        index.add_new((a.get("url") for a in iter_articles(ticker, base_dir=base_dir)), namespace)
+        manifest["url_index_ready"] = True
+        for seg in manifest["segments"]:
+            seg.pop("indexed", None)
+        return True
+
+    pending = [seg for seg in manifest["segments"] if seg.get("indexed") is False]
+    segment_dir = get_news_segment_dir(ticker, base_dir)
+    for seg in pending:
+        index.add_new((a.get("url") for a in _read_segment(segment_dir / seg["name"])), namespace)
+        seg.pop("indexed")
+    return bool(pending)
+
+
+def append_articles(ticker, articles, base_dir=None, index=None):
+    """Schreibt nur bisher unbekannte Artikel (nach kanonischer URL) als neues Segment. Gibt (neu, gesamt) zurück."""
+    manifest = load_manifest(ticker, base_dir)
+    index = index or store_url_index(base_dir)
+    namespace = _url_namespace(ticker)
+    changed = _ensure_url_index(ticker, manifest, index, base_dir)
+
+    # Nur lesend prüfen; eingetragen wird erst, wenn das Segment auf der Platte liegt
+    new_articles, batch_keys = [], set()
+    for article in articles:
+        key = canonicalize_url(article.get("url"))
+        if key and key not in batch_keys and not index.contains(key, namespace):
+            batch_keys.add(key)
+            new_articles.append(article)
+
+    if new_articles:
+        segment_dir = get_news_segment_dir(ticker, base_dir)
+        segment_dir.mkdir(parents=True, exist_ok=True)
+        name = _segment_name(manifest["next_segment"])
+        with open(segment_dir / name, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(a, ensure_ascii=False) + "\n" for a in new_articles)
+        segment = {"name": name, "rows": len(new_articles), "indexed": False}
+        manifest["segments"].append(segment)
+        manifest["next_segment"] += 1
+        _save_manifest(ticker, manifest, base_dir)
+
+        index.add_new(batch_keys, namespace)
+        segment.pop("indexed")
+        changed = True
+
+    if changed:
+        _save_manifest(ticker, manifest, base_dir)
+    if len(manifest["segments"]) >= NEWS_COMPACT_AFTER_SEGMENTS:
+        compact(ticker, base_dir)
+
+    return len(new_articles), count_articles(ticker, manifest)
+
+
+def compact(ticker, base_dir=None):
+    """Fasst alle Segmente eines Tickers in Reihenfolge zu einem einzigen Segment zusammen."""
+    manifest = load_manifest(ticker, base_dir)
+    if len(manifest["segments"]) < 2:
+        return
+
+    segment_dir = get_news_segment_dir(ticker, base_dir)
+    name = _segment_name(manifest["next_segment"])
+    tmp_path = segment_dir / (name + ".tmp")
+    rows = 0
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        for seg in manifest["segments"]:
+            with open(segment_dir / seg["name"], "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        out.write(line if line.endswith("\n") else line + "\n")
+                        rows += 1
+    os.replace(tmp_path, segment_dir / name)
+
+    old_segments = manifest["segments"]
+    manifest["segments"] = [{"name": name, "rows": rows}]
+    manifest["next_segment"] += 1
+    _save_manifest(ticker, manifest, base_dir)
+
+    for seg in old_segments:
+        (segment_dir / seg["name"]).unlink(missing_ok=True)
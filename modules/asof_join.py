@@ -0,0 +1,120 @@
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    SENTIMENT_DATASET_DIR,
+    FULL_SENTIMENT_FILE,
+    DAILY_CUBE_DATASET_DIR,
+    SENTIMENT_PRICE_PANEL_DIR,
+    PRICE_MATRIX_DIR,
+    STOCK_PRICE_DIR,
+    DUMMY_SENTIMENT_DATASET_DIR,
+    DUMMY_FULL_SENTIMENT_FILE,
+    DUMMY_DAILY_CUBE_DATASET_DIR,
+    DUMMY_SENTIMENT_PRICE_PANEL_DIR
+)
+from modules.processed_store import read_sentiment, read_cube, write_panel
+from modules.daily_cube import CUBE_MEASURES, build_cube
+from modules.keyword_matcher import TAG_COLUMNS
+from modules.price_matrix import open_price_matrix
+
+# === As-of-Join: Sentiment-Kalendertage → nächster Handelstag (XETRA) je Ticker ===
+# Wochenend- und Feiertagsnachrichten wirken erst in der folgenden Sitzung; Nachrichten eines
+# Handelstags zählen zu diesem Tag. Ein einziger sortierter merge_asof über alle Ticker (by="ticker").
+
+PRICE_COLUMNS = ["adj_close", "close", "volume", "return", "log_return"]
+
+
+def load_daily_sentiment(cube_dir=DAILY_CUBE_DATASET_DIR, dataset_dir=SENTIMENT_DATASET_DIR,
+                         fallback_csv=FULL_SENTIMENT_FILE):
+    """Tagesaggregate (Ticker × Kalendertag) aus dem Würfel bzw. einmalig aus den Artikeln."""
+    if Path(cube_dir).exists():
+        return read_cube(dataset_dir=cube_dir)
+    df = read_sentiment(
+        columns=["date", "ticker", "title", "description", "sentiment_score"] + TAG_COLUMNS,
+        dataset_dir=dataset_dir, fallback_csv=fallback_csv
+    )
+    return build_cube(df)
+
+
+def price_frame(prices):
+    """Langformat (ticker, trade_date, Kurse, Renditen) aus der Kursmatrix; Renditen seit dem letzten Kurs."""
+    adj = np.asarray(prices.field("adj_close"), dtype=np.float64)
+    returns = prices.returns("adj_close")
+    rows, cols = np.nonzero(~np.isnan(adj))
+    # np.nonzero liefert zeilenweise Reihenfolge → bereits nach trade_date sortiert
+    return pd.DataFrame({
+        "ticker": np.asarray(prices.tickers, dtype=object)[cols],
+        "trade_date": prices.dates[rows],
+        "adj_close": adj[rows, cols],
+        "close": np.asarray(prices.field("close"), dtype=np.float64)[rows, cols],
+        "volume": np.asarray(prices.field("volume"), dtype=np.float64)[rows, cols],
+        "return": returns[rows, cols],
+        "log_return": np.log1p(returns[rows, cols])
+    })
+
+
+def asof_join(daily, prices):
+    """Ordnet jeden Sentiment-Tag dem nächsten Handelstag zu und summiert die Kennzahlen je Sitzung.
+
+    Ergebnis: eine Zeile pro Ticker × Handelstag (Spalte `date`) im Zeitraum der Nachrichten,
+    mit Sentiment-Summen (0 ohne Artikel), `news_days` (zugeordnete Kalendertage) und Kursdaten.
+    """
+    daily = daily.assign(
+        ticker=daily["ticker"].astype(str),
+        date=pd.to_datetime(daily["date"]).dt.normalize()
+    ).sort_values("date", kind="stable")
+    sessions = prices[["ticker", "trade_date"]]
+
+    matched = pd.merge_asof(daily, sessions, left_on="date", right_on="trade_date",
+                            by="ticker", direction="forward")
+    # Tage nach dem letzten Kurs (bzw. ohne Kursdaten) bleiben offen bis zum nächsten Abruf;
+    # Tage vor dem ersten Kurs eines Tickers haben keine vorangehende Sitzung und entfallen
+    first_session = matched["ticker"].map(sessions.groupby("ticker")["trade_date"].min())
+    matched = matched[matched["trade_date"].notna() & (matched["date"] >= first_session)]
+    agg = (
+        matched.groupby(["ticker", "trade_date"], sort=False)
+        .agg(**{m: (m, "sum") for m in CUBE_MEASURES}, news_days=("date", "size"))
+        .reset_index()
+    )
+
+    # Alle Handelstage der Ticker mit Nachrichten im abgedeckten Zeitraum, auch ohne Artikel
+    first = daily["date"].min()
+    last = agg["trade_date"].max() if not agg.empty else first
+    panel = prices[
+        prices["ticker"].isin(agg["ticker"].unique())
+        & (prices["trade_date"] >= first) & (prices["trade_date"] <= last)
+    ]
+    panel = panel.merge(agg, on=["ticker", "trade_date"], how="left")
+    panel[CUBE_MEASURES + ["news_days"]] = panel[CUBE_MEASURES + ["news_days"]].fillna(0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        panel["sentiment_mean"] = panel["sentiment_sum"] / panel["article_count"].where(panel["article_count"] > 0)
+    panel = panel.rename(columns={"trade_date": "date"})
+    return panel[["ticker", "date"] + CUBE_MEASURES + ["sentiment_mean", "news_days"] + PRICE_COLUMNS] \
+        .sort_values(["ticker", "date"], ignore_index=True)
+
+
+def load_prices(matrix_dir=PRICE_MATRIX_DIR, price_dir=STOCK_PRICE_DIR):
+    return price_frame(open_price_matrix(matrix_dir, price_dir))
+
+
+def main(dummy=False):
+    cube_dir, dataset_dir, fallback_csv, panel_dir = (
+        (DUMMY_DAILY_CUBE_DATASET_DIR, DUMMY_SENTIMENT_DATASET_DIR, DUMMY_FULL_SENTIMENT_FILE,
+         DUMMY_SENTIMENT_PRICE_PANEL_DIR) if dummy
+        else (DAILY_CUBE_DATASET_DIR, SENTIMENT_DATASET_DIR, FULL_SENTIMENT_FILE, SENTIMENT_PRICE_PANEL_DIR)
+    )
+    panel = asof_join(load_daily_sentiment(cube_dir, dataset_dir, fallback_csv), load_prices())
+    write_panel(panel, panel_dir)
+    print(f"✅ Sentiment-Kurs-Panel: {len(panel)} Zeilen (Ticker × Handelstag) → {panel_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sentiment-Tage per As-of-Join den nächsten Handelstagen zuordnen")
+    parser.add_argument("--dummy", action="store_true", help="Dummy-Sentiment statt Live-Daten verwenden")
+    args = parser.parse_args()
+    main(dummy=args.dummy)
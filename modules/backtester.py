@@ -0,0 +1,211 @@
+import os
+import sys
+import time
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    Z_SCORE_DATASET_DIR,
+    DAILY_CUBE_DATASET_DIR,
+    SENTIMENT_DATASET_DIR,
+    FULL_SENTIMENT_FILE,
+    BACKTEST_RESULTS_FILE,
+    DUMMY_Z_SCORE_DATASET_DIR,
+    DUMMY_DAILY_CUBE_DATASET_DIR,
+    DUMMY_SENTIMENT_DATASET_DIR,
+    DUMMY_FULL_SENTIMENT_FILE,
+    DUMMY_BACKTEST_RESULTS_FILE
+)
+from modules.processed_store import read_z_scores
+from modules.rolling_stats import DEFAULT_WINDOWS, z_score_panel
+from modules.z_score_engine import load_daily
+from modules.asof_join import asof_join, load_daily_sentiment, price_frame
+from modules.price_matrix import open_price_matrix
+
+# === Backtester: Sentiment-Signale (Handelstag × Ticker) als Handels-/Hedge-Regel ===
+# Regel: Signal ≤ Schwelle (Schwelle < 0) bzw. ≥ Schwelle (Schwelle > 0) am Tag t → Position `side`
+# in den Sitzungen t+1 … t+hold (kein Lookahead). Gewichte gleich verteilt auf alle offenen Positionen.
+
+TRADING_DAYS = 252
+DEFAULT_THRESHOLDS = {
+    "z_score": [-3.0, -2.5, -2.0, 2.0, 2.5, 3.0],
+    "pressure": [0.1, 0.2, 0.3, 0.5]    # Risiko-Treffer pro Artikel im Fenster
+}
+DEFAULT_HOLDS = [1, 2, 3, 5, 10, 20]
+DEFAULT_SIDES = [-1]                    # −1 = short, +1 = long
+DEFAULT_COST_BPS = 5.0
+
+
+# === Signale auf die Handelstage der Kursmatrix ausrichten ===
+def align_to_sessions(df, column, prices):
+    """Kalendertag-Werte → Matrix (Handelstag × Ticker); mehrere Tage pro Sitzung: der späteste zählt."""
+    matrix = np.full((len(prices.dates), len(prices.tickers)), np.nan)
+    df = df.dropna(subset=[column]).sort_values("date", kind="stable")
+    rows = prices.dates.searchsorted(pd.to_datetime(df["date"]).to_numpy(), side="left")
+    cols = pd.Series(np.arange(len(prices.tickers)), index=prices.tickers).reindex(df["ticker"].astype(str)).to_numpy()
+    keep = (rows < len(prices.dates)) & ~np.isnan(cols)
+    cells = pd.DataFrame({"row": rows[keep], "col": cols[keep].astype(np.int64), "value": df[column].to_numpy()[keep]})
+    cells = cells.drop_duplicates(subset=["row", "col"], keep="last")
+    matrix[cells["row"].to_numpy(), cells["col"].to_numpy()] = cells["value"].to_numpy()
+    return matrix
+
+
+def load_z_signals(prices, windows, z_dir, dataset_dir, fallback_csv):
+    columns = [f"z_score_{w}" for w in windows]
+    if Path(z_dir).exists():
+        z = read_z_scores(columns=["ticker", "date"] + columns, dataset_dir=z_dir)
+    else:
+        z = z_score_panel(load_daily(dataset_dir, fallback_csv), windows=windows)
+    return {("z_score", w): align_to_sessions(z, f"z_score_{w}", prices) for w in windows}
+
+
+def load_pressure_signals(prices, windows, cube_dir, dataset_dir, fallback_csv):
+    """Krisendruck: Risiko-Treffer pro Artikel über die letzten w Sitzungen (Volcano-Kennzahl)."""
+    panel = asof_join(load_daily_sentiment(cube_dir, dataset_dir, fallback_csv), price_frame(prices))
+    hits = align_to_sessions(panel, "risk_hits", prices)
+    articles = align_to_sessions(panel, "article_count", prices)
+    hits_sum = np.zeros((hits.shape[0] + 1, hits.shape[1]))
+    articles_sum = np.zeros_like(hits_sum)
+    np.cumsum(np.nan_to_num(hits), axis=0, out=hits_sum[1:])
+    np.cumsum(np.nan_to_num(articles), axis=0, out=articles_sum[1:])
+
+    end = np.arange(1, hits.shape[0] + 1)
+    signals = {}
+    for w in windows:
+        start = np.maximum(end - w, 0)
+        n = articles_sum[end] - articles_sum[start]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            signals[("pressure", w)] = np.where(n > 0, (hits_sum[end] - hits_sum[start]) / n, np.nan)
+    return signals
+
+
+# === Kern: Positionen, PnL, Turnover, Drawdown ===
+def positions(signal, threshold, hold, side=-1):
+    """Position je Sitzung × Ticker: `side`, solange ein Auslöser in den letzten `hold` Sitzungen liegt."""
+    with np.errstate(invalid="ignore"):
+        triggers = (signal <= threshold) if threshold < 0 else (signal >= threshold)
+    counts = np.zeros((signal.shape[0] + 1, signal.shape[1]), dtype=np.int64)
+    np.cumsum(triggers, axis=0, out=counts[1:])
+    end = np.arange(signal.shape[0])
+    # Auslöser in den Zeilen t−hold … t−1 → aktiv in Zeile t
+    active = counts[end] - counts[np.maximum(end - hold, 0)]
+    return side * (active > 0).astype(np.float64), int(triggers.sum())
+
+
+def run_backtest(signal, returns, threshold, hold, side=-1, cost_bps=DEFAULT_COST_BPS, curves=False):
+    """Kennzahlen einer Regel; mit `curves=True` zusätzlich (pnl, equity, drawdown, turnover) je Sitzung."""
+    pos, trades = positions(signal, threshold, hold, side)
+    tradable = ~np.isnan(returns)
+    pos = np.where(tradable, pos, 0.0)
+    gross = np.abs(pos).sum(axis=1)
+    weights = pos / np.maximum(gross, 1.0)[:, None]
+
+    turnover = np.abs(np.diff(weights, axis=0, prepend=0.0)).sum(axis=1)
+    pnl = (weights * np.where(tradable, returns, 0.0)).sum(axis=1) - turnover * cost_bps / 10_000
+    equity = np.cumprod(1.0 + pnl)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+
+    vol = pnl.std(ddof=1) * np.sqrt(TRADING_DAYS) if len(pnl) > 1 else np.nan
+    ann_return = equity[-1] ** (TRADING_DAYS / len(pnl)) - 1.0 if len(pnl) and equity[-1] > 0 else np.nan
+    stats = {
+        "total_return": float(equity[-1] - 1.0) if len(pnl) else np.nan,
+        "ann_return": float(ann_return),
+        "ann_vol": float(vol),
+        "sharpe": float(pnl.mean() * TRADING_DAYS / vol) if vol and vol > 0 else np.nan,
+        "max_drawdown": float(drawdown.min()) if len(pnl) else np.nan,
+        "avg_turnover": float(turnover.mean()) if len(pnl) else np.nan,
+        "exposure": float((gross > 0).mean()) if len(pnl) else np.nan,
+        "trades": trades
+    }
+    if curves:
+        return stats, pd.DataFrame({"pnl": pnl, "equity": equity, "drawdown": drawdown, "turnover": turnover})
+    return stats
+
+
+# === Parameter-Sweep über einen Prozess-Pool ===
+# Signale & Renditen einmal pro Worker (Initializer), danach nur noch Konfigurationen übertragen
+_signals = None
+_returns = None
+
+
+def _init_worker(signals, returns):
+    global _signals, _returns
+    _signals, _returns = signals, returns
+
+
+def _run_chunk(configs):
+    results = []
+    for config in configs:
+        signal = _signals[(config["signal"], config["window"])]
+        stats = run_backtest(signal, _returns, config["threshold"], config["hold"], config["side"], config["cost_bps"])
+        results.append({**config, **stats})
+    return results
+
+
+def sweep_configs(signals, thresholds, holds, sides=DEFAULT_SIDES, cost_bps=DEFAULT_COST_BPS):
+    return [
+        {"signal": name, "window": window, "threshold": threshold, "hold": hold, "side": side, "cost_bps": cost_bps}
+        for (name, window) in signals
+        for threshold, hold, side in itertools.product(thresholds[name], holds, sides)
+    ]
+
+
+def run_sweep(signals, returns, configs, workers=None, chunks_per_worker=4):
+    workers = min(workers or os.cpu_count() or 1, len(configs)) if configs else 1
+    if workers <= 1:
+        _init_worker(signals, returns)
+        results = _run_chunk(configs)
+    else:
+        size = max(1, -(-len(configs) // (workers * chunks_per_worker)))
+        chunks = [configs[i:i + size] for i in range(0, len(configs), size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(signals, returns)) as pool:
+            results = [row for part in pool.map(_run_chunk, chunks) for row in part]
+    return pd.DataFrame(results)
+
+
+def main(dummy=False, signal="z_score", windows=DEFAULT_WINDOWS, thresholds=None, holds=DEFAULT_HOLDS,
+         sides=DEFAULT_SIDES, cost_bps=DEFAULT_COST_BPS, workers=None):
+    z_dir, cube_dir, dataset_dir, fallback_csv, out_file = (
+        (DUMMY_Z_SCORE_DATASET_DIR, DUMMY_DAILY_CUBE_DATASET_DIR, DUMMY_SENTIMENT_DATASET_DIR,
+         DUMMY_FULL_SENTIMENT_FILE, DUMMY_BACKTEST_RESULTS_FILE) if dummy
+        else (Z_SCORE_DATASET_DIR, DAILY_CUBE_DATASET_DIR, SENTIMENT_DATASET_DIR,
+              FULL_SENTIMENT_FILE, BACKTEST_RESULTS_FILE)
+    )
+    prices = open_price_matrix()
+    returns = prices.returns("adj_close")
+    if signal == "z_score":
+        signals = load_z_signals(prices, windows, z_dir, dataset_dir, fallback_csv)
+    else:
+        signals = load_pressure_signals(prices, windows, cube_dir, dataset_dir, fallback_csv)
+
+    thresholds = {signal: thresholds if thresholds else DEFAULT_THRESHOLDS[signal]}
+    configs = sweep_configs(signals, thresholds, holds, sides, cost_bps)
+    start = time.perf_counter()
+    results = run_sweep(signals, returns, configs, workers)
+    elapsed = time.perf_counter() - start
+
+    results = results.sort_values("sharpe", ascending=False, na_position="last", ignore_index=True)
+    results.to_csv(out_file, index=False)
+    print(f"✅ Backtest-Sweep: {len(results)} Konfigurationen in {elapsed:.1f}s → {out_file}")
+    print(results.head(5)[["signal", "window", "threshold", "hold", "side", "sharpe", "total_return", "max_drawdown"]]
+          .to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vektorisierter Backtest von Sentiment-Signalen inkl. Parameter-Sweep")
+    parser.add_argument("--dummy", action="store_true", help="Dummy-Daten statt Live-Daten verwenden")
+    parser.add_argument("--signal", choices=["z_score", "pressure"], default="z_score", help="Signalquelle")
+    parser.add_argument("--windows", type=int, nargs="+", default=DEFAULT_WINDOWS, help="Signalfenster (Tage bzw. Sitzungen)")
+    parser.add_argument("--thresholds", type=float, nargs="+", help="Schwellen (Standard je Signal)")
+    parser.add_argument("--holds", type=int, nargs="+", default=DEFAULT_HOLDS, help="Haltedauer in Sitzungen")
+    parser.add_argument("--sides", type=int, nargs="+", choices=[-1, 1], default=DEFAULT_SIDES, help="−1 = short, 1 = long")
+    parser.add_argument("--cost-bps", type=float, default=DEFAULT_COST_BPS, help="Transaktionskosten in Basispunkten je Turnover")
+    parser.add_argument("--workers", type=int, help="Anzahl Prozesse (Standard: alle Kerne)")
+    args = parser.parse_args()
+    main(dummy=args.dummy, signal=args.signal, windows=args.windows, thresholds=args.thresholds, holds=args.holds,
+         sides=args.sides, cost_bps=args.cost_bps, workers=args.workers)
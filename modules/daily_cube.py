@@ -0,0 +1,157 @@
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    SENTIMENT_DATASET_DIR,
+    FULL_SENTIMENT_FILE,
+    DAILY_CUBE_DATASET_DIR,
+    DUMMY_SENTIMENT_DATASET_DIR,
+    DUMMY_FULL_SENTIMENT_FILE,
+    DUMMY_DAILY_CUBE_DATASET_DIR
+)
+from modules.processed_store import read_sentiment, write_cube
+from modules.keyword_matcher import TAG_COLUMNS, keyword_tags, has_tags
+
+# === Tages-Würfel: eine Zeile pro Ticker × Tag mit additiven Kennzahlen ===
+# Fenster-Abfragen (Mittelwert, Streuung, Krisendruck, ESG) ergeben sich aus Präfixsummen
+# in O(Ticker), unabhängig von der Artikelanzahl.
+
+CUBE_MEASURES = [
+    "article_count",    # Artikel mit Sentiment-Score
+    "sentiment_sum",
+    "sentiment_sumsq",
+    "risk_hits",        # Risiko-Keywords in Titel + Beschreibung
+    "risky_articles",   # Artikel mit mindestens einem Risiko-Keyword
+    "esg_e",
+    "esg_s",
+    "esg_g"
+]
+
+
+def build_cube(df):
+    """Aggregiert bewertete Artikel (date, ticker, sentiment_score, Tags bzw. title/description) zu Tageszeilen."""
+    if df.empty:
+        return pd.DataFrame(columns=["date", "ticker"] + CUBE_MEASURES)
+
+    # Ingest-Tags verwenden, falls vorhanden; sonst (Altbestand) einmalig aus dem Text bestimmen
+    tags = df[TAG_COLUMNS] if has_tags(df) else keyword_tags(df)
+    score = pd.to_numeric(df["sentiment_score"], errors="coerce")
+    risk_hits = tags["risk_hits"].to_numpy(dtype=np.int64)
+
+    parts = pd.DataFrame({
+        "date": pd.to_datetime(df["date"], errors="coerce").dt.normalize(),
+        "ticker": df["ticker"].astype(str),
+        "article_count": score.notna().astype(np.int64),
+        "sentiment_sum": score.fillna(0.0),
+        "sentiment_sumsq": score.fillna(0.0) ** 2,
+        "risk_hits": risk_hits,
+        "risky_articles": (risk_hits > 0).astype(np.int64),
+        "esg_e": tags["esg_e"].to_numpy(dtype=np.int64),
+        "esg_s": tags["esg_s"].to_numpy(dtype=np.int64),
+        "esg_g": tags["esg_g"].to_numpy(dtype=np.int64)
+    }).dropna(subset=["date"])
+    return parts.groupby(["ticker", "date"], as_index=False, sort=True)[CUBE_MEASURES].sum()
+
+
+class DailyCube:
+    """Dichte date × ticker-Matrizen je Kennzahl plus Präfixsummen entlang der Zeitachse."""
+
+    def __init__(self, cube_df):
+        if cube_df.empty:
+            self.dates = pd.DatetimeIndex([])
+            self.tickers = []
+        else:
+            dates = pd.to_datetime(cube_df["date"])
+            self.dates = pd.date_range(dates.min(), dates.max(), freq="D")
+            self.tickers = sorted(cube_df["ticker"].astype(str).unique())
+
+        shape = (len(self.dates), len(self.tickers))
+        self.daily = {}
+        self.prefix = {}
+        if cube_df.empty:
+            row_idx = col_idx = np.empty(0, dtype=np.int64)
+        else:
+            row_idx = self.dates.get_indexer(pd.to_datetime(cube_df["date"]))
+            col_idx = pd.Index(self.tickers).get_indexer(cube_df["ticker"].astype(str))
+        for measure in CUBE_MEASURES:
+            dense = np.zeros(shape, dtype=np.float64)
+            if len(row_idx):
+                np.add.at(dense, (row_idx, col_idx), cube_df[measure].to_numpy(dtype=np.float64))
+            self.daily[measure] = dense
+            prefix = np.zeros((shape[0] + 1, shape[1]), dtype=np.float64)
+            np.cumsum(dense, axis=0, out=prefix[1:])
+            self.prefix[measure] = prefix
+
+    @property
+    def empty(self):
+        return len(self.dates) == 0
+
+    @property
+    def min_date(self):
+        return self.dates[0] if len(self.dates) else None
+
+    @property
+    def max_date(self):
+        return self.dates[-1] if len(self.dates) else None
+
+    def _rows(self, start, end):
+        # Zeilenbereich [i0, i1) der Tage innerhalb [start, end]
+        i0 = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start).normalize(), side="left")
+        i1 = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end).normalize(), side="right")
+        return i0, max(i0, i1)
+
+    def window(self, start=None, end=None):
+        """Summen aller Kennzahlen je Ticker über [start, end] plus Mittelwert/Standardabweichung des Sentiments."""
+        i0, i1 = self._rows(start, end)
+        result = pd.DataFrame(
+            {m: self.prefix[m][i1] - self.prefix[m][i0] for m in CUBE_MEASURES},
+            index=pd.Index(self.tickers, name="ticker")
+        )
+        n = result["article_count"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result["sentiment_mean"] = result["sentiment_sum"] / n
+            var = (result["sentiment_sumsq"] - result["sentiment_sum"] ** 2 / n) / (n - 1)
+        result["sentiment_std"] = np.sqrt(var.clip(lower=0)).where(n > 1)
+        return result.reset_index()
+
+    def frame(self, start=None, end=None, tickers=None):
+        """Langformat (ticker, date, Kennzahlen) für alle Tage mit Artikeln im Zeitraum."""
+        i0, i1 = self._rows(start, end)
+        if tickers is None:
+            cols = np.arange(len(self.tickers))
+        else:
+            cols = np.array([self.tickers.index(t) for t in tickers if t in self.tickers], dtype=np.int64)
+        rows, picked = np.nonzero(self.daily["article_count"][i0:i1, cols])
+        result = pd.DataFrame({
+            "ticker": np.asarray(self.tickers, dtype=object)[cols[picked]],
+            "date": self.dates[i0:i1][rows]
+        })
+        for measure in CUBE_MEASURES:
+            result[measure] = self.daily[measure][i0:i1, cols][rows, picked]
+        result["sentiment_mean"] = result["sentiment_sum"] / result["article_count"]
+        return result.sort_values(["ticker", "date"], ignore_index=True)
+
+
+def main(dummy=False):
+    dataset_dir, fallback_csv, cube_dir = (
+        (DUMMY_SENTIMENT_DATASET_DIR, DUMMY_FULL_SENTIMENT_FILE, DUMMY_DAILY_CUBE_DATASET_DIR) if dummy
+        else (SENTIMENT_DATASET_DIR, FULL_SENTIMENT_FILE, DAILY_CUBE_DATASET_DIR)
+    )
+    df = read_sentiment(
+        columns=["date", "ticker", "title", "description", "sentiment_score"] + TAG_COLUMNS,
+        dataset_dir=dataset_dir, fallback_csv=fallback_csv
+    )
+    cube = build_cube(df)
+    write_cube(cube, cube_dir)
+    print(f"✅ Tages-Würfel: {len(cube)} Zeilen (Ticker × Tag) → {cube_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tages-Würfel (Ticker × Tag) aus den bewerteten Artikeln neu aufbauen")
+    parser.add_argument("--dummy", action="store_true", help="Dummy-Daten statt Live-Daten verwenden")
+    args = parser.parse_args()
+    main(dummy=args.dummy)
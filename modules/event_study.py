@@ -0,0 +1,116 @@
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    Z_SCORE_FILE,
+    EVENT_STUDY_FILE,
+    EVENT_STUDY_CAAR_FILE,
+    DUMMY_Z_SCORE_FILE,
+    DUMMY_EVENT_STUDY_FILE,
+    DUMMY_EVENT_STUDY_CAAR_FILE
+)
+from modules.price_matrix import open_price_matrix
+
+# === Event-Study: abnormale Renditen rund um Emoquake-Schocks (|z| ≥ Schwelle) ===
+# Abnormale Rendite = Rendite − gleichgewichteter Durchschnitt aller Ticker (DAX-Benchmark).
+# Alle Ereignisfenster entstehen auf einmal per Index-Arithmetik: Zeile (Sitzung) + Offset × Spalte (Ticker).
+
+Z_SHOCK_THRESHOLD = 2.0
+PRE_DAYS = 5
+POST_DAYS = 10
+
+
+def load_events(z_file=Z_SCORE_FILE, threshold=Z_SHOCK_THRESHOLD):
+    df = pd.read_csv(z_file, usecols=["ticker", "date", "z_score"], parse_dates=["date"], dtype={"ticker": str})
+    events = df[df["z_score"].abs() >= threshold].copy()
+    events["direction"] = np.where(events["z_score"] > 0, "positive", "negative")
+    return events.reset_index(drop=True)
+
+
+def abnormal_returns(prices):
+    """date × ticker-Matrix der abnormalen Renditen gegenüber dem gleichgewichteten Durchschnitt."""
+    returns = prices.returns("adj_close")
+    with np.errstate(all="ignore"):
+        observed = ~np.isnan(returns)
+        benchmark = np.where(observed, returns, 0.0).sum(axis=1) / observed.sum(axis=1)
+    return returns - benchmark[:, None]
+
+
+def event_windows(ar, rows, cols, pre=PRE_DAYS, post=POST_DAYS):
+    """(Offsets, Ereignisse × Offsets) der abnormalen Renditen; außerhalb der Kurshistorie NaN."""
+    offsets = np.arange(-pre, post + 1)
+    idx = rows[:, None] + offsets[None, :]
+    inside = (idx >= 0) & (idx < ar.shape[0])
+    windows = ar[np.clip(idx, 0, ar.shape[0] - 1), cols[:, None]]
+    return offsets, np.where(inside, windows, np.nan)
+
+
+def run_event_study(events, prices, pre=PRE_DAYS, post=POST_DAYS):
+    """CAR je Ereignis und durchschnittlicher CAR-Verlauf (CAAR) je Richtung.
+
+    Tag 0 ist die erste Sitzung am oder nach dem Schock-Tag. Fehlende Kurse im Fenster zählen als 0;
+    `window_complete` markiert Ereignisse, deren Fenster vollständig in der Kurshistorie liegt.
+    """
+    ticker_pos = pd.Series(np.arange(len(prices.tickers)), index=prices.tickers)
+    cols = events["ticker"].map(ticker_pos)
+    rows = prices.dates.searchsorted(events["date"].to_numpy(), side="left")
+    usable = cols.notna().to_numpy() & (rows < len(prices.dates))
+    events = events[usable].reset_index(drop=True)
+    rows, cols = rows[usable], cols[usable].to_numpy(dtype=np.int64)
+
+    offsets, windows = event_windows(abnormal_returns(prices), rows, cols, pre, post)
+    car = np.nancumsum(windows, axis=1)
+
+    result = events.assign(
+        event_date=prices.dates[rows],
+        car_pre=np.nansum(windows[:, offsets < 0], axis=1),
+        car_post=np.nansum(windows[:, offsets >= 0], axis=1),
+        car=car[:, -1],
+        window_complete=(rows - pre >= 0) & (rows + post < len(prices.dates))
+    )
+
+    caar = []
+    for direction, mask in (("all", np.ones(len(result), dtype=bool)),
+                            ("positive", (result["direction"] == "positive").to_numpy()),
+                            ("negative", (result["direction"] == "negative").to_numpy())):
+        paths = car[mask & result["window_complete"].to_numpy()]
+        n = len(paths)
+        with np.errstate(all="ignore"):
+            mean = paths.mean(axis=0) if n else np.full(len(offsets), np.nan)
+            std = paths.std(axis=0, ddof=1) if n > 1 else np.full(len(offsets), np.nan)
+            t_stat = np.where(std > 0, mean / (std / np.sqrt(n)), np.nan)
+        caar.append(pd.DataFrame({"direction": direction, "offset": offsets, "caar": mean, "t_stat": t_stat, "n": n}))
+    return result, pd.concat(caar, ignore_index=True)
+
+
+def main(dummy=False, pre=PRE_DAYS, post=POST_DAYS, threshold=Z_SHOCK_THRESHOLD):
+    z_file, out_file, caar_file = (
+        (DUMMY_Z_SCORE_FILE, DUMMY_EVENT_STUDY_FILE, DUMMY_EVENT_STUDY_CAAR_FILE) if dummy
+        else (Z_SCORE_FILE, EVENT_STUDY_FILE, EVENT_STUDY_CAAR_FILE)
+    )
+    if not Path(z_file).exists():
+        raise FileNotFoundError(f"{z_file} not found. Run z_score_engine.py first.")
+
+    events = load_events(z_file, threshold)
+    result, caar = run_event_study(events, open_price_matrix(), pre, post)
+    result.to_csv(out_file, index=False)
+    caar.to_csv(caar_file, index=False)
+
+    print(f"✅ Event-Study: {len(result)} von {len(events)} Schocks (|z| ≥ {threshold:g}) mit Kursdaten → {out_file}")
+    final = caar[caar["offset"] == post].set_index("direction")
+    for direction, row in final.iterrows():
+        print(f"   CAAR[{-pre}..+{post}] {direction}: {row['caar']:+.4f} (t = {row['t_stat']:.2f}, n = {int(row['n'])})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kumulierte abnormale Renditen rund um Z-Score-Schocks")
+    parser.add_argument("--dummy", action="store_true", help="Dummy-Z-Scores statt Live-Daten verwenden")
+    parser.add_argument("--pre", type=int, default=PRE_DAYS, help="Handelstage vor dem Ereignis")
+    parser.add_argument("--post", type=int, default=POST_DAYS, help="Handelstage nach dem Ereignis")
+    parser.add_argument("--threshold", type=float, default=Z_SHOCK_THRESHOLD, help="Schwelle für |z_score|")
+    args = parser.parse_args()
+    main(dummy=args.dummy, pre=args.pre, post=args.post, threshold=args.threshold)
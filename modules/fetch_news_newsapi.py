@@ -1,10 +1,8 @@
-import os
 import sys
 import time
-import json
 import random
+import argparse
 import datetime
-import pandas as pd
 import logging
 from tqdm import tqdm
 from pathlib import Path
@@ -13,98 +11,88 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from config import (
     COMPANY_INFO,
-    RAW_NEWS_DIR,
     NEWSAPI_KEY,
-    get_news_filename
+    setup_logging
 )
+from modules.article_store import append_articles
 
-
-# === Logging Setup ===
-LOG_DIR = Path("logs")
-os.makedirs(LOG_DIR, exist_ok=True)
-os.makedirs(RAW_NEWS_DIR, exist_ok=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_DIR / "newsapi_fetch.log"),
-        logging.StreamHandler()
-    ]
-)
+# Logging wird erst im __main__-Block bzw. vom Pipeline-Worker eingerichtet (Import ohne Nebenwirkungen)
 logger = logging.getLogger(__name__)
 
-# === NewsAPI Setup ===
-from newsapi import NewsApiClient
-newsapi = NewsApiClient(api_key=NEWSAPI_KEY)
-
-# === Date Range Setup ===
-today = datetime.datetime.now(datetime.timezone.utc)
-thirty_days_ago = today - datetime.timedelta(days=30)
-today_str = today.strftime("%Y-%m-%d")
-thirty_days_ago_str = thirty_days_ago.strftime("%Y-%m-%d")
-
 # === Sources and Domains to Filter ===
 SOURCES = 'cnbc,reuters,bloomberg,the-wall-street-journal,yahoo-finance,business-insider,fortune'
 DOMAINS = 'cnbc.com,reuters.com,bloomberg.com,wsj.com,finance.yahoo.com,businessinsider.com,fortune.com'
 
 
+# === NewsAPI Setup (Client erst beim Abruf) ===
+def create_client(api_key=NEWSAPI_KEY):
+    from newsapi import NewsApiClient
+    return NewsApiClient(api_key=api_key)
+
+
+def fetch_company_news(client, ticker, company_name, from_date, to_date):
+    """Artikel eines Unternehmens im Format des Artikelspeichers."""
+    all_articles = client.get_everything(
+        q=company_name,
+        sources=SOURCES,
+        domains=DOMAINS,
+        from_param=from_date,
+        to=to_date,
+        sort_by='relevancy',
+        language='en'
+    )
+
+    filtered_articles = []
+    for article in all_articles.get('articles', []):
+        published_at = article.get('publishedAt')
+        if not published_at:
+            continue
+
+        filtered_articles.append({
+            "date": published_at[:10],
+            "ticker": ticker,
+            "company_name": company_name,
+            "title": article.get("title"),
+            "description": article.get("description"),
+            "url": article.get("url"),
+            "source": article.get("source", {}).get("name"),
+            "sentiment_score": None  # Platzhalter für spätere Analyse
+        })
+    return filtered_articles
+
+
 # === Fetch Articles per Company ===
-for ticker, info in tqdm(COMPANY_INFO.items(), desc="🔍 Fetching news"):
-    try:
+def fetch_all(client, from_date, to_date, companies=COMPANY_INFO):
+    """Ruft alle Unternehmen nacheinander ab und hängt neue Artikel an; gibt die Anzahl neuer Artikel zurück."""
+    added = 0
+    for ticker, info in tqdm(companies.items(), desc="🔍 Fetching news"):
         company_name = info["name"]
+        try:
+            articles = fetch_company_news(client, ticker, company_name, from_date, to_date)
+
+            # === Append new Articles (dedup by URL) ===
+            new_count, total_count = append_articles(ticker, articles)
+            added += new_count
+            logger.info(f"💾 {ticker}: {new_count} new | {total_count} total")
+
+        except Exception as e:
+            logger.error(f"❌ Error fetching news for {company_name}: {e}")
+
+        time.sleep(random.uniform(2.5, 3.5))  # Rate limit safety
+    return added
+
+
+def main(days=30):
+    # === Date Range Setup ===
+    today = datetime.datetime.now(datetime.timezone.utc)
+    from_date = (today - datetime.timedelta(days=days)).strftime("%Y-%m-%d")
+    to_date = today.strftime("%Y-%m-%d")
+    return fetch_all(create_client(), from_date, to_date)
+
 
-        all_articles = newsapi.get_everything(
-            q=company_name,
-            sources=SOURCES,
-            domains=DOMAINS,
-            from_param=thirty_days_ago_str,
-            to=today_str,
-            sort_by='relevancy',
-            language='en'
-        )
-
-        articles = all_articles.get('articles', [])
-        filtered_articles = []
-
-        for article in articles:
-            published_at = article.get('publishedAt')
-            if not published_at:
-                continue
-
-            filtered_articles.append({
-                "date": published_at[:10],
-                "ticker": ticker,
-                "company_name": company_name,
-                "title": article.get("title"),
-                "description": article.get("description"),
-                "url": article.get("url"),
-                "source": article.get("source", {}).get("name"),
-                "sentiment_score": None  # Platzhalter für spätere Analyse
-            })
-
-        file_path = get_news_filename(ticker)
-
-        # === Load Existing Articles ===
-        if os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8") as f:
-                existing_articles = json.load(f)
-        else:
-            existing_articles = []
-
-        # === Combine and Deduplicate by URL ===
-        all_combined = existing_articles + filtered_articles
-        df_all = pd.DataFrame(all_combined)
-        df_all.drop_duplicates(subset=["url"], inplace=True)
-        deduped_articles = df_all.to_dict(orient="records")
-
-        # === Save to JSON ===
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(deduped_articles, f, indent=2, ensure_ascii=False)
-
-        logger.info(f"💾 {ticker}: {len(filtered_articles)} new | {len(deduped_articles)} total in {file_path}")
-
-    except Exception as e:
-        logger.error(f"❌ Error fetching news for {company_name}: {e}")
-
-    time.sleep(random.uniform(2.5, 3.5))  # Rate limit safety
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NewsAPI Abruf für alle Unternehmen")
+    parser.add_argument("--days", type=int, default=30, help="Abrufzeitraum in Tagen")
+    args = parser.parse_args()
+    setup_logging("newsapi_fetch.log")
+    main(days=args.days)
@@ -1,32 +1,55 @@
-import os
-import json
+import sys
 import datetime
 import requests
 import time
 import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from pathlib import Path
 from tqdm import tqdm
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from config import (
     NEWSDATA_API_KEY,
+    NEWSDATA_REQUESTS_PER_SECOND,
+    NEWSDATA_MAX_WORKERS,
     RAW_NEWS_DIR,
     COMPANY_INFO,
-    get_news_filename
+    setup_logging
 )
+from modules.article_store import append_articles
 
-# === Logging Setup ===
-LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(os.path.join(LOG_DIR, "fetch_news_newsdata.log")),
-        logging.StreamHandler()
-    ]
-)
+# Logging wird erst im __main__-Block bzw. vom Pipeline-Worker eingerichtet (Import ohne Nebenwirkungen)
 logger = logging.getLogger(__name__)
 
-def fetch_news_for_company(company_name, from_date, to_date):
-    url = "https://newsdata.io/api/1/news"
+NEWSDATA_URL = "https://newsdata.io/api/1/news"
+
+# === HTTP-Session mit Connection-Pool ===
+def create_session(pool_size=NEWSDATA_MAX_WORKERS):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# === Rate-Limit: gleichmäßig verteilte Slots statt fixer Pause ===
+class RateLimiter:
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def acquire(self):
+        with self._lock:
+            slot = max(self._next_slot, time.monotonic())
+            self._next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+def fetch_news_for_company(company_name, from_date, to_date, session=None, url=NEWSDATA_URL):
+    http = session or requests
     params = {
         "apikey": NEWSDATA_API_KEY,
         "q": company_name,
@@ -35,7 +58,7 @@ def fetch_news_for_company(company_name, from_date, to_date):
         "to_date": to_date
     }
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = http.get(url, params=params, timeout=10)
         if response.status_code == 200:
             return response.json().get("results", [])
         else:
@@ -46,8 +69,6 @@ def fetch_news_for_company(company_name, from_date, to_date):
         return []
 
 def save_articles(ticker, company_name, articles_raw):
-    file_path = get_news_filename(ticker)
-
     # Standardisieren & Filtern
     new_articles = []
     for a in articles_raw:
@@ -64,39 +85,75 @@ def save_articles(ticker, company_name, articles_raw):
             "sentiment_score": None
         })
 
-    # Existierende laden
-    if os.path.exists(file_path):
-        with open(file_path, "r", encoding="utf-8") as f:
-            existing = json.load(f)
-    else:
-        existing = []
+    # Nur unbekannte URLs werden als neues Segment angehängt
+    return append_articles(ticker, new_articles)
+
+def fetch_news_concurrent(companies, from_date, to_date,
+                          requests_per_second=NEWSDATA_REQUESTS_PER_SECOND,
+                          max_workers=NEWSDATA_MAX_WORKERS,
+                          url=NEWSDATA_URL):
+    """Liefert (ticker, company_name, articles) in der Reihenfolge, in der die Antworten eintreffen."""
+    limiter = RateLimiter(requests_per_second)
 
-    # Dedup nach URL
-    all_combined = existing + new_articles
-    deduped = {a["url"]: a for a in all_combined if a["url"]}
-    final_articles = list(deduped.values())
+    def fetch(ticker, company_name):
+        limiter.acquire()
+        return ticker, company_name, fetch_news_for_company(
+            company_name, from_date, to_date, session=session, url=url
+        )
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(final_articles, f, ensure_ascii=False, indent=2)
+    with create_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(fetch, ticker, info["name"]) for ticker, info in companies.items()]
+        for future in as_completed(futures):
+            yield future.result()
 
-    return len(new_articles), len(final_articles)
+def store_result(ticker, company_name, articles):
+    if articles:
+        new_count, total_count = save_articles(ticker, company_name, articles)
+        logger.info(f"✅ {ticker}: +{new_count} neue Artikel (insg. {total_count})")
+    else:
+        logger.info(f"➖ {ticker}: keine neuen Artikel")
 
-def main(from_days_ago=1):
+def main(from_days_ago=1, concurrent=False,
+         requests_per_second=NEWSDATA_REQUESTS_PER_SECOND,
+         max_workers=NEWSDATA_MAX_WORKERS,
+         url=NEWSDATA_URL):
     today = datetime.date.today()
     from_date = (today - datetime.timedelta(days=from_days_ago)).isoformat()
     to_date = today.isoformat()
 
     logger.info(f"🔎 Starte Abruf von News ({from_date} bis {to_date})")
 
+    if concurrent:
+        # Ergebnisse werden im Hauptthread gespeichert, sobald sie eintreffen
+        results = fetch_news_concurrent(
+            COMPANY_INFO, from_date, to_date,
+            requests_per_second=requests_per_second,
+            max_workers=max_workers,
+            url=url
+        )
+        for ticker, company_name, articles in tqdm(results, total=len(COMPANY_INFO), desc="🔍 Unternehmen"):
+            store_result(ticker, company_name, articles)
+        return
+
     for ticker, info in tqdm(COMPANY_INFO.items(), desc="🔍 Unternehmen"):
         company_name = info["name"]
-        articles = fetch_news_for_company(company_name, from_date, to_date)
-        if articles:
-            new_count, total_count = save_articles(ticker, company_name, articles)
-            logger.info(f"✅ {ticker}: +{new_count} neue Artikel (insg. {total_count})")
-        else:
-            logger.info(f"➖ {ticker}: keine neuen Artikel")
+        articles = fetch_news_for_company(company_name, from_date, to_date, url=url)
+        store_result(ticker, company_name, articles)
         time.sleep(1.5)  # API-Schonung
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Newsdata.io Abruf für alle Unternehmen")
+    parser.add_argument("--days", type=int, default=1, help="Abrufzeitraum in Tagen")
+    parser.add_argument("--concurrent", action="store_true", help="Parallele Requests mit gemeinsamem Session-Pool")
+    parser.add_argument("--rps", type=float, default=NEWSDATA_REQUESTS_PER_SECOND, help="Requests pro Sekunde")
+    parser.add_argument("--workers", type=int, default=NEWSDATA_MAX_WORKERS, help="Anzahl paralleler Verbindungen")
+    parser.add_argument("--url", default=NEWSDATA_URL, help="API-Endpunkt (z. B. lokaler Stub-Server)")
+    args = parser.parse_args()
+    setup_logging("fetch_news_newsdata.log")
+    main(
+        from_days_ago=args.days,
+        concurrent=args.concurrent,
+        requests_per_second=args.rps,
+        max_workers=args.workers,
+        url=args.url
+    )
@@ -1,83 +1,230 @@
 import os
+import json
+import argparse
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta
 from pathlib import Path
 import sys
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from config import (
-    get_stock_price_filename,
     STOCK_PRICE_DIR,
+    STOCK_PRICE_META_FILE,
     START_DATE,
-    END_DATE,
     get_all_tickers,
-    COMPANY_INFO
+    COMPANY_INFO,
+    setup_logging
 )
 
 import logging
 
-# === Logging Setup ===
-LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
-LOG_FILE = os.path.join(LOG_DIR, "price_update.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+# === Kurs-Stufe: Import ohne Nebenwirkungen (yfinance wird erst beim Abruf geladen) ===
+# Ziel ist ein Verzeichnis mit einer CSV je Ticker ({ticker}.csv) plus _meta.json.
 
-# === Zielverzeichnis sicherstellen ===
-os.makedirs(STOCK_PRICE_DIR, exist_ok=True)
+# === Spaltenreihenfolge der Kurs-CSVs ===
+PRICE_COLUMNS = ["Date", "Adj Close", "Close", "High", "Low", "Open", "Volume", "Company", "Ticker"]
 
-# === Ticker mit ".DE" verwenden ===
-tickers = get_all_tickers(with_suffix=True)
+# Maximal so viele Ticker pro Sammelabruf
+BATCH_SIZE = 50
 
-for ticker in tickers:
-    ticker_short = ticker.replace(".DE", "")
-    company_name = COMPANY_INFO.get(ticker_short, {}).get("name", ticker_short)
-    try:
-        file_path = get_stock_price_filename(ticker)
-
-        # 1. Prüfen, ob Datei existiert → Startdatum setzen
-        if os.path.exists(file_path):
-            existing_df = pd.read_csv(file_path, parse_dates=["Date"])
-            last_date = existing_df["Date"].max()
-            fetch_start = (pd.to_datetime(last_date) + timedelta(days=1)).date()
-            logging.info(f"📂 {ticker}: Daten vorhanden. Letzter Tag: {last_date.date()}. Abruf ab {fetch_start}")
+logger = logging.getLogger(__name__)
+
+
+# === Metadaten: letzter Tag & Dateigröße je Ticker ===
+def load_meta(path=STOCK_PRICE_META_FILE):
+    if not Path(path).exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_meta(meta, path=STOCK_PRICE_META_FILE):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def read_last_line(file_path, chunk_size=4096):
+    """Liest nur das Dateiende bis zum letzten Zeilenumbruch – unabhängig von der Dateigröße."""
+    with open(file_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        while pos > 0:
+            step = min(chunk_size, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            if tail.rstrip(b"\r\n").count(b"\n") >= 1:
+                break
+    lines = tail.rstrip(b"\r\n").splitlines()
+    return lines[-1].decode("utf-8") if lines else ""
+
+
+def read_header(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        return f.readline().rstrip("\r\n").split(",")
+
+
+def price_file(ticker, price_dir=STOCK_PRICE_DIR):
+    return Path(price_dir) / f"{ticker}.csv"
+
+
+def last_price_date(ticker, meta, price_dir=STOCK_PRICE_DIR):
+    """Letzter gespeicherter Handelstag: aus den Metadaten, falls die Dateigröße passt, sonst aus der letzten Zeile."""
+    file_path = price_file(ticker, price_dir)
+    if not file_path.exists():
+        return None
+    entry = meta.get(ticker)
+    if entry and entry.get("size") == file_path.stat().st_size:
+        return pd.Timestamp(entry["last_date"])
+    last_line = read_last_line(file_path)
+    if not last_line or last_line.startswith("Date"):
+        return None
+    return pd.Timestamp(last_line.split(",", 1)[0])
+
+
+def resolve_end(end=None):
+    # Enddatum erst zur Laufzeit bestimmen (lang laufende Prozesse, z. B. Scheduler oder Streamlit)
+    return pd.Timestamp(end if end is not None else datetime.now()).date()
+
+
+def plan_fetches(tickers, meta, end=None, price_dir=STOCK_PRICE_DIR):
+    """Gruppiert Ticker nach gemeinsamem Abruf-Startdatum: {fetch_start: [Ticker]}; `end=None` = jetzt."""
+    fetch_end = resolve_end(end)
+    groups = {}
+    for ticker in tickers:
+        last_date = last_price_date(ticker, meta, price_dir)
+        if last_date is not None:
+            fetch_start = (last_date + timedelta(days=1)).date()
+            logger.info(f"📂 {ticker}: Daten vorhanden. Letzter Tag: {last_date.date()}. Abruf ab {fetch_start}")
         else:
-            existing_df = pd.DataFrame()
             fetch_start = START_DATE.date()
-            logging.info(f"🆕 {ticker}: Keine Datei vorhanden. Abruf ab {fetch_start}")
-
-        fetch_end = END_DATE.date()
+            logger.info(f"🆕 {ticker}: Keine Datei vorhanden. Abruf ab {fetch_start}")
         if fetch_start >= fetch_end:
-            logging.info(f"✅ {ticker}: Keine neuen Daten nötig.")
+            logger.info(f"✅ {ticker}: Keine neuen Daten nötig.")
             continue
+        groups.setdefault(fetch_start, []).append(ticker)
+    return groups
+
 
-        # 2. Abruf
-        df_new = yf.download(ticker, start=fetch_start, end=fetch_end, group_by="column", auto_adjust=False)
-        if isinstance(df_new.columns, pd.MultiIndex):
-            df_new.columns = df_new.columns.get_level_values(0)
-        df_new = df_new.reset_index()
+def yfinance_download(tickers, start, end):
+    import yfinance as yf
+    return yf.download(tickers, start=start, end=end, group_by="ticker", auto_adjust=False,
+                       threads=True, progress=False)
 
-        if df_new.empty:
-            logging.warning(f"⚠️ {ticker}: Keine neuen Daten.")
+
+def split_batch(df, tickers):
+    """Sammelabruf (MultiIndex-Spalten Ticker × Feld oder einfache Spalten bei einem Ticker) → {Ticker: DataFrame}."""
+    frames = {}
+    if df is None or df.empty:
+        return frames
+    for ticker in tickers:
+        if isinstance(df.columns, pd.MultiIndex):
+            if ticker in df.columns.get_level_values(0):
+                part = df[ticker]
+            elif ticker in df.columns.get_level_values(1):
+                part = df.xs(ticker, axis=1, level=1)
+            else:
+                continue
+        elif len(tickers) == 1:
+            part = df
+        else:
             continue
+        part = part.dropna(how="all")
+        if part.empty:
+            continue
+        part = part.rename_axis("Date").reset_index()
+        part["Date"] = pd.to_datetime(part["Date"]).dt.tz_localize(None).dt.normalize()
+        frames[ticker] = part
+    return frames
+
+
+def append_prices(ticker, df_new, last_date=None, price_dir=STOCK_PRICE_DIR):
+    """Hängt neue Zeilen an die Ticker-CSV an, ohne sie neu zu schreiben; gibt (Zeilen, letzter Tag) zurück."""
+    file_path = price_file(ticker, price_dir)
+    ticker_short = ticker.replace(".DE", "")
+    df_new = df_new.copy()
+    df_new["Company"] = COMPANY_INFO.get(ticker_short, {}).get("name", ticker_short)
+    df_new["Ticker"] = ticker
+    if last_date is not None:
+        df_new = df_new[df_new["Date"] > last_date]
+    df_new = df_new.drop_duplicates(subset=["Date"]).sort_values("Date")
+    if df_new.empty:
+        return 0, last_date
+
+    exists = file_path.exists() and file_path.stat().st_size > 0
+    columns = read_header(file_path) if exists else PRICE_COLUMNS
+    df_new = df_new.reindex(columns=columns)
+    df_new["Date"] = df_new["Date"].dt.strftime("%Y-%m-%d")
+
+    if exists:
+        # Fehlenden Zeilenumbruch am Dateiende ergänzen
+        with open(file_path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    df_new.to_csv(file_path, mode="a", header=not exists, index=False)
+    return len(df_new), pd.Timestamp(df_new["Date"].iloc[-1])
+
+
+def refresh_prices(tickers=None, end=None, downloader=yfinance_download, meta_path=None,
+                   price_dir=STOCK_PRICE_DIR):
+    """Aktualisiert alle Ticker mit einem Sammelabruf je gemeinsamem Startdatum; gibt die Anzahl neuer Zeilen zurück.
+
+    `end=None` bedeutet „bis jetzt“ (bei jedem Aufruf neu bestimmt, nicht beim Import von config).
+    `downloader(tickers, start, end)` liefert einen DataFrame im Format von `yf.download`
+    und kann für Tests durch eine lokale Funktion ersetzt werden.
+    """
+    tickers = tickers if tickers is not None else get_all_tickers(with_suffix=True)
+    price_dir = Path(price_dir)
+    meta_path = Path(meta_path) if meta_path is not None else price_dir / STOCK_PRICE_META_FILE.name
+    price_dir.mkdir(parents=True, exist_ok=True)
+    meta = load_meta(meta_path)
+    fetch_end = resolve_end(end)
+    groups = plan_fetches(tickers, meta, fetch_end, price_dir)
+
+    total = 0
+    for fetch_start, group in sorted(groups.items()):
+        for i in range(0, len(group), BATCH_SIZE):
+            batch = group[i:i + BATCH_SIZE]
+            logger.info(f"⬇️ Sammelabruf {len(batch)} Ticker: {fetch_start} → {fetch_end}")
+            try:
+                frames = split_batch(downloader(batch, fetch_start, fetch_end), batch)
+            except Exception as e:
+                logger.error(f"❌ Fehler beim Abruf {batch}: {e}")
+                continue
+
+            for ticker in batch:
+                if ticker not in frames:
+                    logger.warning(f"⚠️ {ticker}: Keine neuen Daten.")
+                    continue
+                try:
+                    added, last_date = append_prices(ticker, frames[ticker], pd.Timestamp(fetch_start) - timedelta(days=1),
+                                                     price_dir)
+                    if added:
+                        file_path = price_file(ticker, price_dir)
+                        meta[ticker] = {"last_date": last_date.strftime("%Y-%m-%d"), "size": file_path.stat().st_size}
+                    total += added
+                    logger.info(f"💾 {ticker}: +{added} Zeilen.")
+                except Exception as e:
+                    logger.error(f"❌ Fehler bei {ticker}: {e}")
+            save_meta(meta, meta_path)
+
+    logger.info(f"✅ Kursdaten aktualisiert: +{total} Zeilen in {len(groups)} Abrufgruppe(n).")
+    return total
 
-        df_new["Company"] = company_name
-        df_new["Ticker"] = ticker
 
-        # 3. Kombinieren & Speichern
-        combined_df = pd.concat([existing_df, df_new], ignore_index=True)
-        combined_df.drop_duplicates(subset=["Date"], inplace=True)
-        combined_df.sort_values("Date", inplace=True)
-        combined_df.to_csv(file_path, index=False)
+def main(tickers=None):
+    return refresh_prices(tickers)
 
-        logging.info(f"💾 {ticker}: +{len(df_new)} Zeilen. Gesamt: {len(combined_df)}")
 
-    except Exception as e:
-        logging.error(f"❌ Fehler bei {ticker}: {e}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kursdaten (yfinance) inkrementell per Sammelabruf aktualisieren")
+    parser.add_argument("--tickers", nargs="+", help="Nur diese Ticker (mit .DE-Suffix) aktualisieren")
+    args = parser.parse_args()
+    setup_logging("price_update.log")
+    main(args.tickers)
@@ -0,0 +1,118 @@
+import re
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import RISK_KEYWORDS, ESG_KEYWORDS
+
+
+class KeywordMatcher:
+    """Eine kompilierte Alternation über alle Keywords; jeder Text wird genau einmal durchsucht.
+
+    `keywords` ist eine Liste oder ein Dict {Kategorie: [Keywords]}. Standard ist Teilstring-Suche
+    ohne Groß-/Kleinschreibung (wie bisher `keyword in text.lower()`); mit `word_boundary=True`
+    zählen nur ganze Wörter. Treffer dürfen sich überlappen (Lookahead), pro Position zählt das
+    längste passende Keyword.
+    """
+
+    def __init__(self, keywords, word_boundary=False, ignore_case=True):
+        groups = keywords if isinstance(keywords, dict) else {None: list(keywords)}
+        self.ignore_case = ignore_case
+        self.groups = list(groups)
+        self.keywords = list(dict.fromkeys(k for words in groups.values() for k in words))
+        self._index = {self._fold(k): i for i, k in enumerate(self.keywords)}
+
+        # Zuordnung Keyword → Kategorie als 0/1-Matrix (Keywords × Kategorien)
+        self._group_matrix = np.zeros((len(self.keywords), len(self.groups)), dtype=np.int64)
+        for g, words in enumerate(groups.values()):
+            for word in words:
+                self._group_matrix[self._index[self._fold(word)], g] = 1
+
+        alternation = "|".join(re.escape(k) for k in sorted(self.keywords, key=len, reverse=True))
+        if word_boundary:
+            alternation = rf"\b(?:{alternation})\b"
+        self.pattern = re.compile(rf"(?=({alternation}))", re.IGNORECASE if ignore_case else 0)
+
+    def _fold(self, text):
+        return text.lower() if self.ignore_case else text
+
+    def counts(self, text):
+        """{keyword: Anzahl Vorkommen} für einen einzelnen Text (nur Keywords mit Treffern)."""
+        found = {}
+        if isinstance(text, str):
+            for match in self.pattern.findall(text):
+                keyword = self.keywords[self._index[self._fold(match)]]
+                found[keyword] = found.get(keyword, 0) + 1
+        return found
+
+    def count_matrix(self, texts):
+        """Vorkommen je Text und Keyword als Matrix (Texte × Keywords)."""
+        strings = [t if isinstance(t, str) else "" for t in pd.Series(texts, dtype=object).to_numpy()]
+        result = np.zeros((len(strings), len(self.keywords)), dtype=np.int64)
+        if not strings:
+            return result
+
+        # Alle Texte mit \0 getrennt in einem einzigen Durchlauf scannen; Trefferposition → Zeile
+        starts = np.zeros(len(strings), dtype=np.int64)
+        np.cumsum([len(s) + 1 for s in strings[:-1]], out=starts[1:])
+        positions, columns = [], []
+        for match in self.pattern.finditer("\0".join(strings)):
+            positions.append(match.start())
+            columns.append(self._index[self._fold(match.group(1))])
+        if positions:
+            rows = np.searchsorted(starts, positions, side="right") - 1
+            np.add.at(result, (rows, np.asarray(columns, dtype=np.int64)), 1)
+        return result
+
+    def count_distinct(self, texts):
+        """Anzahl unterschiedlicher Keywords je Text."""
+        return (self.count_matrix(texts) > 0).sum(axis=1)
+
+    def group_counts(self, texts):
+        """Anzahl unterschiedlicher Keywords je Text und Kategorie als DataFrame (Spalten = Kategorien)."""
+        texts = pd.Series(texts, dtype=object)
+        present = (self.count_matrix(texts) > 0).astype(np.int64)
+        return pd.DataFrame(present @ self._group_matrix, columns=self.groups, index=texts.index)
+
+    def matches_any(self, texts, groups=None):
+        """Bool-Array: Text enthält mindestens ein Keyword (optional nur aus den angegebenen Kategorien)."""
+        counts = self.group_counts(texts)
+        if groups is not None:
+            counts = counts[[g for g in groups if g in counts.columns]]
+        return counts.sum(axis=1).to_numpy() > 0
+
+
+# === Gemeinsame Matcher für Krisendruck und ESG-Themen ===
+RISK_MATCHER = KeywordMatcher(RISK_KEYWORDS)
+ESG_MATCHER = KeywordMatcher(ESG_KEYWORDS)
+
+# === Ingest-Tags: einmal pro Artikel berechnet und als kompakte Spalten gespeichert ===
+ESG_BITS = {"E": 1, "S": 2, "G": 4}
+TAG_COLUMNS = ["risk_hits", "esg_mask", "esg_e", "esg_s", "esg_g"]
+
+
+def keyword_tags(df):
+    """Risiko-Treffer (Titel + Beschreibung), ESG-Bitmaske (E=1, S=2, G=4) und ESG-Treffer je Kategorie."""
+    title = df["title"].fillna("").astype(str)
+    description = df["description"].fillna("").astype(str)
+    esg = ESG_MATCHER.group_counts(title + " " + description)
+    mask = np.zeros(len(title), dtype=np.int8)
+    for category, bit in ESG_BITS.items():
+        mask |= np.where(esg[category].to_numpy() > 0, bit, 0).astype(np.int8)
+    return pd.DataFrame({
+        "risk_hits": (RISK_MATCHER.count_distinct(title) + RISK_MATCHER.count_distinct(description)).astype(np.int16),
+        "esg_mask": mask,
+        "esg_e": esg["E"].to_numpy(dtype=np.int8),
+        "esg_s": esg["S"].to_numpy(dtype=np.int8),
+        "esg_g": esg["G"].to_numpy(dtype=np.int8)
+    }, index=title.index)
+
+
+def has_tags(df):
+    return all(col in df.columns for col in TAG_COLUMNS) and not df[TAG_COLUMNS].isna().any().any()
+
+
+def esg_mask_for(categories):
+    return sum(ESG_BITS[c] for c in categories)
@@ -0,0 +1,207 @@
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    DAILY_CUBE_DATASET_DIR,
+    SENTIMENT_DATASET_DIR,
+    FULL_SENTIMENT_FILE,
+    SENTIMENT_PRICE_PANEL_DIR,
+    LEAD_LAG_DATASET_DIR,
+    LEAD_LAG_SUMMARY_FILE,
+    DUMMY_DAILY_CUBE_DATASET_DIR,
+    DUMMY_SENTIMENT_DATASET_DIR,
+    DUMMY_FULL_SENTIMENT_FILE,
+    DUMMY_SENTIMENT_PRICE_PANEL_DIR,
+    DUMMY_LEAD_LAG_DATASET_DIR,
+    DUMMY_LEAD_LAG_SUMMARY_FILE
+)
+from modules.processed_store import read_panel, write_panel, write_lead_lag
+from modules.asof_join import asof_join, load_daily_sentiment, load_prices
+
+# === Lead/Lag: Korrelation Tages-Sentiment ↔ kumulierte k-Tage-Rendite (k = −5 … +5) ===
+# Lag k > 0: Sentiment am Tag t vs. Rendite über die Handelstage t+1 … t+k (Sentiment läuft voraus);
+# k < 0: vs. Rendite über t+k … t−1 (Kurs läuft voraus); k = 0: Rendite am Tag t.
+# Rollierendes Pearson aus kumulativen Summen, Spearman (mittlere Ränge) über Fenster-Views (sliding_window_view);
+# nur Tage, an denen beide Werte vorliegen, zählen.
+
+LAGS = list(range(-5, 6))
+CORR_WINDOW = 60       # Handelstage
+CORR_MIN_PERIODS = 20
+
+# Streuungen darunter gelten als 0 → keine Korrelation
+_VAR_EPS = 1e-12
+
+
+def session_matrices(panel):
+    """(Handelstage, Ticker, Sentiment-Matrix, Rendite-Matrix) aus dem Sentiment-Kurs-Panel."""
+    dates = pd.DatetimeIndex(np.sort(pd.to_datetime(panel["date"]).unique()))
+    tickers = sorted(panel["ticker"].astype(str).unique())
+    rows = dates.get_indexer(pd.to_datetime(panel["date"]))
+    cols = pd.Index(tickers).get_indexer(panel["ticker"].astype(str))
+    sentiment = np.full((len(dates), len(tickers)), np.nan)
+    returns = np.full((len(dates), len(tickers)), np.nan)
+    sentiment[rows, cols] = panel["sentiment_mean"].to_numpy(dtype=np.float64)
+    returns[rows, cols] = panel["return"].to_numpy(dtype=np.float64)
+    return dates, tickers, sentiment, returns
+
+
+def _prefix(values):
+    out = np.zeros((values.shape[0] + 1,) + values.shape[1:], dtype=np.float64)
+    np.cumsum(values, axis=0, out=out[1:])
+    return out
+
+
+def horizon_returns(returns, k):
+    """Zeile t enthält die kumulierte Rendite über t+1 … t+k (k > 0) bzw. t+k … t−1 (k < 0); k = 0: Tag t.
+
+    Summe der Log-Renditen aus Präfixsummen; fehlt ein Tag im Zeitraum oder liegt er außerhalb, ist das Ergebnis NaN.
+    """
+    if k == 0:
+        return returns.copy()
+    observed = ~np.isnan(returns)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_sum = _prefix(np.where(observed, np.log1p(returns), 0.0))
+    missing = _prefix((~observed).astype(np.float64))
+
+    n_rows = returns.shape[0]
+    t = np.arange(n_rows)
+    first, last = (t + 1, t + k) if k > 0 else (t + k, t - 1)
+    valid = (first >= 0) & (last <= n_rows - 1)
+    lo, hi = np.clip(first, 0, n_rows), np.clip(last + 1, 0, n_rows)
+
+    out = np.full_like(returns, np.nan)
+    span_ok = valid[:, None] & (missing[hi] - missing[lo] == 0)
+    out[span_ok] = np.expm1(log_sum[hi] - log_sum[lo])[span_ok]
+    return out
+
+
+def rolling_pearson(x, y, window=CORR_WINDOW, min_periods=CORR_MIN_PERIODS):
+    """(Korrelation, Anzahl) je Zelle über die letzten `window` Zeilen, paarweise vollständig."""
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    # Spaltenweise zentrieren: senkt die Auslöschung in den Quadratsummen
+    with np.errstate(all="ignore"):
+        cx = np.nan_to_num(np.nanmean(np.where(valid, x, np.nan), axis=0))
+        cy = np.nan_to_num(np.nanmean(np.where(valid, y, np.nan), axis=0))
+    xv = np.where(valid, x - cx, 0.0)
+    yv = np.where(valid, y - cy, 0.0)
+
+    sums = [_prefix(v) for v in (valid.astype(np.float64), xv, yv, xv * xv, yv * yv, xv * yv)]
+    end = np.arange(1, x.shape[0] + 1)
+    start = np.maximum(end - window, 0)
+    n, sx, sy, sxx, syy, sxy = (s[end] - s[start] for s in sums)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vx = sxx - sx * sx / n
+        vy = syy - sy * sy / n
+        r = (sxy - sx * sy / n) / np.sqrt(vx * vy)
+    ok = (n >= max(min_periods, 2)) & (vx > _VAR_EPS) & (vy > _VAR_EPS)
+    return np.where(ok, np.clip(r, -1.0, 1.0), np.nan), n
+
+
+def _average_ranks(values):
+    """Ränge (0-basiert) entlang der letzten Achse; Bindungen erhalten den mittleren Rang."""
+    order = np.argsort(values, axis=-1, kind="stable")
+    ordered = np.take_along_axis(values, order, axis=-1)
+    pos = np.broadcast_to(np.arange(values.shape[-1]), values.shape)
+    new_group = np.ones(values.shape, dtype=bool)
+    new_group[..., 1:] = ordered[..., 1:] != ordered[..., :-1]
+    first = np.maximum.accumulate(np.where(new_group, pos, 0), axis=-1)
+    group_end = np.ones(values.shape, dtype=bool)
+    group_end[..., :-1] = new_group[..., 1:]
+    last = np.where(group_end, pos, values.shape[-1] - 1)
+    last = np.flip(np.minimum.accumulate(np.flip(last, axis=-1), axis=-1), axis=-1)
+    ranks = np.empty(values.shape, dtype=np.float64)
+    np.put_along_axis(ranks, order, (first + last) / 2.0, axis=-1)
+    return ranks
+
+
+def _spearman_last_axis(xs, ys, min_periods):
+    """Spearman entlang der letzten Achse über gültige Paare; ungültige Paare werden ans Ende sortiert."""
+    valid = ~np.isnan(xs) & ~np.isnan(ys)
+    rx = _average_ranks(np.where(valid, xs, np.inf))
+    ry = _average_ranks(np.where(valid, ys, np.inf))
+    n = valid.sum(axis=-1).astype(np.float64)
+    # Gültige Werte belegen die Ränge 0 … n−1, ihr Mittel ist (n − 1) / 2
+    mean = ((n - 1.0) / 2.0)[..., None]
+    dx = np.where(valid, rx - mean, 0.0)
+    dy = np.where(valid, ry - mean, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vx = (dx * dx).sum(axis=-1)
+        vy = (dy * dy).sum(axis=-1)
+        rho = (dx * dy).sum(axis=-1) / np.sqrt(vx * vy)
+    ok = (n >= max(min_periods, 2)) & (vx > 0) & (vy > 0)
+    return np.where(ok, np.clip(rho, -1.0, 1.0), np.nan)
+
+
+def rolling_spearman(x, y, window=CORR_WINDOW, min_periods=CORR_MIN_PERIODS):
+    """Spearman je Zelle über die letzten `window` Zeilen (Views, keine Kopie pro Fenster)."""
+    pad = np.full((window - 1, x.shape[1]), np.nan)
+    xs = sliding_window_view(np.vstack([pad, x]), window, axis=0)  # (Zeilen, Ticker, Fenster)
+    ys = sliding_window_view(np.vstack([pad, y]), window, axis=0)
+    return _spearman_last_axis(xs, ys, min_periods)
+
+
+def lead_lag(panel, lags=LAGS, window=CORR_WINDOW, min_periods=CORR_MIN_PERIODS):
+    """Rollierende Korrelationen (Langformat) und Gesamtzeitraum-Matrix (Ticker × Lag)."""
+    dates, tickers, sentiment, returns = session_matrices(panel)
+    rolling, summary = [], []
+    for k in lags:
+        shifted = horizon_returns(returns, k)
+        pearson, n = rolling_pearson(sentiment, shifted, window, min_periods)
+        spearman = rolling_spearman(sentiment, shifted, window, min_periods)
+        rows, cols = np.nonzero(~np.isnan(pearson) | ~np.isnan(spearman))
+        rolling.append(pd.DataFrame({
+            "ticker": np.asarray(tickers, dtype=object)[cols],
+            "date": dates[rows],
+            "lag": k,
+            "pearson": pearson[rows, cols],
+            "spearman": spearman[rows, cols],
+            "n": n[rows, cols].astype(np.int64)
+        }))
+
+        # Gesamtzeitraum: ein Fenster über alle Handelstage
+        full_pearson, full_n = rolling_pearson(sentiment, shifted, len(dates), min_periods)
+        summary.append(pd.DataFrame({
+            "ticker": tickers,
+            "lag": k,
+            "pearson": full_pearson[-1],
+            "spearman": _spearman_last_axis(sentiment.T, shifted.T, min_periods),
+            "n": full_n[-1].astype(np.int64)
+        }))
+    rolling = pd.concat(rolling, ignore_index=True).sort_values(["ticker", "date", "lag"], ignore_index=True)
+    return rolling, pd.concat(summary, ignore_index=True)
+
+
+def load_panel(panel_dir, cube_dir, dataset_dir, fallback_csv):
+    if Path(panel_dir).exists():
+        return read_panel(dataset_dir=panel_dir)
+    print("ℹ️ Kein Sentiment-Kurs-Panel vorhanden – As-of-Join wird ausgeführt.")
+    panel = asof_join(load_daily_sentiment(cube_dir, dataset_dir, fallback_csv), load_prices())
+    write_panel(panel, panel_dir)
+    return panel
+
+
+def main(dummy=False, window=CORR_WINDOW):
+    panel_dir, cube_dir, dataset_dir, fallback_csv, out_dir, summary_file = (
+        (DUMMY_SENTIMENT_PRICE_PANEL_DIR, DUMMY_DAILY_CUBE_DATASET_DIR, DUMMY_SENTIMENT_DATASET_DIR,
+         DUMMY_FULL_SENTIMENT_FILE, DUMMY_LEAD_LAG_DATASET_DIR, DUMMY_LEAD_LAG_SUMMARY_FILE) if dummy
+        else (SENTIMENT_PRICE_PANEL_DIR, DAILY_CUBE_DATASET_DIR, SENTIMENT_DATASET_DIR,
+              FULL_SENTIMENT_FILE, LEAD_LAG_DATASET_DIR, LEAD_LAG_SUMMARY_FILE)
+    )
+    rolling, summary = lead_lag(load_panel(panel_dir, cube_dir, dataset_dir, fallback_csv), window=window)
+    write_lead_lag(rolling, out_dir)
+    summary.to_csv(summary_file, index=False)
+    print(f"✅ Lead/Lag: {len(rolling)} rollierende Werte ({window} Handelstage) → {out_dir}")
+    print(f"✅ Lead/Lag-Matrix ({summary['ticker'].nunique()} Ticker × {len(LAGS)} Lags) → {summary_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rollierende Sentiment-Rendite-Korrelationen für Lags −5 … +5")
+    parser.add_argument("--dummy", action="store_true", help="Dummy-Daten statt Live-Daten verwenden")
+    parser.add_argument("--window", type=int, default=CORR_WINDOW, help="Fensterlänge in Handelstagen")
+    args = parser.parse_args()
+    main(dummy=args.dummy, window=args.window)
@@ -0,0 +1,302 @@
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import DUMMY_HEADLINES_DIR
+from modules.scoring_engine import lexicon_text, get_analyzer, label_scores
+
+# === NumPy-VADER: vektorisierter Lexikon-Scorer, kompatibel zu VADER-Compound-Scores ===
+# Tokenisierung einmal pro Batch über Arrow-Stringfunktionen (nur eindeutige Tokens); danach nur Array-Operationen.
+# Tokens werden gehasht und per searchsorted im sortierten Hash-Vokabular nachgeschlagen; Booster-,
+# Negations-, "least"-, "but"-, Großschreibungs- und Satzzeichen-Regeln wirken als Verschiebungen
+# über die Token-Positionen (inkl. VADERs Eigenheiten wie dem Kontext des ersten Vorkommens).
+
+# Dokumentierte Toleranz gegenüber `SentimentIntensityAnalyzer.polarity_scores(text)["compound"]`:
+# mindestens AGREEMENT_MIN_SHARE der Texte weichen um höchstens AGREEMENT_TOLERANCE ab. Die Regeln
+# sind vollständig nachgebildet; Restabweichungen entstehen nur durch Rundung auf 4 Stellen
+# (np.round vs. round) und seltene Unicode-Unterschiede zwischen Arrow und Python beim Split/Kleinschreiben.
+AGREEMENT_TOLERANCE = 1e-4
+AGREEMENT_MIN_SHARE = 0.999
+
+DEFAULT_BATCH_SIZE = 50_000
+
+# Wörter, die VADERs Regeln direkt abfragen ("never so", "at least", "kind of", "but" …)
+RULE_WORDS = ["never", "so", "this", "but", "least", "at", "very", "kind", "of"]
+
+# Ein Satzzeichen(-Cluster) aus VADERs PUNC_LIST vor oder hinter einem Wort ohne ASCII-Satzzeichen
+_PUNC = r"(?:!\?!\?|\?!\?!|\?!\?|!\?!|\?\?\?|!!!|\?\?|!!|[.!?,;:\-'\"])"
+_WORD = r"[^!-/:-@\[-`{-~]{2,}"
+_STRIP_PATTERN = rf"^{_PUNC}({_WORD})$|^({_WORD}){_PUNC}$"
+
+
+def hash_tokens(tokens):
+    return pd.util.hash_array(np.asarray(tokens, dtype=object))
+
+
+class HashVocabulary:
+    """Sortiertes Array von 64-bit-Token-Hashes mit zugehörigen Werten; Nachschlagen per searchsorted."""
+
+    def __init__(self, words, values=None):
+        words = list(words)
+        values = np.ones(len(words)) if values is None else np.asarray(values, dtype=np.float64)
+        hashes = hash_tokens(words)
+        order = np.argsort(hashes, kind="stable")
+        self.keys = hashes[order]
+        self.values = values[order]
+        if len(np.unique(self.keys)) != len(self.keys):
+            raise ValueError("Hash-Kollision im Vokabular")
+
+    def lookup(self, hashes, default=0.0):
+        """(Treffer-Maske, Werte) für ein Array von Token-Hashes."""
+        if not len(self.keys):
+            return np.zeros(len(hashes), dtype=bool), np.full(len(hashes), default)
+        idx = np.minimum(np.searchsorted(self.keys, hashes), len(self.keys) - 1)
+        hit = self.keys[idx] == hashes
+        return hit, np.where(hit, self.values[idx], default)
+
+
+def _shift(values, pos, k, fill=False):
+    """Wert des Tokens k Positionen davor (innerhalb desselben Texts), sonst `fill`."""
+    out = np.full(len(values), fill, dtype=values.dtype)
+    out[k:] = values[:-k]
+    out[pos < k] = fill
+    return out
+
+
+def _ahead(values, remaining, k, fill=False):
+    """Wert des Tokens k Positionen danach (innerhalb desselben Texts), sonst `fill`."""
+    out = np.full(len(values), fill, dtype=values.dtype)
+    out[:-k] = values[k:]
+    out[remaining < k] = fill
+    return out
+
+
+def _ngram_end(token_hashes, pos, ngram):
+    """Maske der Positionen, an denen die Token-Folge `ngram` (Hashes, exakte Schreibweise) endet."""
+    mask = token_hashes == ngram[-1]
+    for k, h in enumerate(reversed(ngram[:-1]), 1):
+        mask &= _shift(token_hashes == h, pos, k)
+    return mask
+
+
+def _first_position(doc, codes, n_codes):
+    # VADER nutzt für wiederholte Tokens den Kontext des ersten Vorkommens (list.index).
+    # factorize vergibt Gruppen-Codes in der Reihenfolge des ersten Auftretens.
+    groups, _ = pd.factorize(doc * n_codes + codes)
+    seen = np.maximum.accumulate(np.concatenate(([-1], groups[:-1])))
+    return np.flatnonzero(groups > seen)[groups]
+
+
+class NumpyVader:
+    """Compound-Scores für ganze Text-Batches nach VADER-Regeln (Lexikon, Booster, Negation, Normierung)."""
+
+    def __init__(self, lexicon=None):
+        from nltk.sentiment.vader import VaderConstants
+        c = self.constants = VaderConstants
+        lex = {}
+        for line in (lexicon if lexicon is not None else lexicon_text()).split("\n"):
+            word, measure = line.strip().split("\t")[0:2]
+            lex[word] = float(measure)
+        self.lexicon = HashVocabulary(lex, list(lex.values()))
+        self.boosters = HashVocabulary(c.BOOSTER_DICT, list(c.BOOSTER_DICT.values()))
+        self.negations = HashVocabulary(c.NEGATE)
+        self._hash = dict(zip(RULE_WORDS, hash_tokens(RULE_WORDS)))
+        # Zweiwort-Booster wie "kind of" / "sort of" und Idiome wie "kiss of death" (exakte Schreibweise wie in VADER)
+        self.bigram_boosters = [hash_tokens(k.split()) for k in c.BOOSTER_DICT if " " in k]
+        self.idioms = [(hash_tokens(k.split()), value) for k, value in c.SPECIAL_CASE_IDIOMS.items()]
+
+    def tokenize(self, texts):
+        """Wie VADERs SentiText: Split an Whitespace, Tokens der Länge 1 verwerfen, ein Satzzeichen am Rand abtrennen.
+
+        Gibt (Texte als Arrow-Array, Text-Index je Token, Code je Token, eindeutige Tokens) zurück;
+        alle Stringoperationen laufen nur über die eindeutigen Tokens des Batches.
+        """
+        texts = pa.array(texts, type=pa.large_string())
+        lists = pc.utf8_split_whitespace(texts)
+        tokens = pc.list_flatten(lists)
+        doc = pc.list_parent_indices(lists)
+        keep = pc.greater(pc.utf8_length(tokens), 1)
+        tokens, doc = tokens.filter(keep), doc.filter(keep)
+
+        raw = pc.dictionary_encode(tokens)
+        stripped = pc.dictionary_encode(pc.replace_substring_regex(raw.dictionary, _STRIP_PATTERN, r"\1\2"))
+        codes = stripped.indices.to_numpy(zero_copy_only=False)[raw.indices.to_numpy(zero_copy_only=False)]
+        return texts, doc.to_numpy(zero_copy_only=False).astype(np.int64), codes, stripped.dictionary
+
+    def compound(self, texts):
+        c = self.constants
+        texts, doc, codes, vocab = self.tokenize(list(texts))
+        n_docs = len(texts)
+        if not len(doc):
+            return np.zeros(n_docs)
+
+        # === Merkmale je eindeutigem Token, per Code auf alle Tokens verteilt ===
+        lower = pc.utf8_lower(vocab)
+        exact_vocab = hash_tokens(vocab.to_numpy(zero_copy_only=False))
+        lower_vocab = hash_tokens(lower.to_numpy(zero_copy_only=False))
+        exact_hash, lower_hash = exact_vocab[codes], lower_vocab[codes]
+        upper = pc.utf8_is_upper(vocab).to_numpy(zero_copy_only=False)[codes]
+
+        counts = np.bincount(doc, minlength=n_docs)
+        pos = np.arange(len(doc)) - (np.cumsum(counts) - counts)[doc]
+        upper_counts = np.bincount(doc, weights=upper, minlength=n_docs)
+        cap_diff = ((upper_counts > 0) & (upper_counts < counts))[doc]
+
+        in_lex, valence = (a[codes] for a in self.lexicon.lookup(lower_vocab))
+        is_booster, boost = (a[codes] for a in self.boosters.lookup(lower_vocab))
+        negated = (
+            self.negations.lookup(lower_vocab)[0]
+            | pc.match_substring(lower, "n't").to_numpy(zero_copy_only=False)
+        )[codes]
+        exact = {w: exact_hash == h for w, h in self._hash.items()}
+        low = {w: lower_hash == h for w, h in self._hash.items()}
+        so_this = exact["so"] | exact["this"]
+        remaining = counts[doc] - 1 - pos
+        bigram_end = np.zeros(len(doc), dtype=bool)
+        for ngram in self.bigram_boosters:
+            bigram_end |= _ngram_end(exact_hash, pos, ngram)
+        # Idiom-Wert an der Endposition von Zwei- bzw. Dreiwort-Idiomen
+        idiom_end = {2: np.full(len(doc), np.nan), 3: np.full(len(doc), np.nan)}
+        for ngram, value in self.idioms:
+            idiom_end[len(ngram)][_ngram_end(exact_hash, pos, ngram)] = value
+
+        # === Valenz je Token (Kontext der vorangehenden drei Tokens) ===
+        v = np.where(upper & cap_diff, np.where(valence > 0, valence + c.C_INCR, valence - c.C_INCR), valence)
+        for k, damp in ((1, 1.0), (2, 0.95), (3, 0.9)):
+            window = (pos >= k) & ~_shift(in_lex, pos, k, True)
+            b = _shift(boost, pos, k, 0.0)
+            s = np.where(v < 0, -b, b)
+            s = np.where(_shift(is_booster & upper, pos, k) & cap_diff, np.where(v > 0, s + c.C_INCR, s - c.C_INCR), s)
+            v = np.where(window, v + s * damp, v)
+
+            neg_k = window & _shift(negated, pos, k)
+            if k == 1:
+                v = np.where(neg_k, v * c.N_SCALAR, v)
+            elif k == 2:
+                never_so = window & _shift(exact["never"], pos, 2) & _shift(so_this, pos, 1)
+                v = np.where(never_so, v * 1.5, np.where(neg_k, v * c.N_SCALAR, v))
+            else:
+                never_so = window & ((_shift(exact["never"], pos, 3) & _shift(so_this, pos, 2)) | _shift(so_this, pos, 1))
+                v = np.where(never_so, v * 1.25, np.where(neg_k, v * c.N_SCALAR, v))
+                # Idiome bis zum Wort: erster Treffer zählt; Idiome ab dem Wort überschreiben ihn
+                idiom = idiom_end[2]
+                for candidate in (idiom_end[3], _shift(idiom_end[2], pos, 1, np.nan),
+                                  _shift(idiom_end[3], pos, 1, np.nan), _shift(idiom_end[2], pos, 2, np.nan)):
+                    idiom = np.where(np.isnan(idiom), candidate, idiom)
+                for candidate in (_ahead(idiom_end[2], remaining, 1, np.nan), _ahead(idiom_end[3], remaining, 2, np.nan)):
+                    idiom = np.where(np.isnan(candidate), idiom, candidate)
+                v = np.where(window & ~np.isnan(idiom), idiom, v)
+                v = np.where(window & (_shift(bigram_end, pos, 1) | _shift(bigram_end, pos, 2)), v + c.B_DECR, v)
+
+        # "least" davor negiert, außer "at least" / "very least"
+        least = _shift(low["least"] & ~in_lex, pos, 1) & ~_shift(low["at"] | low["very"], pos, 2)
+        v = np.where(least, v * c.N_SCALAR, v)
+
+        # Booster selbst und "kind" in "kind of" tragen keine Valenz
+        kind_of = low["kind"] & np.append(low["of"][1:] & (doc[1:] == doc[:-1]), False)
+        v = np.where(in_lex & ~is_booster & ~kind_of, v, 0.0)
+
+        sentiments = v[_first_position(doc, codes, len(vocab))]
+
+        # === "but": davor halb, danach 1,5-fach gewichtet ===
+        but_pos = np.full(n_docs, np.iinfo(np.int64).max)
+        np.minimum.at(but_pos, doc[low["but"]], pos[low["but"]])
+        bp = but_pos[doc]
+        sentiments = sentiments * np.where(pos < bp, np.where(bp < np.iinfo(np.int64).max, 0.5, 1.0),
+                                           np.where(pos > bp, 1.5, 1.0))
+
+        # === Summe, Satzzeichen-Verstärkung, Normierung ===
+        total = np.bincount(doc, weights=sentiments, minlength=n_docs)
+        exclamations = np.minimum(pc.count_substring(texts, "!").to_numpy(zero_copy_only=False), 4)
+        questions = pc.count_substring(texts, "?").to_numpy(zero_copy_only=False)
+        amplifier = exclamations * 0.292 + np.where(questions > 1, np.where(questions <= 3, questions * 0.18, 0.96), 0.0)
+        total = np.where(total > 0, total + amplifier, np.where(total < 0, total - amplifier, total))
+        return np.round(total / np.sqrt(total * total + 15), 4)
+
+
+# Ein Scorer pro Prozess (Vokabular-Arrays werden einmal gebaut)
+_scorer = None
+
+
+def get_scorer():
+    global _scorer
+    if _scorer is None:
+        _scorer = NumpyVader()
+    return _scorer
+
+
+def score_compound(texts, batch_size=DEFAULT_BATCH_SIZE):
+    """Compound-Scores in Batches (begrenzt den Speicher der Token-Arrays)."""
+    texts = list(texts)
+    if not texts:
+        return np.empty(0, dtype=np.float64)
+    scorer = get_scorer()
+    return np.concatenate([scorer.compound(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)])
+
+
+# === Übereinstimmung mit der Referenz-Implementierung ===
+def load_corpus(headlines_dir=DUMMY_HEADLINES_DIR):
+    """Texte (Titel + Beschreibung wie im Sentiment-Engine) aller *_trusted.json im Verzeichnis."""
+    texts = []
+    for path in sorted(Path(headlines_dir).glob("*_trusted.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            texts.extend(f"{a.get('title', '')}. {a.get('description', '')}".strip() for a in json.load(f))
+    return texts
+
+
+def agreement(scores, reference, tolerance=AGREEMENT_TOLERANCE):
+    scores, reference = np.asarray(scores, dtype=np.float64), np.asarray(reference, dtype=np.float64)
+    diff = np.abs(scores - reference)
+    within = float((diff <= tolerance).mean()) if len(diff) else 1.0
+    return {
+        "texts": len(diff),
+        "identical": float((diff == 0).mean()) if len(diff) else 1.0,
+        "within_tolerance": within,
+        "max_abs_diff": float(diff.max()) if len(diff) else 0.0,
+        "mean_abs_diff": float(diff.mean()) if len(diff) else 0.0,
+        "label_agreement": float((label_scores(scores) == label_scores(reference)).mean()) if len(diff) else 1.0,
+        "ok": within >= AGREEMENT_MIN_SHARE
+    }
+
+
+def main(limit=None, batch_size=DEFAULT_BATCH_SIZE, tolerance=AGREEMENT_TOLERANCE):
+    texts = load_corpus()[:limit]
+    print(f"📄 {len(texts)} Texte aus {DUMMY_HEADLINES_DIR}")
+
+    started = time.perf_counter()
+    get_scorer()
+    build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    scores = score_compound(texts, batch_size)
+    numpy_seconds = time.perf_counter() - started
+
+    sia = get_analyzer()
+    started = time.perf_counter()
+    reference = np.fromiter((sia.polarity_scores(t)["compound"] for t in texts), dtype=np.float64, count=len(texts))
+    vader_seconds = time.perf_counter() - started
+
+    stats = agreement(scores, reference, tolerance)
+    print(f"⏱️ VADER: {vader_seconds:.2f}s ({len(texts) / vader_seconds:,.0f} Texte/s) | "
+          f"NumPy: {numpy_seconds:.2f}s ({len(texts) / numpy_seconds:,.0f} Texte/s, Aufbau {build_seconds:.2f}s) | "
+          f"Faktor {vader_seconds / numpy_seconds:.1f}x")
+    print(f"{'✅' if stats['ok'] else '❌'} Identisch: {stats['identical']:.2%} | "
+          f"|Δ| ≤ {tolerance:g}: {stats['within_tolerance']:.2%} (Soll ≥ {AGREEMENT_MIN_SHARE:.1%}) | "
+          f"max |Δ| = {stats['max_abs_diff']:.4f} | mittl. |Δ| = {stats['mean_abs_diff']:.2e} | "
+          f"gleiche Labels: {stats['label_agreement']:.2%}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NumPy-VADER gegen die Referenz-Implementierung auf dem Dummy-Korpus prüfen")
+    parser.add_argument("--limit", type=int, help="Nur die ersten N Texte")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Texte pro Batch")
+    parser.add_argument("--tolerance", type=float, default=AGREEMENT_TOLERANCE, help="Erlaubte Abweichung je Text")
+    args = parser.parse_args()
+    sys.exit(0 if main(args.limit, args.batch_size, args.tolerance)["ok"] else 1)
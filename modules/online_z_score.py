@@ -0,0 +1,145 @@
+import os
+import sys
+import json
+import math
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from modules.rolling_stats import MIN_PERIODS, VAR_EPS
+
+# === Online-Z-Scores: persistierter Zustand pro Ticker ===
+# Ringpuffer über die letzten `window` Kalendertage (Slot = Tagesordinal % window, None = kein Wert)
+# plus Welford-Summen (n, mean, m2). Ein neuer Tag entfernt die herausfallenden Tage und fügt den
+# neuen Tagesmittelwert hinzu – O(1) pro Ticker und Tag, unabhängig von der Historie.
+
+
+class RollingWindowState:
+    def __init__(self, window, buffer=None, last_day=None, n=0, mean=0.0, m2=0.0):
+        self.window = window
+        self.buffer = buffer if buffer is not None else [None] * window
+        self.last_day = last_day
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def _add(self, value):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def _remove(self, value):
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.n -= 1
+        delta = value - self.mean
+        self.mean -= delta / self.n
+        self.m2 -= delta * (value - self.mean)
+
+    def advance(self, day):
+        # Tage vor (day - window + 1) fallen heraus; ihre Slots entsprechen den Tagen last_day+1 … day
+        if self.last_day is not None:
+            for k in range(self.last_day + 1, min(day, self.last_day + self.window) + 1):
+                slot = k % self.window
+                if self.buffer[slot] is not None:
+                    self._remove(self.buffer[slot])
+                    self.buffer[slot] = None
+        self.last_day = day
+
+    def push(self, day, value):
+        """Fügt den Tagesmittelwert für `day` (Ordinal) hinzu und gibt (mean, std, z) zurück."""
+        if self.last_day is not None and day <= self.last_day:
+            raise ValueError(f"Tag {pd.Timestamp.fromordinal(day).date()} wurde bereits verarbeitet.")
+        self.advance(day)
+        self.buffer[day % self.window] = value
+        self._add(value)
+        return self.stats(value)
+
+    def stats(self, value=None, min_periods=MIN_PERIODS):
+        if self.n < max(min_periods, 1):
+            return math.nan, math.nan, math.nan
+        std = math.nan
+        if self.n > 1:
+            var = self.m2 / (self.n - 1)
+            std = math.sqrt(var) if var >= VAR_EPS else 0.0
+        z = (value - self.mean) / std if value is not None and std > 0 else math.nan
+        return self.mean, std, z
+
+    def to_dict(self):
+        return {"buffer": self.buffer, "last_day": self.last_day, "n": self.n, "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, window, data):
+        return cls(window, data["buffer"], data["last_day"], data["n"], data["mean"], data["m2"])
+
+
+class ZScoreState:
+    """Zustand aller Ticker plus letzter verarbeiteter Tag (global)."""
+
+    def __init__(self, window, last_date=None, tickers=None):
+        self.window = window
+        self.last_date = last_date
+        self.tickers = tickers or {}
+
+    def ticker(self, ticker):
+        if ticker not in self.tickers:
+            self.tickers[ticker] = RollingWindowState(self.window)
+        return self.tickers[ticker]
+
+    def update(self, daily):
+        """Verarbeitet Tagesmittel (ticker, date, mean_sentiment, count) chronologisch; gibt Z-Score-Zeilen zurück."""
+        rows = []
+        daily = daily.dropna(subset=["mean_sentiment"]).sort_values(["date", "ticker"])
+        for ticker, date, value, count in daily[["ticker", "date", "mean_sentiment", "count"]].itertuples(index=False):
+            mean, std, z = self.ticker(str(ticker)).push(pd.Timestamp(date).toordinal(), float(value))
+            rows.append({
+                "ticker": ticker, "date": pd.Timestamp(date), "mean_sentiment": value, "count": count,
+                "rolling_mean": mean, "rolling_std": std, "z_score": z
+            })
+        if not daily.empty:
+            latest = pd.Timestamp(daily["date"].max())
+            self.last_date = latest if self.last_date is None else max(self.last_date, latest)
+        return pd.DataFrame(rows, columns=[
+            "ticker", "date", "mean_sentiment", "count", "rolling_mean", "rolling_std", "z_score"
+        ])
+
+    @classmethod
+    def from_daily(cls, daily, window):
+        """Baut den Zustand aus der Historie auf; je Ticker werden nur dessen letzte `window` Tage eingespielt."""
+        state = cls(window)
+        if daily.empty:
+            return state
+        dates = pd.to_datetime(daily["date"]).dt.normalize()
+        last_date = dates.max()
+        # Fenster relativ zum letzten Tag des Tickers (nicht zum globalen), sonst fehlen Werte im Ringpuffer
+        ticker_last = dates.groupby(daily["ticker"]).transform("max")
+        recent = daily[dates > ticker_last - pd.Timedelta(days=window)]
+        state.update(recent)
+        state.last_date = last_date
+        return state
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "window": self.window,
+            "last_date": self.last_date.strftime("%Y-%m-%d") if self.last_date is not None else None,
+            "tickers": {t: s.to_dict() for t, s in self.tickers.items()}
+        }
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        if not Path(path).exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        window = payload["window"]
+        last_date = pd.Timestamp(payload["last_date"]) if payload["last_date"] else None
+        tickers = {t: RollingWindowState.from_dict(window, s) for t, s in payload["tickers"].items()}
+        return cls(window, last_date, tickers)
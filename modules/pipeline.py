@@ -0,0 +1,475 @@
+import io
+import os
+import ast
+import sys
+import json
+import time
+import hashlib
+import logging
+import importlib
+import traceback
+from pathlib import Path
+from datetime import datetime
+from functools import lru_cache
+from contextlib import nullcontext, redirect_stdout, redirect_stderr
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    BASE_DIR,
+    LOG_DIR,
+    STOCK_PRICE_DIR,
+    FULL_SENTIMENT_FILE,
+    SENTIMENT_DATASET_DIR,
+    SENTIMENT_WATERMARK_FILE,
+    DAILY_CUBE_DATASET_DIR,
+    Z_SCORE_FILE,
+    Z_SCORE_DATASET_DIR,
+    Z_SCORE_STATE_FILE,
+    PRICE_MATRIX_DIR,
+    SENTIMENT_PRICE_PANEL_DIR,
+    EVENT_STUDY_FILE,
+    EVENT_STUDY_CAAR_FILE,
+    LEAD_LAG_DATASET_DIR,
+    LEAD_LAG_SUMMARY_FILE,
+    BACKTEST_RESULTS_FILE,
+    PIPELINE_STATE_FILE,
+    PIPELINE_RUNS_FILE,
+    DUMMY_FULL_SENTIMENT_FILE,
+    DUMMY_SENTIMENT_DATASET_DIR,
+    DUMMY_DAILY_CUBE_DATASET_DIR,
+    DUMMY_Z_SCORE_FILE,
+    DUMMY_Z_SCORE_DATASET_DIR,
+    DUMMY_Z_SCORE_STATE_FILE,
+    DUMMY_SENTIMENT_PRICE_PANEL_DIR,
+    DUMMY_EVENT_STUDY_FILE,
+    DUMMY_EVENT_STUDY_CAAR_FILE,
+    DUMMY_LEAD_LAG_DATASET_DIR,
+    DUMMY_LEAD_LAG_SUMMARY_FILE,
+    DUMMY_BACKTEST_RESULTS_FILE,
+    DUMMY_PIPELINE_STATE_FILE,
+    DUMMY_PIPELINE_RUNS_FILE,
+    get_news_filename
+)
+
+# === Pipeline: Stufen als DAG mit deklarierten Ein- und Ausgaben ===
+# Abhängigkeiten ergeben sich aus den Pfaden (Ausgabe einer Stufe = Eingabe einer anderen).
+# Eine Stufe wird übersprungen, wenn der Fingerprint ihrer Eingaben (inkl. eigenem Skript und aller
+# transitiv importierten Projektmodule, siehe `code_files`) dem letzten erfolgreichen Lauf entspricht und alle Ausgaben existieren. Abrufe externer Quellen
+# (`always=True`) laufen immer. Stufen sind Funktionsaufrufe ("modul:funktion" + kwargs): unabhängige
+# Stufen laufen parallel in einem Prozess-Pool, mit `inline=True` nacheinander im aufrufenden Prozess.
+
+NEWS_STORE_DIR = get_news_filename("").parent
+NEWS_SOURCES = {
+    "newsdata": ("modules.fetch_news_newsdata:main", {"concurrent": True}),
+    "newsapi": ("modules.fetch_news_newsapi:main", {})
+}
+DEFAULT_JOBS = 4
+PIPELINE_LOG = "pipeline.log"
+
+
+class Stage:
+    """Ein Funktionsaufruf (`target` = "modul:funktion") mit Eingaben (Dateien/Verzeichnisse) und Ausgaben."""
+
+    def __init__(self, name, target, kwargs=None, inputs=(), outputs=(), always=False):
+        self.name = name
+        self.target = target
+        self.kwargs = dict(kwargs or {})
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.always = always
+
+    @property
+    def module_file(self):
+        return BASE_DIR / (self.target.split(":")[0].replace(".", "/") + ".py")
+
+    def signature(self):
+        # Ändert sich der Aufruf, ist der alte Fingerprint wertlos
+        args = ", ".join(f"{k}={v!r}" for k, v in sorted(self.kwargs.items()))
+        return f"{self.target}({args})"
+
+
+def live_stages(news_source="newsdata"):
+    news_target, news_kwargs = NEWS_SOURCES[news_source]
+    return [
+        Stage("fetch_news", news_target, news_kwargs, outputs=[NEWS_STORE_DIR], always=True),
+        Stage("fetch_prices", "modules.fetch_prices:refresh_prices", outputs=[STOCK_PRICE_DIR], always=True),
+        Stage("sentiment", "modules.sentiment_engine:run_incremental",
+              inputs=[NEWS_STORE_DIR],
+              outputs=[FULL_SENTIMENT_FILE, SENTIMENT_DATASET_DIR, DAILY_CUBE_DATASET_DIR, SENTIMENT_WATERMARK_FILE]),
+        Stage("z_scores", "modules.z_score_engine:run_batch",
+              inputs=[SENTIMENT_DATASET_DIR, FULL_SENTIMENT_FILE],
+              outputs=[Z_SCORE_FILE, Z_SCORE_DATASET_DIR, Z_SCORE_STATE_FILE]),
+        Stage("price_matrix", "modules.price_matrix:build_price_matrix",
+              inputs=[STOCK_PRICE_DIR], outputs=[PRICE_MATRIX_DIR]),
+        Stage("sentiment_price_panel", "modules.asof_join:main",
+              inputs=[DAILY_CUBE_DATASET_DIR, PRICE_MATRIX_DIR],
+              outputs=[SENTIMENT_PRICE_PANEL_DIR]),
+        Stage("event_study", "modules.event_study:main",
+              inputs=[Z_SCORE_FILE, PRICE_MATRIX_DIR],
+              outputs=[EVENT_STUDY_FILE, EVENT_STUDY_CAAR_FILE]),
+        Stage("lead_lag", "modules.lead_lag:main",
+              inputs=[SENTIMENT_PRICE_PANEL_DIR],
+              outputs=[LEAD_LAG_DATASET_DIR, LEAD_LAG_SUMMARY_FILE]),
+        Stage("backtest", "modules.backtester:main",
+              inputs=[Z_SCORE_DATASET_DIR, PRICE_MATRIX_DIR],
+              outputs=[BACKTEST_RESULTS_FILE])
+    ]
+
+
+def dummy_stages():
+    """Wie live, aber ohne Abrufe: Quelle sind die Dummy-Sentiments, Kurse aus den vorhandenen CSVs."""
+    dummy = {"dummy": True}
+    return [
+        Stage("daily_cube", "modules.daily_cube:main", dummy,
+              inputs=[DUMMY_SENTIMENT_DATASET_DIR, DUMMY_FULL_SENTIMENT_FILE],
+              outputs=[DUMMY_DAILY_CUBE_DATASET_DIR]),
+        Stage("z_scores", "modules.z_score_engine:run_batch", dummy,
+              inputs=[DUMMY_SENTIMENT_DATASET_DIR, DUMMY_FULL_SENTIMENT_FILE],
+              outputs=[DUMMY_Z_SCORE_FILE, DUMMY_Z_SCORE_DATASET_DIR, DUMMY_Z_SCORE_STATE_FILE]),
+        Stage("price_matrix", "modules.price_matrix:build_price_matrix",
+              inputs=[STOCK_PRICE_DIR], outputs=[PRICE_MATRIX_DIR]),
+        Stage("sentiment_price_panel", "modules.asof_join:main", dummy,
+              inputs=[DUMMY_DAILY_CUBE_DATASET_DIR, PRICE_MATRIX_DIR],
+              outputs=[DUMMY_SENTIMENT_PRICE_PANEL_DIR]),
+        Stage("event_study", "modules.event_study:main", dummy,
+              inputs=[DUMMY_Z_SCORE_FILE, PRICE_MATRIX_DIR],
+              outputs=[DUMMY_EVENT_STUDY_FILE, DUMMY_EVENT_STUDY_CAAR_FILE]),
+        Stage("lead_lag", "modules.lead_lag:main", dummy,
+              inputs=[DUMMY_SENTIMENT_PRICE_PANEL_DIR],
+              outputs=[DUMMY_LEAD_LAG_DATASET_DIR, DUMMY_LEAD_LAG_SUMMARY_FILE]),
+        Stage("backtest", "modules.backtester:main", dummy,
+              inputs=[DUMMY_Z_SCORE_DATASET_DIR, PRICE_MATRIX_DIR],
+              outputs=[DUMMY_BACKTEST_RESULTS_FILE])
+    ]
+
+
+# === DAG ===
+def _overlaps(a, b):
+    return a == b or a in b.parents or b in a.parents
+
+
+def dependencies(stages):
+    """{Stufe: Menge der Stufen, deren Ausgaben sie liest}; Zyklen werden abgewiesen."""
+    deps = {
+        stage.name: {
+            other.name for other in stages
+            if other is not stage and any(_overlaps(i, o) for i in stage.inputs for o in other.outputs)
+        }
+        for stage in stages
+    }
+    # Kahn: alle Stufen müssen sich topologisch sortieren lassen
+    remaining = {name: set(d) for name, d in deps.items()}
+    while remaining:
+        ready = [name for name, d in remaining.items() if not d]
+        if not ready:
+            raise ValueError(f"Zyklische Abhängigkeit zwischen: {', '.join(sorted(remaining))}")
+        for name in ready:
+            del remaining[name]
+        for d in remaining.values():
+            d.difference_update(ready)
+    return deps
+
+
+def select(stages, only=None, skip=None):
+    """Auswahl per Name; `only` nimmt alle vorgelagerten Stufen mit, damit die Eingaben aktuell sind."""
+    names = {s.name for s in stages}
+    unknown = (set(only or []) | set(skip or [])) - names
+    if unknown:
+        raise ValueError(f"Unbekannte Stufe(n): {', '.join(sorted(unknown))}")
+    if only:
+        deps = dependencies(stages)
+        wanted, todo = set(), list(only)
+        while todo:
+            name = todo.pop()
+            if name not in wanted:
+                wanted.add(name)
+                todo.extend(deps[name])
+        stages = [s for s in stages if s.name in wanted]
+    return [s for s in stages if s.name not in set(skip or [])]
+
+
+# === Fingerprints ===
+def _files(path):
+    # Metadaten & temporäre Dateien (führendes "_" oder ".", Endung .tmp) zählen nicht als Eingabe
+    if path.is_dir():
+        return sorted(
+            p for p in path.rglob("*")
+            if p.is_file() and not p.name.startswith(("_", ".")) and not p.name.endswith(".tmp")
+        )
+    return [path] if path.exists() else []
+
+
+def _file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(paths, content=False):
+    """SHA-1 über Dateiliste und (Größe, mtime) bzw. mit `content=True` über die Dateiinhalte."""
+    digest = hashlib.sha1()
+    for path in paths:
+        path = Path(path)
+        digest.update(f"{path}\n".encode("utf-8"))
+        for f in _files(path):
+            if content:
+                entry = _file_digest(f)
+            else:
+                stat = f.stat()
+                entry = f"{stat.st_size}:{stat.st_mtime_ns}"
+            digest.update(f"{f.relative_to(path) if f != path else f.name}|{entry}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _local_module_file(name):
+    # "modules.rolling_stats" → BASE_DIR/modules/rolling_stats.py (bzw. Paket-__init__); sonst None
+    path = BASE_DIR / name.replace(".", "/")
+    for candidate in (path.with_suffix(".py"), path / "__init__.py"):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+@lru_cache(maxsize=None)
+def _local_imports(path, mtime_ns):
+    """Projektmodule, die eine Datei importiert (auch verzögerte Importe in Funktionen); `mtime_ns` nur als Cache-Schlüssel."""
+    tree = ast.parse(Path(path).read_text(encoding="utf-8"), filename=str(path))
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            # "from modules import x" kann ein Untermodul oder ein Name aus dem Paket sein
+            names.append(node.module)
+            names.extend(f"{node.module}.{alias.name}" for alias in node.names)
+    return tuple(f for f in map(_local_module_file, names) if f is not None)
+
+
+def code_files(module_file):
+    """Skript einer Stufe plus alle transitiv importierten Projektmodule (inkl. config.py), sortiert."""
+    seen, pending = set(), [Path(module_file)]
+    while pending:
+        path = pending.pop()
+        if path in seen or not path.is_file():
+            continue
+        seen.add(path)
+        pending.extend(_local_imports(path, path.stat().st_mtime_ns))
+    return sorted(seen)
+
+
+def stage_fingerprint(stage, content=False):
+    # Änderungen an Hilfsmodulen (z. B. rolling_stats, scoring_engine) machen Ausgaben ebenfalls veraltet
+    return fingerprint(code_files(stage.module_file) + stage.inputs, content)
+
+
+# === Zustand ===
+def load_state(state_file=PIPELINE_STATE_FILE):
+    if not Path(state_file).exists():
+        return {}
+    with open(state_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, state_file=PIPELINE_STATE_FILE):
+    state_file = Path(state_file)
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = state_file.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_file)
+
+
+def _up_to_date(stage, previous, fp):
+    return (
+        previous is not None
+        and previous.get("fingerprint") == fp
+        and previous.get("signature") == stage.signature()
+        and all(p.exists() for p in stage.outputs)
+    )
+
+
+# === Ausführung einer Stufe (im Worker-Prozess oder inline) ===
+def init_worker(logfile_name=PIPELINE_LOG):
+    """Logging für Pool-Worker: nur in die Datei; die Konsolenausgabe fängt `_execute` je Stufe ab."""
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.FileHandler(LOG_DIR / logfile_name)]
+    )
+
+
+def resolve(target):
+    module_name, func_name = target.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _execute(target, kwargs):
+    """Ruft `target(**kwargs)` auf; gibt (ok, Ausgabe, Sekunden) zurück. Der Rückgabewert wird verworfen."""
+    buffer = io.StringIO()
+    handler = logging.StreamHandler(buffer)
+    handler.setFormatter(logging.Formatter("%(levelname)s - %(message)s"))
+    logging.getLogger().addHandler(handler)
+    started = time.perf_counter()
+    ok = True
+    try:
+        with redirect_stdout(buffer), redirect_stderr(buffer):
+            resolve(target)(**kwargs)
+    except (Exception, SystemExit):
+        ok = False
+        buffer.write(traceback.format_exc())
+    finally:
+        logging.getLogger().removeHandler(handler)
+    return ok, buffer.getvalue(), time.perf_counter() - started
+
+
+class InlineExecutor:
+    """Führt Stufen sofort im aufrufenden Prozess aus (Streamlit, lang laufende Worker, Debugging)."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+# === Ausführung ===
+def run_pipeline(stages, state_file=PIPELINE_STATE_FILE, runs_file=PIPELINE_RUNS_FILE, force=False,
+                 content_hash=False, jobs=DEFAULT_JOBS, dry_run=False, verbose=False, inline=False, executor=None):
+    """Führt alle veralteten Stufen in Abhängigkeitsreihenfolge aus; gibt die Ergebnisse je Stufe zurück.
+
+    Status je Stufe: ran, skipped, failed oder blocked (eine vorgelagerte Stufe ist fehlgeschlagen).
+    `mode` ist cold, wenn es für die Stufe noch keinen erfolgreichen Lauf gibt, sonst warm.
+    Ohne `executor` startet ein eigener Prozess-Pool mit `jobs` Workern; ein übergebener Pool
+    (z. B. langlebig in einem Dienst) wird wiederverwendet und nicht beendet. Achtung: Worker
+    behalten einmal importierte Module, Code-Änderungen greifen erst in einem neuen Pool.
+    """
+    by_name = {s.name: s for s in stages}
+    deps = dependencies(stages)
+    state = load_state(state_file)
+    results = {}
+    running = {}
+    fingerprints = {}
+    started = time.perf_counter()
+
+    def finish(name, status, seconds=0.0, fingerprint_seconds=0.0, output=""):
+        results[name] = {
+            "stage": name,
+            "status": status,
+            "mode": "warm" if name in state else "cold",
+            "seconds": round(seconds, 3),
+            "fingerprint_seconds": round(fingerprint_seconds, 3)
+        }
+        icon = {"ran": "✅", "skipped": "⏭️", "failed": "❌", "blocked": "⛔"}[status]
+        print(f"{icon} {name}: {status} ({seconds:.1f}s)")
+        if output and (verbose or status == "failed"):
+            lines = output.rstrip().splitlines()
+            print("\n".join(f"   │ {line}" for line in (lines if verbose else lines[-20:])))
+
+    if inline:
+        executor = InlineExecutor()
+    context = (
+        nullcontext(executor) if executor is not None
+        else ProcessPoolExecutor(max_workers=max(1, jobs), initializer=init_worker)
+    )
+
+    with context as pool:
+        while len(results) < len(stages):
+            # Alle Stufen starten, deren Abhängigkeiten abgeschlossen sind
+            for name, stage in by_name.items():
+                if name in results or name in running.values() or not deps[name] <= set(results):
+                    continue
+                if any(results[d]["status"] in ("failed", "blocked") for d in deps[name]):
+                    finish(name, "blocked")
+                    continue
+
+                fp_start = time.perf_counter()
+                fp = stage_fingerprint(stage, content_hash)
+                fp_seconds = time.perf_counter() - fp_start
+                if not force and not stage.always and _up_to_date(stage, state.get(name), fp):
+                    finish(name, "skipped", fingerprint_seconds=fp_seconds)
+                    continue
+                if dry_run:
+                    print(f"▶️ {name}: würde laufen ({stage.signature()})")
+                    finish(name, "skipped", fingerprint_seconds=fp_seconds)
+                    continue
+                running[pool.submit(_execute, stage.target, stage.kwargs)] = name
+                fingerprints[name] = (fp, fp_seconds)
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                stage = by_name[name]
+                fp, fp_seconds = fingerprints[name]
+                ok, output, seconds = future.result()
+                if ok:
+                    finish(name, "ran", seconds, fp_seconds, output)
+                    # Fingerprint der Eingaben vor dem Lauf: Änderungen währenddessen lösen den nächsten Lauf aus
+                    state[name] = {
+                        "fingerprint": fp,
+                        "signature": stage.signature(),
+                        "finished_at": datetime.now().isoformat(timespec="seconds"),
+                        "seconds": round(seconds, 3)
+                    }
+                    save_state(state, state_file)
+                else:
+                    finish(name, "failed", seconds, fp_seconds, output)
+
+    wall = time.perf_counter() - started
+    ordered = [results[s.name] for s in stages]
+    if not dry_run:
+        runs_file = Path(runs_file)
+        runs_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(runs_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "wall_seconds": round(wall, 3),
+                "force": force,
+                "content_hash": content_hash,
+                "stages": ordered
+            }, ensure_ascii=False) + "\n")
+    return ordered, wall
+
+
+def status(stages, state_file=PIPELINE_STATE_FILE, content_hash=False):
+    """Aktueller Stand je Stufe ohne Ausführung: Abhängigkeiten, letzter Lauf, veraltet ja/nein."""
+    deps = dependencies(stages)
+    state = load_state(state_file)
+    rows = []
+    for stage in stages:
+        previous = state.get(stage.name)
+        stale = stage.always or not _up_to_date(stage, previous, stage_fingerprint(stage, content_hash))
+        rows.append({
+            "stage": stage.name,
+            "after": sorted(deps[stage.name]),
+            "last_run": previous["finished_at"] if previous else None,
+            "last_seconds": previous["seconds"] if previous else None,
+            "stale": stale
+        })
+    return rows
+
+
+def print_summary(results, wall):
+    print(f"\n{'Stufe':<24}{'Status':<10}{'Modus':<7}{'Laufzeit':>10}{'Fingerprint':>13}")
+    for r in results:
+        print(f"{r['stage']:<24}{r['status']:<10}{r['mode']:<7}{r['seconds']:>9.2f}s{r['fingerprint_seconds']:>12.2f}s")
+    print(f"{'Gesamt (Wanduhr)':<41}{wall:>9.2f}s")
+
+
+def main(dummy=False, only=None, skip=None, force=False, content_hash=False, jobs=DEFAULT_JOBS,
+         dry_run=False, verbose=False, news_source="newsdata", inline=False):
+    stages, state_file, runs_file = (
+        (dummy_stages(), DUMMY_PIPELINE_STATE_FILE, DUMMY_PIPELINE_RUNS_FILE) if dummy
+        else (live_stages(news_source), PIPELINE_STATE_FILE, PIPELINE_RUNS_FILE)
+    )
+    stages = select(stages, only, skip)
+    results, wall = run_pipeline(stages, state_file, runs_file, force, content_hash, jobs, dry_run, verbose, inline)
+    print_summary(results, wall)
+    return 1 if any(r["status"] in ("failed", "blocked") for r in results) else 0
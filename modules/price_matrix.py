@@ -0,0 +1,146 @@
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import STOCK_PRICE_DIR, PRICE_MATRIX_DIR
+
+# === Kursmatrix: eine date × ticker-Matrix (float32) pro Feld als .npy, per np.memmap gelesen ===
+# Zeilen = Handelstage aller Ticker (vereinigt), Spalten = Ticker ohne ".DE"-Suffix, NaN = kein Kurs.
+# index.json enthält Tage, Ticker und Felder; Fenster-Slices sind reine Views ohne Parsen.
+
+PRICE_FIELDS = {
+    "Adj Close": "adj_close",
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Volume": "volume"
+}
+INDEX_FILE = "index.json"
+
+
+def _read_prices(file_path):
+    df = pd.read_csv(file_path, usecols=lambda c: c == "Date" or c in PRICE_FIELDS)
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce").dt.normalize()
+    return df.dropna(subset=["Date"]).drop_duplicates(subset=["Date"], keep="last")
+
+
+def build_price_matrix(price_dir=STOCK_PRICE_DIR, matrix_dir=PRICE_MATRIX_DIR):
+    """Packt alle Ticker-CSVs in eine ausgerichtete float32-Matrix je Feld; gibt die Form (Tage, Ticker) zurück."""
+    files = sorted(Path(price_dir).glob("*.csv"))
+    frames = {f.stem.replace(".DE", ""): _read_prices(f) for f in files}
+    frames = {t: df for t, df in frames.items() if not df.empty}
+    tickers = sorted(frames)
+    dates = pd.DatetimeIndex(sorted(set().union(*(df["Date"] for df in frames.values())))) \
+        if frames else pd.DatetimeIndex([])
+
+    matrix_dir = Path(matrix_dir)
+    matrix_dir.mkdir(parents=True, exist_ok=True)
+    shape = (len(dates), len(tickers))
+    for field, name in PRICE_FIELDS.items():
+        tmp_path = matrix_dir / f"{name}.tmp.npy"
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=shape)
+        out[:] = np.nan
+        for col, ticker in enumerate(tickers):
+            df = frames[ticker]
+            if field in df.columns:
+                out[dates.get_indexer(df["Date"]), col] = df[field].to_numpy(dtype=np.float32)
+        out.flush()
+        del out
+        os.replace(tmp_path, matrix_dir / f"{name}.npy")
+
+    # Index zuletzt schreiben: erst danach gilt die neue Matrix als vollständig
+    index = {
+        "dates": [d.strftime("%Y-%m-%d") for d in dates],
+        "tickers": tickers,
+        "fields": list(PRICE_FIELDS.values())
+    }
+    tmp_index = matrix_dir / f"{INDEX_FILE}.tmp"
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_index, matrix_dir / INDEX_FILE)
+    return shape
+
+
+class PriceMatrix:
+    """Lesender Zugriff auf die Kursmatrix; Felder werden erst beim ersten Zugriff gemappt."""
+
+    def __init__(self, matrix_dir=PRICE_MATRIX_DIR):
+        self.matrix_dir = Path(matrix_dir)
+        with open(self.matrix_dir / INDEX_FILE, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        self.dates = pd.DatetimeIndex(pd.to_datetime(index["dates"]))
+        self.tickers = index["tickers"]
+        self.fields = index["fields"]
+        self._ticker_pos = {t: i for i, t in enumerate(self.tickers)}
+        self._arrays = {}
+
+    @staticmethod
+    def exists(matrix_dir=PRICE_MATRIX_DIR):
+        return (Path(matrix_dir) / INDEX_FILE).exists()
+
+    def field(self, name="adj_close"):
+        """Komplette date × ticker-Matrix eines Felds (np.memmap, schreibgeschützt)."""
+        name = PRICE_FIELDS.get(name, name)
+        if name not in self._arrays:
+            if name not in self.fields:
+                raise KeyError(f"Unbekanntes Kursfeld: {name}")
+            self._arrays[name] = np.load(self.matrix_dir / f"{name}.npy", mmap_mode="r")
+        return self._arrays[name]
+
+    def returns(self, field="adj_close"):
+        """Einfache Renditen (date × ticker, float64) seit dem jeweils letzten vorhandenen Kurs; NaN ohne Kurs."""
+        values = np.asarray(self.field(field), dtype=np.float64)
+        previous = pd.DataFrame(values).ffill().shift(1).to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return values / previous - 1.0
+
+    def columns(self, tickers):
+        """Spaltenpositionen der Ticker (mit oder ohne ".DE"); unbekannte Ticker werden übersprungen."""
+        found = [str(t).replace(".DE", "") for t in tickers]
+        return np.array([self._ticker_pos[t] for t in found if t in self._ticker_pos], dtype=np.int64)
+
+    def rows(self, start=None, end=None):
+        i0 = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start).normalize(), side="left")
+        i1 = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end).normalize(), side="right")
+        return slice(i0, max(i0, i1))
+
+    def window(self, field="adj_close", start=None, end=None, tickers=None):
+        """(Tage, Ticker, Matrix) für [start, end]; ohne Tickerauswahl eine View auf die gemappte Datei."""
+        rows = self.rows(start, end)
+        data = self.field(field)[rows]
+        if tickers is None:
+            return self.dates[rows], list(self.tickers), data
+        cols = self.columns(tickers)
+        return self.dates[rows], [self.tickers[c] for c in cols], data[:, cols]
+
+    def frame(self, field="adj_close", start=None, end=None, tickers=None):
+        """Fenster als DataFrame (Index = Tage, Spalten = Ticker)."""
+        dates, names, data = self.window(field, start, end, tickers)
+        return pd.DataFrame(np.asarray(data), index=pd.Index(dates, name="date"), columns=names)
+
+
+def open_price_matrix(matrix_dir=PRICE_MATRIX_DIR, price_dir=STOCK_PRICE_DIR):
+    """Öffnet die Kursmatrix; fehlt sie, wird sie einmalig aus den Kurs-CSVs gebaut."""
+    if not PriceMatrix.exists(matrix_dir):
+        print("ℹ️ Keine Kursmatrix vorhanden – wird aus den Kurs-CSVs gebaut.")
+        build_price_matrix(price_dir, matrix_dir)
+    return PriceMatrix(matrix_dir)
+
+
+def main(price_dir=STOCK_PRICE_DIR, matrix_dir=PRICE_MATRIX_DIR):
+    n_dates, n_tickers = build_price_matrix(price_dir, matrix_dir)
+    print(f"✅ Kursmatrix: {n_dates} Tage × {n_tickers} Ticker × {len(PRICE_FIELDS)} Felder → {matrix_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kurs-CSVs zu einer memory-mapped date × ticker-Matrix packen")
+    parser.add_argument("--price-dir", default=str(STOCK_PRICE_DIR), help="Verzeichnis der Ticker-CSVs")
+    parser.add_argument("--out", default=str(PRICE_MATRIX_DIR), help="Zielverzeichnis der Matrix")
+    args = parser.parse_args()
+    main(Path(args.price_dir), Path(args.out))
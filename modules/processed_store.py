@@ -0,0 +1,239 @@
+import sys
+import uuid
+import shutil
+import argparse
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    SENTIMENT_DATASET_DIR,
+    Z_SCORE_DATASET_DIR,
+    DAILY_CUBE_DATASET_DIR,
+    SENTIMENT_PRICE_PANEL_DIR,
+    LEAD_LAG_DATASET_DIR,
+    FULL_SENTIMENT_FILE
+)
+
+# === Processed Store: Parquet-Datasets, Hive-partitioniert nach ticker=…/month=YYYY-MM ===
+
+# === Spalten der bewerteten Artikel (inkl. Keyword-Tags aus dem Ingest) ===
+SENTIMENT_COLUMNS = [
+    "date", "ticker", "company_name", "title", "description",
+    "url", "source", "sentiment_score", "sentiment_label",
+    "risk_hits", "esg_mask", "esg_e", "esg_s", "esg_g"
+]
+
+PARTITION_COLS = ["ticker", "month"]
+PARTITIONING = ds.partitioning(
+    pa.schema([("ticker", pa.string()), ("month", pa.string())]),
+    flavor="hive"
+)
+
+
+def _with_month(df):
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["date"])
+    df["ticker"] = df["ticker"].astype(str)
+    df["month"] = df["date"].dt.strftime("%Y-%m")
+    return df
+
+
+def _write_parts(df, dataset_dir):
+    if df.empty:
+        return
+    table = pa.Table.from_pandas(_with_month(df), preserve_index=False)
+    pq.write_to_dataset(
+        table,
+        root_path=str(dataset_dir),
+        partition_cols=PARTITION_COLS,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        max_partitions=1_000_000
+    )
+
+
+def _drop_ticker(ticker, dataset_dir):
+    shutil.rmtree(Path(dataset_dir) / f"ticker={ticker}", ignore_errors=True)
+
+
+# === Schreiben ===
+def append_sentiment(ticker, df, dataset_dir=SENTIMENT_DATASET_DIR):
+    """Hängt neue bewertete Artikel als zusätzliche Parquet-Dateien an die Monats-Partitionen des Tickers an."""
+    if df.empty:
+        return
+    _write_parts(df.reindex(columns=SENTIMENT_COLUMNS).assign(ticker=ticker), dataset_dir)
+
+
+def append_sentiment_batch(df, dataset_dir=SENTIMENT_DATASET_DIR):
+    """Hängt bewertete Artikel beliebig vieler Ticker in einem Schreibvorgang an (Spalte `ticker` je Zeile)."""
+    if df.empty:
+        return
+    _write_parts(df.reindex(columns=SENTIMENT_COLUMNS), dataset_dir)
+
+
+def write_sentiment(ticker, df, dataset_dir=SENTIMENT_DATASET_DIR):
+    """Schreibt alle Partitionen eines Tickers neu (Full Rebuild)."""
+    _drop_ticker(ticker, dataset_dir)
+    _write_parts(df.reindex(columns=SENTIMENT_COLUMNS).assign(ticker=ticker), dataset_dir)
+
+
+def append_full_sentiment(df, path=FULL_SENTIMENT_FILE):
+    """Hängt neue Zeilen an die Gesamt-CSV an, ohne sie neu zu schreiben."""
+    if df.empty:
+        return
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df = df.reindex(columns=SENTIMENT_COLUMNS)
+    if path.exists():
+        columns = pd.read_csv(path, nrows=0).columns
+        df.reindex(columns=columns).to_csv(path, mode="a", header=False, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def write_z_scores(df, dataset_dir=Z_SCORE_DATASET_DIR):
+    """Ersetzt das Z-Score-Dataset vollständig."""
+    shutil.rmtree(dataset_dir, ignore_errors=True)
+    _write_parts(df, dataset_dir)
+
+
+def append_z_scores(df, dataset_dir=Z_SCORE_DATASET_DIR):
+    """Hängt Z-Scores neuer Tage an (Online-Update)."""
+    _write_parts(df, dataset_dir)
+
+
+def write_cube(df, dataset_dir=DAILY_CUBE_DATASET_DIR):
+    """Ersetzt den Tages-Würfel vollständig."""
+    shutil.rmtree(dataset_dir, ignore_errors=True)
+    _write_parts(df, dataset_dir)
+
+
+def append_cube(df, dataset_dir=DAILY_CUBE_DATASET_DIR):
+    """Hängt Teilaggregate an; alle Kennzahlen sind additiv und werden beim Lesen zusammengefasst."""
+    _write_parts(df, dataset_dir)
+
+
+def write_panel(df, dataset_dir=SENTIMENT_PRICE_PANEL_DIR):
+    """Ersetzt das Sentiment-Kurs-Panel vollständig."""
+    shutil.rmtree(dataset_dir, ignore_errors=True)
+    _write_parts(df, dataset_dir)
+
+
+def write_lead_lag(df, dataset_dir=LEAD_LAG_DATASET_DIR):
+    """Ersetzt die rollierenden Lead/Lag-Korrelationen vollständig."""
+    shutil.rmtree(dataset_dir, ignore_errors=True)
+    _write_parts(df, dataset_dir)
+
+
+def build_dataset_from_csv(csv_path, dataset_dir, chunksize=500_000):
+    """Migriert eine bestehende CSV (z. B. dummy_full_sentiment.csv) in ein partitioniertes Dataset."""
+    shutil.rmtree(dataset_dir, ignore_errors=True)
+    for chunk in pd.read_csv(csv_path, parse_dates=["date"], chunksize=chunksize):
+        _write_parts(chunk, dataset_dir)
+
+
+# === Lesen mit Predicate-Pushdown ===
+def _filter_expression(tickers, start, end):
+    expr = None
+
+    def _and(e):
+        return e if expr is None else expr & e
+
+    if tickers is not None:
+        expr = _and(ds.field("ticker").isin([str(t) for t in tickers]))
+    if start is not None:
+        start = pd.Timestamp(start)
+        # Monats-Partitionen vor dem Start werden gar nicht erst geöffnet
+        expr = _and(ds.field("month") >= start.strftime("%Y-%m"))
+        expr = _and(ds.field("date") >= start.to_pydatetime())
+    if end is not None:
+        end = pd.Timestamp(end)
+        expr = _and(ds.field("month") <= end.strftime("%Y-%m"))
+        expr = _and(ds.field("date") <= end.to_pydatetime())
+    return expr
+
+
+def _read_csv_fallback(csv_path, tickers, start, end, columns):
+    df = pd.read_csv(csv_path, parse_dates=["date"])
+    if tickers is not None:
+        df = df[df["ticker"].astype(str).isin([str(t) for t in tickers])]
+    if start is not None:
+        df = df[df["date"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["date"] <= pd.Timestamp(end)]
+    return df[[c for c in columns if c in df.columns]] if columns else df
+
+
+def read_dataset(dataset_dir, tickers=None, start=None, end=None, columns=None, fallback_csv=None):
+    """Liest nur die Partitionen/Zeilen im gewünschten Ticker- und Datumsbereich.
+
+    Existiert das Dataset (noch) nicht, wird auf `fallback_csv` zurückgegriffen. Angefragte Spalten,
+    die im Bestand (noch) fehlen, werden ausgelassen.
+    """
+    dataset_dir = Path(dataset_dir)
+    if not dataset_dir.exists():
+        if fallback_csv is not None and Path(fallback_csv).exists():
+            return _read_csv_fallback(fallback_csv, tickers, start, end, columns)
+        raise FileNotFoundError(f"{dataset_dir} not found.")
+
+    dataset = ds.dataset(str(dataset_dir), format="parquet", partitioning=PARTITIONING)
+    if columns is not None:
+        columns = [c for c in columns if c != "month" and c in dataset.schema.names]
+    table = dataset.to_table(columns=columns, filter=_filter_expression(tickers, start, end))
+    df = table.to_pandas()
+    if "month" in df.columns:
+        df = df.drop(columns=["month"])
+    if "ticker" in df.columns:
+        df["ticker"] = df["ticker"].astype(str)
+    if "date" in df.columns:
+        df = df.sort_values(["ticker", "date"] if "ticker" in df.columns else ["date"], ignore_index=True)
+    return df
+
+
+def read_sentiment(tickers=None, start=None, end=None, columns=None,
+                   dataset_dir=SENTIMENT_DATASET_DIR, fallback_csv=FULL_SENTIMENT_FILE):
+    return read_dataset(dataset_dir, tickers, start, end, columns, fallback_csv)
+
+
+def read_z_scores(tickers=None, start=None, end=None, columns=None,
+                  dataset_dir=Z_SCORE_DATASET_DIR, fallback_csv=None):
+    return read_dataset(dataset_dir, tickers, start, end, columns, fallback_csv)
+
+
+def read_cube(tickers=None, start=None, end=None, dataset_dir=DAILY_CUBE_DATASET_DIR):
+    df = read_dataset(dataset_dir, tickers, start, end)
+    if df.empty:
+        return df
+    # Inkrementell angehängte Teilaggregate desselben Tages addieren
+    return df.groupby(["ticker", "date"], as_index=False, sort=True).sum()
+
+
+def read_panel(tickers=None, start=None, end=None, columns=None, dataset_dir=SENTIMENT_PRICE_PANEL_DIR):
+    return read_dataset(dataset_dir, tickers, start, end, columns)
+
+
+def read_lead_lag(tickers=None, start=None, end=None, columns=None, dataset_dir=LEAD_LAG_DATASET_DIR):
+    return read_dataset(dataset_dir, tickers, start, end, columns)
+
+
+def list_tickers(dataset_dir=SENTIMENT_DATASET_DIR):
+    # Ticker ergeben sich aus den Partitionsverzeichnissen, ohne Daten zu lesen
+    return sorted(p.name.split("=", 1)[1] for p in Path(dataset_dir).glob("ticker=*") if p.is_dir())
+
+
+def read_date_bounds(dataset_dir=SENTIMENT_DATASET_DIR, fallback_csv=FULL_SENTIMENT_FILE):
+    df = read_dataset(dataset_dir, columns=["date"], fallback_csv=fallback_csv)
+    return df["date"].min(), df["date"].max()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CSV in ein partitioniertes Parquet-Dataset überführen")
+    parser.add_argument("csv", type=Path, help="Quell-CSV mit Spalten date, ticker, …")
+    parser.add_argument("dataset_dir", type=Path, help="Zielverzeichnis des Datasets")
+    args = parser.parse_args()
+    build_dataset_from_csv(args.csv, args.dataset_dir)
+    print(f"✅ Dataset geschrieben → {args.dataset_dir}")
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+# === Rolling-Kennzahlen über eine dichte date × ticker-Matrix ===
+# Fenster sind Kalendertage (inkl. aktuellem Tag); fehlende Tage sind NaN und zählen nicht mit.
+# Alle Fenster ergeben sich aus denselben kumulativen Summen (Anzahl, Summe, Quadratsumme).
+
+DEFAULT_WINDOWS = list(range(3, 31))
+MIN_PERIODS = 3
+
+# Varianzen darunter gelten als 0 (Rundungsrest der Präfixsummen) → kein Z-Score
+VAR_EPS = 1e-12
+
+
+def pivot_daily(daily, value="mean_sentiment"):
+    """Langformat (ticker, date, value) → (Kalendertage, Ticker, Matrix mit NaN für fehlende Tage)."""
+    dates = pd.to_datetime(daily["date"]).dt.normalize()
+    calendar = pd.date_range(dates.min(), dates.max(), freq="D")
+    tickers = sorted(daily["ticker"].astype(str).unique())
+    matrix = np.full((len(calendar), len(tickers)), np.nan, dtype=np.float64)
+    matrix[calendar.get_indexer(dates), pd.Index(tickers).get_indexer(daily["ticker"].astype(str))] = \
+        daily[value].to_numpy(dtype=np.float64)
+    return calendar, tickers, matrix
+
+
+def _prefix(values):
+    out = np.zeros((values.shape[0] + 1,) + values.shape[1:], dtype=np.float64)
+    np.cumsum(values, axis=0, out=out[1:])
+    return out
+
+
+def rolling_mean_std(matrix, windows=DEFAULT_WINDOWS, min_periods=MIN_PERIODS):
+    """{Fenster: (Mittelwert, Standardabweichung ddof=1)} für jede Zelle der Matrix."""
+    observed = ~np.isnan(matrix)
+    # Spaltenweise zentrieren: Varianz bleibt gleich, Auslöschung in den Quadratsummen sinkt
+    with np.errstate(all="ignore"):
+        center = np.nan_to_num(np.nanmean(matrix, axis=0))
+    values = np.where(observed, matrix - center, 0.0)
+
+    count = _prefix(observed.astype(np.float64))
+    total = _prefix(values)
+    total_sq = _prefix(values ** 2)
+
+    n_rows = matrix.shape[0]
+    end = np.arange(1, n_rows + 1)
+    result = {}
+    for window in windows:
+        start = np.maximum(end - window, 0)
+        n = count[end] - count[start]
+        s = total[end] - total[start]
+        ss = total_sq[end] - total_sq[start]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = s / n
+            var = (ss - s * mean) / (n - 1)
+        valid = n >= max(min_periods, 1)
+        mean = np.where(valid, mean + center, np.nan)
+        var = np.where(var < VAR_EPS, 0.0, var)
+        std = np.where(valid & (n > 1), np.sqrt(var), np.nan)
+        result[window] = (mean, std)
+    return result
+
+
+def rolling_z_scores(matrix, windows=DEFAULT_WINDOWS, min_periods=MIN_PERIODS):
+    """{Fenster: (Mittelwert, Standardabweichung, Z-Score)}; Z-Score nur für beobachtete Tage mit Streuung."""
+    result = {}
+    for window, (mean, std) in rolling_mean_std(matrix, windows, min_periods).items():
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where(std > 0, (matrix - mean) / std, np.nan)
+        result[window] = (mean, std, z)
+    return result
+
+
+def z_score_panel(daily, windows=DEFAULT_WINDOWS, min_periods=MIN_PERIODS, value="mean_sentiment"):
+    """Hängt rolling_mean_{w}, rolling_std_{w} und z_score_{w} für alle Fenster an das Langformat an."""
+    daily = daily.copy()
+    daily["date"] = pd.to_datetime(daily["date"]).dt.normalize()
+    if daily.empty:
+        return daily
+    calendar, tickers, matrix = pivot_daily(daily, value)
+    rows = calendar.get_indexer(daily["date"])
+    cols = pd.Index(tickers).get_indexer(daily["ticker"].astype(str))
+
+    columns = {}
+    for window, (mean, std, z) in rolling_z_scores(matrix, windows, min_periods).items():
+        columns[f"rolling_mean_{window}"] = mean[rows, cols]
+        columns[f"rolling_std_{window}"] = std[rows, cols]
+        columns[f"z_score_{window}"] = z[rows, cols]
+    return pd.concat([daily.reset_index(drop=True), pd.DataFrame(columns)], axis=1)
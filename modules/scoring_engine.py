@@ -0,0 +1,182 @@
+import os
+import sys
+import math
+import shutil
+import hashlib
+import logging
+import zipfile
+import argparse
+import numpy as np
+from pathlib import Path
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from config import NLTK_DATA_DIR, VADER_LEXICON_PATH, SENTIMENT_BACKEND
+
+logger = logging.getLogger(__name__)
+
+# === Schwellenwerte für Sentiment-Labels ===
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+DEFAULT_CHUNK_SIZE = 2_000
+BACKENDS = ("vader", "numpy")
+
+LEXICON_RESOURCE = "sentiment/vader_lexicon.zip"
+LEXICON_MEMBER = "vader_lexicon/vader_lexicon.txt"
+
+# Ein Analyzer pro Prozess (Worker oder Hauptprozess); per fork gestartete Worker erben ihn
+_sia = None
+
+
+# === VADER-Lexikon: einmal pro Prozess auflösen, ohne Netz und ohne NLTK-Import im Normalfall ===
+def _lexicon_candidates(root):
+    root = Path(root)
+    return [root / LEXICON_RESOURCE, root / "sentiment" / LEXICON_MEMBER]
+
+
+@lru_cache(maxsize=None)
+def lexicon_path():
+    """Reihenfolge: VADER_LEXICON_PATH, gebündeltes data/nltk_data, NLTK-Suchpfade, zuletzt Download nach data/nltk_data."""
+    if VADER_LEXICON_PATH:
+        path = Path(VADER_LEXICON_PATH)
+        if not path.is_file():
+            raise FileNotFoundError(f"VADER_LEXICON_PATH zeigt auf keine Datei: {path}")
+        return path
+    for path in _lexicon_candidates(NLTK_DATA_DIR):
+        if path.is_file():
+            return path
+
+    import nltk
+    try:
+        return Path(str(nltk.data.find(LEXICON_RESOURCE)))
+    except LookupError:
+        pass
+    logger.warning(f"⚠️ VADER-Lexikon nicht gefunden – lade es nach {NLTK_DATA_DIR}")
+    nltk.download("vader_lexicon", download_dir=str(NLTK_DATA_DIR), quiet=True)
+    for path in _lexicon_candidates(NLTK_DATA_DIR):
+        if path.is_file():
+            return path
+    raise LookupError(f"VADER-Lexikon weder gebündelt ({NLTK_DATA_DIR}) noch per Download verfügbar")
+
+
+@lru_cache(maxsize=None)
+def lexicon_text():
+    path = lexicon_path()
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as zf:
+            return zf.read(LEXICON_MEMBER).decode("utf-8")
+    return path.read_text(encoding="utf-8")
+
+
+def bundle_lexicon(target_dir=NLTK_DATA_DIR):
+    """Kopiert das aufgelöste Lexikon ins Projekt (NLTK-Layout), damit Worker offline starten."""
+    source = lexicon_path()
+    target = _lexicon_candidates(target_dir)[0 if source.suffix == ".zip" else 1]
+    if source.resolve() != target.resolve():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, target)
+    return target
+
+
+def get_analyzer():
+    """VADER-Analyzer dieses Prozesses; wird beim ersten Aufruf aus dem aufgelösten Lexikon gebaut."""
+    global _sia
+    if _sia is None:
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+        # Wie SentimentIntensityAnalyzer.__init__, aber ohne nltk.data.load (Suchpfade, Download)
+        sia = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+        sia.lexicon_file = lexicon_text()
+        sia.lexicon = sia.make_lex_dict()
+        sia.constants = VaderConstants()
+        _sia = sia
+    return _sia
+
+
+def _init_worker():
+    get_analyzer()
+
+
+def _score_chunk(texts):
+    sia = get_analyzer()
+    return np.fromiter(
+        (sia.polarity_scores(text)["compound"] for text in texts),
+        dtype=np.float64,
+        count=len(texts)
+    )
+
+
+def _clean_text(text):
+    if text is None or (isinstance(text, float) and math.isnan(text)):
+        return ""
+    return str(text)
+
+
+def label_scores(scores):
+    scores = np.asarray(scores, dtype=np.float64)
+    return np.where(
+        scores > POSITIVE_THRESHOLD, "positive",
+        np.where(scores < NEGATIVE_THRESHOLD, "negative", "neutral")
+    )
+
+
+def scorer_version(backend=SENTIMENT_BACKEND):
+    """Fingerprint aus Lexikon-Inhalt, Schwellenwerten und Backend; ändert sich eines davon, ist der Cache ungültig."""
+    digest = hashlib.sha1()
+    digest.update(lexicon_text().encode("utf-8"))
+    digest.update(f"vader|{POSITIVE_THRESHOLD}|{NEGATIVE_THRESHOLD}".encode("utf-8"))
+    if backend != "vader":
+        digest.update(f"|{backend}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _score_pool(texts, workers, chunk_size, backend=SENTIMENT_BACKEND):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unbekanntes Scoring-Backend: {backend} (erlaubt: {', '.join(BACKENDS)})")
+    if backend == "numpy":
+        # Vektorisiert im eigenen Prozess; ein Pool lohnt sich hier nicht
+        from modules.numpy_vader import score_compound
+        return score_compound(texts)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    if workers <= 1:
+        parts = [_score_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            parts = list(pool.map(_score_chunk, chunks))
+    return np.concatenate(parts)
+
+
+def score_texts(texts, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, cache=None, backend=SENTIMENT_BACKEND):
+    """Bewertet Texte mit VADER in Chunks über einen Prozess-Pool. Gibt (compound, labels) als NumPy-Arrays zurück.
+
+    Mit `cache` (SentimentCache) werden bekannte und mehrfach vorkommende Texte nur einmal bewertet.
+    `backend="numpy"` nutzt den vektorisierten Scorer aus modules/numpy_vader.py (gleiche Compound-Scores).
+    """
+    texts = [_clean_text(t) for t in texts]
+    if not texts:
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype="<U8")
+
+    if cache is None:
+        scores = _score_pool(texts, workers, chunk_size, backend)
+    else:
+        known = cache.get_many(texts)
+        missing = list(dict.fromkeys(t for t in texts if t not in known))
+        if missing:
+            missing_scores = _score_pool(missing, workers, chunk_size, backend)
+            cache.put_many(zip(missing, missing_scores))
+            known.update(zip(missing, missing_scores))
+        scores = np.fromiter((known[t] for t in texts), dtype=np.float64, count=len(texts))
+
+    return scores, label_scores(scores)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VADER-Lexikon auflösen bzw. für Offline-Worker bündeln")
+    parser.add_argument("--bundle", action="store_true", help=f"Lexikon nach {NLTK_DATA_DIR} kopieren")
+    args = parser.parse_args()
+    if args.bundle:
+        print(f"📦 Lexikon gebündelt → {bundle_lexicon()}")
+    print(f"📖 Lexikon: {lexicon_path()} (Scorer-Version {scorer_version()})")
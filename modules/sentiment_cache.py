@@ -0,0 +1,127 @@
+import sys
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import SENTIMENT_CACHE_FILE, SENTIMENT_CACHE_MAX_ENTRIES
+from modules.scoring_engine import scorer_version
+
+# SQLite-Limit für Platzhalter pro Statement
+_QUERY_BATCH = 500
+
+
+def normalize_text(text):
+    # VADER tokenisiert an Whitespace; Groß-/Kleinschreibung bleibt relevant (CAPS-Verstärkung)
+    return " ".join(str(text).split())
+
+
+class SentimentCache:
+    """Persistenter LRU-Cache für Compound-Scores, Schlüssel = Hash(Scorer-Version + normalisierter Text).
+
+    Threadsicher: eine Verbindung mit check_same_thread=False, alle Abfragen unter einem Lock.
+    """
+
+    def __init__(self, path=SENTIMENT_CACHE_FILE, max_entries=SENTIMENT_CACHE_MAX_ENTRIES, version=None):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.version = version or scorer_version()
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " key TEXT PRIMARY KEY,"
+            " score REAL NOT NULL,"
+            " last_used INTEGER NOT NULL"
+            ")"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_last_used ON scores (last_used)")
+
+        # Lexikon oder Schwellenwerte geändert → alle Einträge verwerfen
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != self.version:
+            self.conn.execute("DELETE FROM scores")
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (self.version,))
+        self.conn.commit()
+
+        self._tick = self.conn.execute("SELECT COALESCE(MAX(last_used), 0) FROM scores").fetchone()[0]
+
+    def _key(self, text):
+        return hashlib.sha1(f"{self.version}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts):
+        """Gibt {text: score} für alle im Cache gefundenen Texte zurück und aktualisiert deren LRU-Zeitstempel.
+
+        Fehltreffer zählen je eindeutigem Text, damit die Trefferquote der tatsächlich gesparten Bewertungsarbeit entspricht.
+        """
+        texts = list(texts)
+        keys = {}
+        for text in texts:
+            keys.setdefault(self._key(text), []).append(text)
+
+        found = {}
+        key_list = list(keys)
+        with self._lock:
+            for i in range(0, len(key_list), _QUERY_BATCH):
+                batch = key_list[i:i + _QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                for key, score in self.conn.execute(
+                    f"SELECT key, score FROM scores WHERE key IN ({placeholders})", batch
+                ):
+                    for text in keys[key]:
+                        found[text] = score
+
+            if found:
+                self._tick += 1
+                hit_keys = [(self._tick, self._key(text)) for text in dict.fromkeys(found)]
+                with self.conn:
+                    self.conn.executemany("UPDATE scores SET last_used = ? WHERE key = ?", hit_keys)
+
+            # Jeder fehlende Text wird nur einmal bewertet (score_texts) → Wiederholungen im Batch zählen als Treffer
+            misses = len({text for text in texts if text not in found})
+            self.hits += len(texts) - misses
+            self.misses += misses
+        return found
+
+    def put_many(self, items):
+        items = list(items)
+        with self._lock:
+            self._tick += 1
+            rows = [(self._key(text), float(score), self._tick) for text, score in items]
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO scores (key, score, last_used) VALUES (?, ?, ?)", rows
+                )
+            self._evict()
+
+    def _evict(self):
+        with self._lock:
+            overflow = len(self) - self.max_entries
+            if overflow > 0:
+                with self.conn:
+                    self.conn.execute(
+                        "DELETE FROM scores WHERE key IN (SELECT key FROM scores ORDER BY last_used LIMIT ?)",
+                        (overflow,)
+                    )
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate, 4), "entries": len(self)}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -1,60 +1,217 @@
 import os
 import json
+import argparse
 import pandas as pd
 from pathlib import Path
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import nltk
 import sys
 sys.path.append(str(Path(__file__).resolve().parent.parent))  # Füge das Projektverzeichnis zum Pfad hinzu
 from config import (
     COMPANY_INFO,
-    get_news_filename,
-    FULL_SENTIMENT_FILE
+    FULL_SENTIMENT_FILE,
+    SENTIMENT_DATASET_DIR,
+    DAILY_CUBE_DATASET_DIR,
+    SENTIMENT_WATERMARK_FILE,
+    SENTIMENT_CACHE_FILE
 )
+from modules.article_store import read_articles, count_articles, store_url_index
+from modules.processed_store import (
+    SENTIMENT_COLUMNS,
+    append_sentiment,
+    write_sentiment,
+    append_full_sentiment,
+    write_cube,
+    append_cube
+)
+from modules.daily_cube import build_cube
+from modules.keyword_matcher import TAG_COLUMNS, keyword_tags
+from modules.scoring_engine import score_texts
+from modules.sentiment_cache import SentimentCache
+from modules.url_index import canonicalize_url, scored_namespace, bootstrap_scored_index
 
-# === VADER vorbereiten ===
-nltk.download('vader_lexicon', quiet=True)
-sia = SentimentIntensityAnalyzer()
+# === Sentiment-Stufe: Artikelspeicher → bewertete Artikel (CSV, Parquet-Dataset, Tages-Würfel) ===
+# Import ohne Nebenwirkungen; Ein- und Ausgaben sind Parameter (Standard: Live-Pfade aus config),
+# `base_dir` wählt einen anderen Artikelspeicher (inkl. dessen URL-Index, siehe article_store),
+# `cache_file` einen anderen Sentiment-Cache (Lasttests sollen den Live-Cache nicht verdrängen).
+# `analyze_articles` arbeitet rein im Speicher, z. B. für die Streamlit-App oder Worker-Prozesse.
+# Alle Schreiber (auch tools/batch_sentiment_engine.py) gehen über `append_scored`: CSV, Parquet,
+# Tages-Würfel und URL-Index bleiben so stets auf demselben Stand.
 
-# === Artikel sammeln ===
-all_articles = []
 
-for ticker, info in COMPANY_INFO.items():
-    file_path = get_news_filename(ticker)
-    if not os.path.exists(file_path):
-        continue
+# === Wasserzeichen: Anzahl bereits verarbeiteter Zeilen pro Ticker im Artikelspeicher ===
+def load_watermarks(path=SENTIMENT_WATERMARK_FILE):
+    if not Path(path).exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        articles = json.load(f)
 
-    for article in articles:
-        if article.get("sentiment_score") is not None:
-            continue  # Überspringe bereits analysierte Artikel
+def save_watermarks(watermarks, path=SENTIMENT_WATERMARK_FILE):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(watermarks, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
 
-        text = f"{article.get('title', '')}. {article.get('description', '')}".strip()
-        score = sia.polarity_scores(text)["compound"]
-        article["sentiment_score"] = round(score, 4)
-        article["sentiment_label"] = (
-            "positive" if score > 0.1 else "negative" if score < -0.1 else "neutral"
-        )
 
-    # === JSON-Datei aktualisieren ===
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(articles, f, ensure_ascii=False, indent=2)
+def score_pending(articles, cache):
+    # Überspringe bereits analysierte Artikel
+    pending = [a for a in articles if a.get("sentiment_score") is None]
+    texts = [f"{a.get('title', '')}. {a.get('description', '')}".strip() for a in pending]
+    scores, labels = score_texts(texts, cache=cache)
+    for article, score, label in zip(pending, scores, labels):
+        article["sentiment_score"] = round(float(score), 4)
+        article["sentiment_label"] = str(label)
+    return len(pending)
 
-    all_articles.extend(articles)
 
-# === Full Sentiment File (CSV) erstellen ===
-if all_articles:
-    df = pd.DataFrame(all_articles)
+def to_sentiment_frame(articles):
+    df = pd.DataFrame(articles).reindex(columns=SENTIMENT_COLUMNS)
     df = df[df["sentiment_score"].notnull()].copy()
     df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.normalize()
-    df.drop_duplicates(subset=["url"], inplace=True)
+    # Risiko-/ESG-Tags einmal pro Artikel; Seiten filtern nur noch auf diesen Spalten
+    df[TAG_COLUMNS] = keyword_tags(df)
+    return df
+
+
+def analyze_articles(articles, cache=None):
+    """Rohartikel (Liste von Dicts) → bewertete Artikel inkl. Keyword-Tags als DataFrame (ohne Speichern)."""
+    articles = [dict(a) for a in articles]
+    score_pending(articles, cache)
+    return to_sentiment_frame(articles) if articles else pd.DataFrame(columns=SENTIMENT_COLUMNS + TAG_COLUMNS)
+
+
+def append_scored(ticker, articles, url_index, scored_ns, output_file=FULL_SENTIMENT_FILE,
+                  dataset_dir=SENTIMENT_DATASET_DIR, cube_dir=DAILY_CUBE_DATASET_DIR):
+    """Hängt bewertete, noch nicht gespeicherte Artikel an CSV, Parquet und Würfel an; gibt sie als DataFrame zurück."""
+    df = to_sentiment_frame(articles) if articles else pd.DataFrame(columns=SENTIMENT_COLUMNS + TAG_COLUMNS)
+    canonical = df["url"].map(canonicalize_url)
+    is_new = [bool(key) and not url_index.contains(key, scored_ns) for key in canonical]
+    df = df[pd.Series(is_new, index=df.index, dtype=bool) & ~canonical.duplicated()]
+    if df.empty:
+        return df
+
+    append_sentiment(ticker, df, dataset_dir)
+    append_full_sentiment(df, output_file)
+    append_cube(build_cube(df), cube_dir)
+    url_index.add_new(df["url"], scored_ns)
+    return df
+
+
+def run_full(tickers=None, output_file=FULL_SENTIMENT_FILE, dataset_dir=SENTIMENT_DATASET_DIR,
+             cube_dir=DAILY_CUBE_DATASET_DIR, watermark_file=SENTIMENT_WATERMARK_FILE, base_dir=None,
+             cache_file=SENTIMENT_CACHE_FILE):
+    """Bewertet den kompletten Artikelspeicher neu; gibt die Anzahl gespeicherter Artikel zurück."""
+    # === Artikel sammeln ===
+    all_articles = []
+    watermarks = {}
+    output_file = Path(output_file)
+
+    for ticker in (tickers if tickers is not None else COMPANY_INFO):
+        # Altbestand + append-only Segmente; Rohdaten werden nicht mehr umgeschrieben
+        articles = read_articles(ticker, base_dir=base_dir)
+        watermarks[ticker] = len(articles)
+        all_articles.extend(articles)
+
+    # === VADER-Scoring gebündelt über den Prozess-Pool (bekannte Texte aus dem Cache) ===
+    cache = SentimentCache(cache_file)
+    if score_pending(all_articles, cache):
+        print(f"🧠 Sentiment-Cache: {cache.stats()}")
+
+    # === Full Sentiment File (CSV) erstellen ===
+    if not all_articles:
+        print("🔁 Keine neuen Artikel zum Analysieren.")
+        return 0
+
+    df = to_sentiment_frame(all_articles)
+    df["canonical_url"] = df["url"].map(canonicalize_url)
+    df = df.drop_duplicates(subset=["canonical_url"]).drop(columns=["canonical_url"])
 
     # Sortierung & finale Speicherung
     df.sort_values(by=["ticker", "date"], inplace=True)
-    FULL_SENTIMENT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(FULL_SENTIMENT_FILE, index=False)
-    print(f"✅ {len(df)} Artikel mit Sentiment gespeichert → {FULL_SENTIMENT_FILE.name}")
-else:
-    print("🔁 Keine neuen Artikel zum Analysieren.")
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(output_file, index=False)
+    for ticker, part in df.groupby("ticker"):
+        write_sentiment(ticker, part, dataset_dir)
+    write_cube(build_cube(df), cube_dir)
+
+    # URL-Index des Ausgabefiles spiegelt exakt den neu geschriebenen Bestand
+    url_index = store_url_index(base_dir)
+    url_index.reset(scored_namespace(output_file))
+    url_index.add_new(df["url"], scored_namespace(output_file))
+    save_watermarks(watermarks, watermark_file)
+    print(f"✅ {len(df)} Artikel mit Sentiment gespeichert → {output_file.name}")
+    return len(df)
+
+
+def run_incremental(tickers=None, output_file=FULL_SENTIMENT_FILE, dataset_dir=SENTIMENT_DATASET_DIR,
+                    cube_dir=DAILY_CUBE_DATASET_DIR, watermark_file=SENTIMENT_WATERMARK_FILE, rescan=False,
+                    base_dir=None, cache_file=SENTIMENT_CACHE_FILE):
+    """Bewertet nur Artikel nach dem Wasserzeichen und hängt sie an; gibt die Anzahl neuer Artikel zurück.
+
+    rescan=True liest jeden Ticker ab Zeile 0; bereits gespeicherte URLs überspringt der URL-Index.
+    """
+    tickers = list(tickers if tickers is not None else COMPANY_INFO)
+    outputs = dict(tickers=tickers, output_file=output_file, dataset_dir=dataset_dir,
+                   cube_dir=cube_dir, watermark_file=watermark_file, base_dir=base_dir, cache_file=cache_file)
+    output_file = Path(output_file)
+    watermarks = load_watermarks(watermark_file)
+    if not watermarks or not output_file.exists():
+        print("ℹ️ Kein Wasserzeichen vorhanden – einmaliger Full Rebuild.")
+        return run_full(**outputs)
+    if not set(TAG_COLUMNS) <= set(pd.read_csv(output_file, nrows=0).columns):
+        print("ℹ️ Bestand ohne Keyword-Tags – einmaliger Full Rebuild.")
+        return run_full(**outputs)
+
+    # Nur Ticker mit neuen Zeilen im Artikelspeicher (Zählung aus dem Manifest, ohne Daten zu lesen)
+    changed = {}
+    for ticker in tickers:
+        total = count_articles(ticker, base_dir=base_dir)
+        offset = 0 if rescan else watermarks.get(ticker, 0)
+        if total < offset:
+            print(f"⚠️ {ticker}: Artikelspeicher kleiner als Wasserzeichen – Full Rebuild.")
+            return run_full(**outputs)
+        if total > offset:
+            changed[ticker] = (offset, total)
+        elif rescan:
+            watermarks[ticker] = total
+
+    if not changed:
+        print("🔁 Keine neuen Artikel zum Analysieren.")
+        if rescan:
+            save_watermarks(watermarks, watermark_file)
+        return 0
+
+    cache = SentimentCache(cache_file)
+    url_index = store_url_index(base_dir)
+    scored_ns = bootstrap_scored_index(url_index, output_file)
+    appended = 0
+
+    for ticker, (offset, total) in changed.items():
+        articles = read_articles(ticker, start=offset, base_dir=base_dir)
+        score_pending(articles, cache)
+        df = append_scored(ticker, articles, url_index, scored_ns, output_file, dataset_dir, cube_dir)
+
+        # Wasserzeichen erst nach erfolgreichem Schreiben fortschreiben
+        watermarks[ticker] = total
+        save_watermarks(watermarks, watermark_file)
+        appended += len(df)
+        if len(df) or not rescan:
+            print(f"✅ {ticker}: +{len(df)} Artikel (Offset {offset} → {total})")
+
+    print(f"🧠 Sentiment-Cache: {cache.stats()}")
+    print(f"✅ {appended} neue Artikel angehängt → {output_file.name}")
+    return appended
+
+
+def main(incremental=False):
+    return run_incremental() if incremental else run_full()
+
+
+# Guard ist für den Prozess-Pool nötig (spawn-Start unter Windows/macOS)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VADER-Sentiment für alle Artikel im Speicher")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Nur Artikel nach dem Wasserzeichen bewerten und anhängen")
+    args = parser.parse_args()
+    main(incremental=args.incremental)
@@ -0,0 +1,173 @@
+import sys
+import math
+import sqlite3
+import hashlib
+import threading
+import pandas as pd
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import URL_INDEX_FILE
+
+# === Tracking-Parameter, die für die Identität eines Artikels keine Rolle spielen ===
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid",
+    "ref", "ref_src", "cmpid", "ocid", "smid", "guccounter", "guce_referrer", "guce_referrer_sig"
+}
+TRACKING_PREFIXES = ("utm_",)
+
+
+def canonicalize_url(url):
+    """Normalisiert eine URL: ohne Schema, www., Fragment, Tracking-Parameter und abschließende Slashes."""
+    if not url:
+        return ""
+    url = str(url).strip()
+    parts = urlsplit(url if "://" in url else f"//{url}")
+
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.endswith(":80") or host.endswith(":443"):
+        host = host.rsplit(":", 1)[0]
+
+    path = parts.path.rstrip("/")
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    canonical = host + path
+    if query:
+        canonical += "?" + urlencode(sorted(query))
+    return canonical
+
+
+# === Bloom-Filter als optionale In-Memory-Vorstufe ===
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(int(capacity), 1)
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+# === Persistenter Seen-URL-Index (SQLite) ===
+class UrlIndex:
+    """Ein Index für alle Fetcher und Sentiment-Engines; Namespaces trennen z. B. 'news:ADS' von 'scored:…'.
+
+    Die Verbindung darf aus mehreren Threads genutzt werden (z. B. Streamlit-Reruns); jede Abfrage läuft unter einem Lock.
+    """
+
+    def __init__(self, path=URL_INDEX_FILE, use_bloom=False, bloom_error_rate=0.001):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            " namespace TEXT NOT NULL,"
+            " url TEXT NOT NULL,"
+            " PRIMARY KEY (namespace, url)"
+            ") WITHOUT ROWID"
+        )
+        self.conn.commit()
+        self.use_bloom = use_bloom
+        self.bloom_error_rate = bloom_error_rate
+        self._blooms = {}
+
+    def _bloom(self, namespace):
+        if not self.use_bloom:
+            return None
+        with self._lock:
+            if namespace in self._blooms:
+                return self._blooms[namespace]
+            capacity = max(self.count(namespace) * 2, 10_000)
+            bloom = BloomFilter(capacity, self.bloom_error_rate)
+            for (url,) in self.conn.execute("SELECT url FROM seen WHERE namespace = ?", (namespace,)):
+                bloom.add(url)
+            self._blooms[namespace] = bloom
+            return bloom
+
+    def count(self, namespace):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM seen WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def contains(self, url, namespace):
+        key = canonicalize_url(url)
+        bloom = self._bloom(namespace)
+        if bloom is not None and key not in bloom:
+            return False
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM seen WHERE namespace = ? AND url = ?", (namespace, key)
+            ).fetchone()
+        return row is not None
+
+    def add_new(self, urls, namespace):
+        """Trägt URLs ein und gibt je URL zurück, ob sie neu war (auch Dubletten innerhalb des Batches zählen nur einmal)."""
+        bloom = self._bloom(namespace)
+        flags = []
+        with self._lock, self.conn:
+            for url in urls:
+                key = canonicalize_url(url)
+                if not key:
+                    flags.append(False)
+                    continue
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO seen (namespace, url) VALUES (?, ?)", (namespace, key)
+                )
+                is_new = cursor.rowcount == 1
+                if is_new and bloom is not None:
+                    bloom.add(key)
+                flags.append(is_new)
+        return flags
+
+    def reset(self, namespace):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM seen WHERE namespace = ?", (namespace,))
+            self._blooms.pop(namespace, None)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def scored_namespace(output_file):
+    # Namespace der bereits bewerteten URLs einer Ausgabedatei (absoluter Pfad, gleichnamige Dateien kollidieren nicht)
+    return f"scored:{Path(output_file).resolve()}"
+
+
+def bootstrap_scored_index(index, output_file, chunksize=100_000):
+    """Importiert die URLs einer bestehenden Ausgabedatei einmalig in ihren 'scored'-Namespace."""
+    namespace = scored_namespace(output_file)
+    if Path(output_file).exists() and index.count(namespace) == 0:
+        for chunk in pd.read_csv(output_file, usecols=["url"], chunksize=chunksize):
+            index.add_new(chunk["url"].dropna(), namespace)
+    return namespace
+
+
+_shared_indexes = {}
+_shared_lock = threading.Lock()
+
+
+def get_url_index(path=URL_INDEX_FILE):
+    """Prozessweit gemeinsam genutzte Instanz je Indexdatei (threadsicher)."""
+    key = str(Path(path).resolve())
+    with _shared_lock:
+        if key not in _shared_indexes:
+            _shared_indexes[key] = UrlIndex(path)
+    return _shared_indexes[key]
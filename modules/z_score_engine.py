@@ -1,48 +1,198 @@
-import os
+import argparse
+import numpy as np
 import pandas as pd
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
-from config import FULL_SENTIMENT_FILE, PROCESSED_DIR
+from config import (
+    FULL_SENTIMENT_FILE,
+    SENTIMENT_DATASET_DIR,
+    Z_SCORE_FILE,
+    Z_SCORE_DATASET_DIR,
+    Z_SCORE_STATE_FILE,
+    DUMMY_FULL_SENTIMENT_FILE,
+    DUMMY_SENTIMENT_DATASET_DIR,
+    DUMMY_Z_SCORE_FILE,
+    DUMMY_Z_SCORE_DATASET_DIR,
+    DUMMY_Z_SCORE_STATE_FILE
+)
+from modules.processed_store import read_sentiment, read_z_scores, write_z_scores, append_z_scores
+from modules.rolling_stats import DEFAULT_WINDOWS, MIN_PERIODS, z_score_panel
+from modules.online_z_score import ZScoreState
 
 # === Parameter ===
-ROLLING_WINDOW = 30
-Z_SCORE_FILE = PROCESSED_DIR / "z_scores.csv"
+ROLLING_WINDOW = 30  # Standardfenster für die CSV-Ausgabe; das Dataset enthält alle DEFAULT_WINDOWS
 
-# === Lade Sentimentdaten ===
-if not FULL_SENTIMENT_FILE.exists():
-    raise FileNotFoundError(f"{FULL_SENTIMENT_FILE} not found. Run sentiment_engine.py first.")
+# Verification: erlaubte Abweichung Online ↔ Batch
+VERIFY_TOLERANCE = 1e-9
 
-df = pd.read_csv(FULL_SENTIMENT_FILE, parse_dates=["date"])
 
-# === Tagesdurchschnitt pro Unternehmen ===
-daily = (
-    df.groupby(["ticker", "date"])
-    .agg(mean_sentiment=("sentiment_score", "mean"), count=("sentiment_score", "count"))
-    .reset_index()
-)
+def _paths(dummy, dataset_dir=None, fallback_csv=None, z_file=None, z_dataset_dir=None, state_file=None):
+    """Ein- und Ausgabepfade (Live bzw. Dummy); explizit übergebene Pfade haben Vorrang."""
+    defaults = (
+        (DUMMY_SENTIMENT_DATASET_DIR, DUMMY_FULL_SENTIMENT_FILE,
+         DUMMY_Z_SCORE_FILE, DUMMY_Z_SCORE_DATASET_DIR, DUMMY_Z_SCORE_STATE_FILE) if dummy
+        else (SENTIMENT_DATASET_DIR, FULL_SENTIMENT_FILE, Z_SCORE_FILE, Z_SCORE_DATASET_DIR, Z_SCORE_STATE_FILE)
+    )
+    given = (dataset_dir, fallback_csv, z_file, z_dataset_dir, state_file)
+    return tuple(Path(g) if g is not None else d for g, d in zip(given, defaults))
 
-# === Sortieren für Rolling-Operationen
-daily = daily.sort_values(by=["ticker", "date"])
 
-# === Rolling-Mittelwert & -Stdabweichung (3 Tage)
-daily["rolling_mean"] = (
-    daily.groupby("ticker")["mean_sentiment"]
-    .transform(lambda x: x.rolling(window=ROLLING_WINDOW, min_periods=3).mean())
-)
-daily["rolling_std"] = (
-    daily.groupby("ticker")["mean_sentiment"]
-    .transform(lambda x: x.rolling(window=ROLLING_WINDOW, min_periods=3).std())
-)
+def load_daily(dataset_dir=SENTIMENT_DATASET_DIR, fallback_csv=FULL_SENTIMENT_FILE, start=None, end=None):
+    # === Tagesdurchschnitt pro Unternehmen ===
+    df = read_sentiment(start=start, end=end, columns=["date", "ticker", "sentiment_score"],
+                        dataset_dir=dataset_dir, fallback_csv=fallback_csv)
+    return daily_means(df)
+
+
+def daily_means(df):
+    """Bewertete Artikel (date, ticker, sentiment_score) → (ticker, date, mean_sentiment, count)."""
+    df = df.assign(date=pd.to_datetime(df["date"]).dt.normalize())
+    return (
+        df.groupby(["ticker", "date"])
+        .agg(mean_sentiment=("sentiment_score", "mean"), count=("sentiment_score", "count"))
+        .reset_index()
+    )
+
+
+def to_legacy_frame(panel, window=ROLLING_WINDOW):
+    # Bisheriges CSV-Format: ein Fenster, nur Zeilen mit gültigem Z-Score
+    legacy = panel[["ticker", "date", "mean_sentiment", "count"]].assign(
+        rolling_mean=panel[f"rolling_mean_{window}"],
+        rolling_std=panel[f"rolling_std_{window}"],
+        z_score=panel[f"z_score_{window}"]
+    )
+    return legacy.dropna(subset=["z_score"])
+
+
+def compute_z_scores(daily, windows=DEFAULT_WINDOWS):
+    """Tageswerte (ticker, date, mean_sentiment, count) → Panel mit Rolling-Kennzahlen aller Fenster (ohne I/O)."""
+    # Rolling-Mittelwert, -Stdabweichung & Z-Score für alle Fenster in einem Durchlauf
+    windows = sorted(set(windows) | {ROLLING_WINDOW})
+    return z_score_panel(daily, windows=windows, min_periods=MIN_PERIODS)
+
+
+def run_batch(dummy=False, windows=DEFAULT_WINDOWS, **paths):
+    """Vollständige Neuberechnung; `paths` (dataset_dir, fallback_csv, z_file, z_dataset_dir, state_file) überschreibt die Standardpfade."""
+    dataset_dir, fallback_csv, z_file, z_dataset_dir, state_file = _paths(dummy, **paths)
+    try:
+        daily = load_daily(dataset_dir, fallback_csv)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"{fallback_csv} not found. Run sentiment_engine.py first.")
+
+    windows = sorted(set(windows) | {ROLLING_WINDOW})
+    panel = compute_z_scores(daily, windows)
+
+    # === Speichern
+    z_file.parent.mkdir(parents=True, exist_ok=True)
+    to_legacy_frame(panel).to_csv(z_file, index=False)
+    write_z_scores(panel, z_dataset_dir)
+
+    # Online-Zustand (Ringpuffer der letzten ROLLING_WINDOW Tage) für spätere Inkremente
+    ZScoreState.from_daily(daily, ROLLING_WINDOW).save(state_file)
+
+    print(f"✅ Z-Scores ({ROLLING_WINDOW}-Tage) gespeichert nach: {z_file}")
+    print(f"✅ Z-Scores für {len(windows)} Fenster ({windows[0]}–{windows[-1]} Tage) → {z_dataset_dir}")
+    return panel
+
+
+def online_panel(daily, start, windows=DEFAULT_WINDOWS, z_dataset_dir=Z_SCORE_DATASET_DIR):
+    """Panel aller Fenster für die neuen Tage ab `start`; die Vortage liefert das bestehende Z-Score-Dataset.
+
+    Fenster sind Kalendertage, daher genügen die letzten max(windows) - 1 Tage als Vorlauf.
+    """
+    windows = sorted(set(windows) | {ROLLING_WINDOW})
+    history = read_z_scores(start=start - pd.Timedelta(days=windows[-1] - 1), end=start - pd.Timedelta(days=1),
+                            columns=["ticker", "date", "mean_sentiment", "count"], dataset_dir=z_dataset_dir)
+    panel = compute_z_scores(pd.concat([history, daily], ignore_index=True), windows)
+    return panel[panel["date"] >= start].reset_index(drop=True) if not panel.empty else panel
+
+
+def run_online(dummy=False, until=None, windows=DEFAULT_WINDOWS, **paths):
+    """Verarbeitet nur Tage nach dem letzten Zustand (bis einschließlich `until`, Standard: gestern).
+
+    Schreibt wie `run_batch` die CSV (ROLLING_WINDOW) und das Parquet-Dataset (alle Fenster) fort.
+    Nachträglich eintreffende Artikel für bereits verarbeitete Tage fließen erst beim nächsten
+    Batch-Lauf ein; `verify` zeigt eine solche Abweichung an.
+    """
+    dataset_dir, fallback_csv, z_file, z_dataset_dir, state_file = _paths(dummy, **paths)
+    state = ZScoreState.load(state_file)
+    if state is None or state.window != ROLLING_WINDOW or not z_file.exists() or not z_dataset_dir.exists():
+        print("ℹ️ Kein Online-Zustand vorhanden – einmaliger Batch-Lauf.")
+        return run_batch(dummy, windows, **paths)
+
+    until = pd.Timestamp(until).normalize() if until is not None else pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
+    start = state.last_date + pd.Timedelta(days=1)
+    if start > until:
+        print("🔁 Keine neuen Tage für Z-Scores.")
+        return
+
+    daily = load_daily(dataset_dir, fallback_csv, start=start, end=until)
+    rows = state.update(daily)
+    state.last_date = max(state.last_date, until)
+
+    new_rows = rows.dropna(subset=["z_score"])
+    if not new_rows.empty:
+        new_rows.to_csv(z_file, mode="a", header=False, index=False)
+    if not daily.empty:
+        append_z_scores(online_panel(daily, start, windows, z_dataset_dir), z_dataset_dir)
+    state.save(state_file)
+    print(f"✅ Online-Update {start.date()} → {until.date()}: {len(rows)} Tageswerte, {len(new_rows)} neue Z-Scores "
+          f"→ {z_file.name}, {z_dataset_dir.name}")
+
+
+def verify(dummy=False, tolerance=VERIFY_TOLERANCE, **paths):
+    """Vergleicht Online-Zustand und Z-Score-CSV mit einer vollständigen Batch-Berechnung."""
+    dataset_dir, fallback_csv, z_file, _, state_file = _paths(dummy, **paths)
+    state = ZScoreState.load(state_file)
+    if state is None:
+        print("❌ Kein Online-Zustand vorhanden.")
+        return False
+
+    batch = z_score_panel(load_daily(dataset_dir, fallback_csv), windows=[ROLLING_WINDOW], min_periods=MIN_PERIODS)
+    batch = batch[batch["date"] <= state.last_date]
+    mean_col, std_col, z_col = (f"rolling_mean_{ROLLING_WINDOW}", f"rolling_std_{ROLLING_WINDOW}", f"z_score_{ROLLING_WINDOW}")
+
+    # Zustand: Mittelwert/Streuung am letzten beobachteten Tag je Ticker
+    latest = batch.sort_values("date").groupby("ticker").tail(1).set_index("ticker")
+    state_diff = 0.0
+    for ticker, row in latest.iterrows():
+        ticker_state = state.tickers.get(str(ticker))
+        if ticker_state is None or ticker_state.last_day != row["date"].toordinal():
+            continue
+        mean, std, _ = ticker_state.stats()
+        for a, b in ((mean, row[mean_col]), (std, row[std_col])):
+            if not (np.isnan(a) and np.isnan(b)):
+                state_diff = max(state_diff, abs(a - b))
+
+    # Ausgabe: alle Z-Scores der CSV gegen die gültigen Batch-Werte
+    written = pd.read_csv(z_file, parse_dates=["date"], dtype={"ticker": str})
+    expected = batch.dropna(subset=[z_col])[["ticker", "date", z_col]]
+    merged = written.merge(expected, on=["ticker", "date"], how="outer", indicator=True)
+    missing = int((merged["_merge"] != "both").sum())
+    both = merged[merged["_merge"] == "both"]
+    z_diff = float(np.nanmax(np.abs(both["z_score"] - both[z_col]))) if not both.empty else 0.0
+
+    ok = state_diff <= tolerance and z_diff <= tolerance and missing == 0
+    print(f"{'✅' if ok else '❌'} Verify: max |Δ Zustand| = {state_diff:.2e}, max |Δ z| = {z_diff:.2e}, "
+          f"fehlende/überzählige Zeilen = {missing} (Toleranz {tolerance:g})")
+    return ok
 
-# === Z-Score berechnen
-daily["z_score"] = (daily["mean_sentiment"] - daily["rolling_mean"]) / daily["rolling_std"]
 
-# === Ungültige Zeilen entfernen
-daily = daily.dropna(subset=["z_score"])
+def main(dummy=False, online=False, until=None, windows=DEFAULT_WINDOWS):
+    if online:
+        return run_online(dummy, until, windows)
+    return run_batch(dummy, windows)
 
-# === Speichern
-PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
-daily.to_csv(Z_SCORE_FILE, index=False)
 
-print(f"✅ 3-Tage-Z-Scores gespeichert nach: {Z_SCORE_FILE}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling Z-Scores der Tages-Sentiments für mehrere Fenster")
+    parser.add_argument("--dummy", action="store_true", help="Dummy-Daten statt Live-Daten verwenden")
+    parser.add_argument("--online", action="store_true",
+                        help="Nur neue Tage über den persistierten Welford-Zustand fortschreiben")
+    parser.add_argument("--until", help="Letzter zu verarbeitender Tag im Online-Modus (YYYY-MM-DD, Standard: gestern)")
+    parser.add_argument("--verify", action="store_true", help="Online-Zustand gegen Batch-Berechnung prüfen")
+    args = parser.parse_args()
+    if args.verify:
+        sys.exit(0 if verify(dummy=args.dummy) else 1)
+    main(dummy=args.dummy, online=args.online, until=args.until)
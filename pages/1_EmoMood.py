@@ -6,7 +6,8 @@ import os
 from pathlib import Path
 from datetime import datetime, timedelta
 from utils.emomood_report_generator import generate_emomood_html
-from config import DUMMY_FULL_SENTIMENT_FILE, COMPANY_INFO, EMOTECT_LOGO
+from config import COMPANY_INFO, EMOTECT_LOGO
+from utils.data_access import get_cube, data_available
 
 # === Init ===
 os.makedirs("temp", exist_ok=True)
@@ -26,10 +27,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# === Load Data ===
-df = pd.read_csv(DUMMY_FULL_SENTIMENT_FILE, parse_dates=["date"])
-df["sentiment_score"] = pd.to_numeric(df["sentiment_score"], errors="coerce")
-
 # === Sidebar: Date Filter ===
 st.sidebar.markdown("### 🗓️ Time Range")
 range_options = {"Past 1 Day": 1, "Past 7 Days": 7, "Past 14 Days": 14, "Past 30 Days": 30}
@@ -37,27 +34,36 @@ selected_range = st.sidebar.selectbox("Aggregate sentiment over:", list(range_op
 
 use_slider = st.sidebar.checkbox("🔧 Use manual date range", value=False)
 
+if not data_available():
+    st.error("❌ Dummy-Sentiment Data missing.")
+    st.stop()
+
+cube = get_cube()
+if cube.empty:
+    st.warning("No daily sentiment aggregates available yet.")
+    st.stop()
+
 if use_slider:
-    min_date = df["date"].min().date()
-    max_date = df["date"].max().date()
+    min_date = cube.min_date.date()
+    max_date = cube.max_date.date()
     start_date, end_date = st.sidebar.slider("Date Range", min_value=min_date, max_value=max_date,
         value=(max_date - timedelta(days=range_options[selected_range]), max_date))
 else:
     end_date = datetime.now().date()
     start_date = end_date - timedelta(days=range_options[selected_range])
 
-df = df[df["date"].between(pd.to_datetime(start_date), pd.to_datetime(end_date))]
 date_range_str = f"{start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
 
-# === Aggregation ===
-current_df = df[df["date"].between(pd.to_datetime(start_date), pd.to_datetime(end_date))]
-current_avg = current_df.groupby("ticker")["sentiment_score"].mean().reset_index()
-current_avg.columns = ["ticker", "sentiment"]
-
+# === Aggregation (Präfixsummen des Tages-Würfels, unabhängig von der Artikelanzahl) ===
 prev_start = pd.to_datetime(start_date) - timedelta(days=range_options[selected_range])
 prev_end = pd.to_datetime(start_date) - timedelta(days=1)
-prev_df = df[df["date"].between(prev_start, prev_end)]
-prev_avg = prev_df.groupby("ticker")["sentiment_score"].mean().reset_index()
+
+current_avg = cube.window(start_date, end_date)
+current_avg = current_avg[current_avg["article_count"] > 0][["ticker", "sentiment_mean"]]
+current_avg.columns = ["ticker", "sentiment"]
+
+prev_avg = cube.window(prev_start, prev_end)
+prev_avg = prev_avg[prev_avg["article_count"] > 0][["ticker", "sentiment_mean"]]
 prev_avg.columns = ["ticker", "prev_sentiment"]
 
 avg_sentiment = pd.merge(current_avg, prev_avg, on="ticker", how="left")
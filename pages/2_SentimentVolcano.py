@@ -2,7 +2,6 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-import re
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -20,21 +19,10 @@ st.markdown("""
 
 # === Imports aus Projektstruktur ===
 sys.path.append(str(Path(__file__).resolve().parent.parent))
-from config import DUMMY_FULL_SENTIMENT_FILE, COMPANY_INFO
+from config import COMPANY_INFO
+from utils.data_access import get_cube, data_available
 from utils.negative_pressure_report_generator import generate_pressure_html
 
-# === Schlüsselwörter
-RISK_KEYWORDS = [
-    "fraud", "scandal", "layoffs", "corruption", "bribery",
-    "leak", "hack", "fine", "lawsuit", "whistleblower",
-    "investigation", "collapse", "resignation", "probe", "recession", "bad", "loss"
-]
-
-def count_keywords(text, keywords):
-    if pd.isna(text):
-        return 0
-    return sum(bool(re.search(rf"{re.escape(k)}", str(text).lower())) for k in keywords)
-
 def classify_volcano_level(pressure):
     if pressure < 3: return "calm"
     elif pressure < 6: return "smoking"
@@ -46,21 +34,12 @@ def classify_alert(pressure):
     elif pressure >= 5: return "🔶 Volcano Warning"
     return None
 
-# === Daten einlesen
-if not DUMMY_FULL_SENTIMENT_FILE.exists():
+# === Daten einlesen (Tages-Würfel mit vorberechneten Risiko-Treffern)
+if not data_available():
     st.error("❌ Dummy-Sentiment Data missing.")
     st.stop()
 
-df = pd.read_csv(DUMMY_FULL_SENTIMENT_FILE, parse_dates=["date"])
-
-# 🔄 Sicherstellen, dass Ticker konsistent groß sind
-df["ticker"] = df["ticker"].str.upper()
-
-# === Filter last 7 days ===
-today = pd.to_datetime(datetime.now().date())
-one_week_ago = today - timedelta(days=7)
-
-df = df[df["date"].between(one_week_ago, today)]
+cube = get_cube()
 
 # === Auswahlbereich: Dropdown oder Slider
 st.sidebar.markdown("### 🗓️ Time Interval")
@@ -71,8 +50,8 @@ day_span = day_options[selected_range]
 use_slider = st.sidebar.checkbox("🔧 Time-Slider instead of Dropdown", value=False)
 
 if use_slider:
-    min_date = df["date"].min().date()
-    max_date = df["date"].max().date()
+    min_date = cube.min_date.date()
+    max_date = cube.max_date.date()
     start_date, end_date = st.sidebar.slider(
         "Date Interval",
         min_value=min_date,
@@ -90,23 +69,14 @@ else:
     end_date = today
     start_date = today - timedelta(days=day_span)
 
-# ✅ Gültiger Vergleich mit datetime64-Spalte
-df = df[df["date"].between(start_date, end_date)]
 date_range_str = f"{start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
 
 
-# === Risk-Zählung (nur über Keywords – Sentimentfilter entfernt)
-df["risk_hits_title"] = df["title"].apply(lambda x: count_keywords(x, RISK_KEYWORDS))
-df["risk_hits_desc"] = df["description"].apply(lambda x: count_keywords(x, RISK_KEYWORDS))
-df["risk_hits_total"] = df["risk_hits_title"] + df["risk_hits_desc"]
-df_risky = df[df["risk_hits_total"] > 0].copy()
-
-# === Volcano-Level aggregieren
-# === Volcano-Level aggregieren & normalisieren
-volcano_df = df_risky.groupby("ticker").agg(
-    pressure=("risk_hits_total", "sum"),
-    article_count=("title", "count")
-).reset_index()
+# === Risk-Zählung (nur über Keywords – Sentimentfilter entfernt), Fenstersummen aus dem Würfel
+window_df = cube.window(start_date, end_date)
+volcano_df = window_df[window_df["risky_articles"] > 0][["ticker", "risk_hits", "risky_articles"]]
+volcano_df = volcano_df.rename(columns={"risk_hits": "pressure", "risky_articles": "article_count"})
+volcano_df = volcano_df.astype({"pressure": int, "article_count": int}).reset_index(drop=True)
 
 # Anzahl der Tage im gewählten Intervall (mind. 1, damit keine Division durch 0)
 volcano_df["days"] = (end_date - start_date).days or 1
@@ -139,7 +109,8 @@ location_df = pd.DataFrame([
 merged_df = pd.merge(volcano_df, location_df, on="ticker", how="inner")
 
 # === Letzter Snapshot
-latest_date = df["date"].max()
+daily_df = cube.frame(start_date, end_date)
+latest_date = daily_df["date"].max()
 title_str = latest_date.strftime("%Y-%m-%d") if isinstance(latest_date, pd.Timestamp) else "Unknown"
 
 # === Farben und Labels
@@ -229,8 +200,9 @@ if st.sidebar.checkbox("📘 Show Legend", value=True):
     """, unsafe_allow_html=True)
 
 # Zählung nach Woche + Ticker
-df_risky["week"] = df_risky["date"].dt.to_period("W").apply(lambda r: r.start_time)
-weekly_df = df_risky.groupby(["week", "ticker"])["risk_hits_total"].sum().reset_index()
+df_risky = daily_df[daily_df["risky_articles"] > 0].rename(columns={"risk_hits": "risk_hits_total"})
+df_risky["week"] = df_risky["date"].dt.to_period("W").dt.start_time
+weekly_df = df_risky.groupby(["week", "ticker"])["risk_hits_total"].sum().astype(int).reset_index()
 
 # === Alerts anzeigen
 st.subheader("🚨 Active Volcano Alerts")
@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from config import DUMMY_FULL_SENTIMENT_FILE, DUMMY_Z_SCORE_FILE, COMPANY_INFO, EMOTECT_LOGO
+from config import DUMMY_Z_SCORE_FILE, COMPANY_INFO, EMOTECT_LOGO
+from utils.data_access import get_z_scores, get_lead_lag_summary, data_available
 from utils.zscore_report_generator import generate_zscore_report_html
 from pathlib import Path
 
@@ -36,14 +37,6 @@ company_options = {info["name"]: ticker for ticker, info in COMPANY_INFO.items()
 selected_name = st.selectbox("Select Company:", sorted(company_options.keys()))
 ticker = company_options[selected_name]
 
-# === Load Data ===
-if not DUMMY_FULL_SENTIMENT_FILE.exists():
-    st.error("❌ Sentiment data file not found.")
-    st.stop()
-
-df = pd.read_csv(DUMMY_FULL_SENTIMENT_FILE, parse_dates=["date"])
-df = df[df["ticker"] == ticker]
-
 # === Date Filter ===
 st.sidebar.markdown("### Time Interval")
 interval_options = {
@@ -56,21 +49,27 @@ selected_days = interval_options[st.sidebar.selectbox("Aggregate data over:", li
 
 today = pd.to_datetime("today").normalize()
 start_date = today - pd.Timedelta(days=selected_days)
-df = df[df["date"].between(start_date, today)]
 
-if df.empty:
-    st.warning("No articles found for this company.")
+# === Load Data (vorberechnete Z-Scores aller Rolling-Fenster) ===
+if not data_available():
+    st.error("❌ Sentiment data file not found.")
     st.stop()
 
-# === Daily Aggregation & Z-Score ===
-df["date"] = pd.to_datetime(df["date"]).dt.date
-df_daily = df.groupby("date").agg({"sentiment_score": "mean"}).reset_index()
-df_daily["date"] = pd.to_datetime(df_daily["date"])
+df_z = get_z_scores(tickers=[ticker], start=start_date, end=today)
 
-window = st.slider("Rolling Window Size", min_value=3, max_value=30, value=max(5, min(14, len(df_daily) // 2)))
-df_daily["mean"] = df_daily["sentiment_score"].rolling(window, min_periods=3).mean()
-df_daily["std"] = df_daily["sentiment_score"].rolling(window, min_periods=3).std()
-df_daily["z_score"] = (df_daily["sentiment_score"] - df_daily["mean"]) / df_daily["std"]
+if df_z.empty:
+    st.warning("No articles found for this company.")
+    st.stop()
+
+# === Daily Aggregation & Z-Score (Slider wählt nur die passende Spalte) ===
+window = st.slider("Rolling Window Size", min_value=3, max_value=30, value=max(5, min(14, len(df_z) // 2)))
+df_daily = pd.DataFrame({
+    "date": df_z["date"],
+    "sentiment_score": df_z["mean_sentiment"],
+    "mean": df_z[f"rolling_mean_{window}"],
+    "std": df_z[f"rolling_std_{window}"],
+    "z_score": df_z[f"z_score_{window}"]
+})
 df_daily["z_score_smooth"] = df_daily["z_score"].ewm(span=3).mean()
 
 latest_z = df_daily["z_score"].iloc[-1]
@@ -127,6 +126,37 @@ with col2:
     ))
     st.plotly_chart(gauge_fig, use_container_width=True)
 
+# === Lead/Lag-Heatmap (vorberechnet von modules/lead_lag.py) ===
+st.subheader("Sentiment ↔ Return Lead/Lag")
+lead_lag_df = get_lead_lag_summary()
+if lead_lag_df is None or lead_lag_df.empty:
+    st.info("No lead/lag matrix yet. Run `python modules/lead_lag.py --dummy` to compute it.")
+else:
+    method = st.radio("Correlation", ["Pearson", "Spearman"], horizontal=True)
+    heatmap = lead_lag_df.pivot(index="ticker", columns="lag", values=method.lower()).sort_index()
+    labels = [COMPANY_INFO.get(t, {}).get("name", t) for t in heatmap.index]
+    heat_fig = go.Figure(go.Heatmap(
+        z=heatmap.to_numpy(),
+        x=[f"{lag:+d}" for lag in heatmap.columns],
+        y=labels,
+        colorscale="RdBu",
+        zmid=0,
+        zmin=-1,
+        zmax=1,
+        colorbar=dict(title="corr")
+    ))
+    heat_fig.update_layout(
+        height=max(400, 18 * len(labels)),
+        xaxis_title="Lag k (sentiment on day t vs. cumulative return t+1…t+k; k<0: t+k…t−1)",
+        yaxis=dict(autorange="reversed")
+    )
+    st.plotly_chart(heat_fig, use_container_width=True)
+    if ticker in heatmap.index:
+        row = heatmap.loc[ticker].dropna()
+        if not row.empty:
+            best = row.abs().idxmax()
+            st.caption(f"{selected_name}: strongest {method} correlation at lag {best:+d} ({row[best]:+.2f}).")
+
 # === Standortkarte ===
 if "lat" in COMPANY_INFO[ticker] and "lon" in COMPANY_INFO[ticker]:
     st.subheader("Company Headquarters")
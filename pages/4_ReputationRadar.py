@@ -11,16 +11,10 @@ matplotlib.use("Agg")
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
-from config import DUMMY_FULL_SENTIMENT_FILE
+from modules.keyword_matcher import TAG_COLUMNS, keyword_tags, has_tags, esg_mask_for
+from utils.data_access import get_sentiment, get_date_bounds, get_tickers
 from utils.reputation_report_generator import generate_reputation_html
 
-# === ESG Keyword Definitions ===
-ESG_KEYWORDS = {
-    "E": ["sustainability", "emissions", "climate", "pollution", "greenwashing", "carbon"],
-    "S": ["diversity", "inclusion", "human rights", "labor", "health", "equality"],
-    "G": ["corruption", "bribery", "whistleblower", "audit", "compliance", "governance"]
-}
-
 # === Streamlit Page Setup ===
 st.set_page_config(page_title="🧠 EMOTECT | Reputation Radar", layout="wide")
 st.markdown("""
@@ -56,13 +50,11 @@ selected_esg = st.sidebar.multiselect(
     default=["E", "S", "G"]
 )
 
-# === Load Sentiment Data ===
-df = pd.read_csv(DUMMY_FULL_SENTIMENT_FILE, parse_dates=["date"])
-
-# === Zeitraumfilter über Sidebar ===
+# === Zeitraumfilter über Sidebar (nur Datumsspalte lesen) ===
 st.sidebar.markdown("### ⏳ Date Range Filter")
-min_date = df["date"].min().date()
-max_date = df["date"].max().date()
+min_ts, max_ts = get_date_bounds()
+min_date = min_ts.date()
+max_date = max_ts.date()
 start_date, end_date = st.sidebar.date_input(
     "Select date range:",
     value=(min_date, max_date),
@@ -71,39 +63,22 @@ start_date, end_date = st.sidebar.date_input(
 )
 
 # === Select Company ===
-selected_ticker = st.selectbox("Select Company", sorted(df["ticker"].unique()))
+ticker_options = get_tickers()
+selected_ticker = st.selectbox("Select Company", ticker_options)
 
 # === Anzeige der aktuell gewählten Zeitspanne ===
 st.markdown(f"🗓️ **Selected Time Period:** `{start_date}` → `{end_date}`")
 
-df_selected = df[df["ticker"] == selected_ticker].copy()
-df_selected = df_selected[
-    (df_selected["date"].dt.date >= start_date) & 
-    (df_selected["date"].dt.date <= end_date)
-]
+# === Gewählten Ticker & Zeitraum laden (gecacht pro Datenstand) ===
+df_selected = get_sentiment(tickers=[selected_ticker], start=pd.Timestamp(start_date), end=pd.Timestamp(end_date))
 df_selected["combined_text"] = df_selected["title"].fillna("") + " " + df_selected["description"].fillna("")
 
-# === ESG Match Function ===
-def matches_esg(text, categories):
-    text = text.lower()
-    for cat in categories:
-        if any(keyword in text for keyword in ESG_KEYWORDS[cat]):
-            return True
-    return False
-
-# === ESG Category Count Function ===
-def count_esg_categories(text):
-    text = text.lower()
-    counts = {"E": 0, "S": 0, "G": 0}
-    for cat, keywords in ESG_KEYWORDS.items():
-        counts[cat] = sum(1 for k in keywords if k in text)
-    return counts
-
-# === Apply ESG Filter and Breakdown ===
-df_esg_filtered = df_selected[df_selected["combined_text"].apply(lambda text: matches_esg(text, selected_esg))].copy()
-df_esg_filtered[["E_count", "S_count", "G_count"]] = df_esg_filtered["combined_text"].apply(
-    lambda text: pd.Series(count_esg_categories(text))
-)
+# === ESG-Filter über die Ingest-Tags (Altbestand ohne Tags: einmaliger Textscan) ===
+if not has_tags(df_selected):
+    df_selected[TAG_COLUMNS] = keyword_tags(df_selected)
+esg_mask = df_selected["esg_mask"].astype(int)
+df_esg_filtered = df_selected[(esg_mask & esg_mask_for(selected_esg)) > 0].copy()
+df_esg_filtered[["E_count", "S_count", "G_count"]] = df_esg_filtered[["esg_e", "esg_s", "esg_g"]].astype(int).to_numpy()
 
 # === Display ESG Article Count ===
 st.metric("📄 ESG-relevant Articles", len(df_esg_filtered))
@@ -123,7 +98,8 @@ else:
 # === Source Diversity ===
 st.markdown("#### 📡 Source Diversity (ESG-filtered)")
 if not df_esg_filtered.empty:
-    source_counts = df_esg_filtered["source"].value_counts().reset_index()
+    source_counts = df_esg_filtered["source"].value_counts()
+    source_counts = source_counts[source_counts > 0].reset_index()
     source_counts.columns = ["Source", "Count"]
     fig_sources = px.bar(source_counts, x="Source", y="Count", title="Sources of ESG-Filtered Articles")
     st.plotly_chart(fig_sources, use_container_width=True)
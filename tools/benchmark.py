@@ -0,0 +1,324 @@
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+
+# === Projektstruktur einbinden ===
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import BENCHMARK_HISTORY_FILE, BENCHMARK_BASELINE_FILE
+from dummy_modules.synthetic_data import load_vocabulary, make_tickers, make_bursts, generate_block
+from modules import article_store, url_index
+from modules.scoring_engine import score_texts
+from modules.z_score_engine import daily_means, to_legacy_frame
+from modules.rolling_stats import z_score_panel
+from modules.keyword_matcher import RISK_MATCHER, ESG_MATCHER
+from modules.daily_cube import DailyCube, build_cube
+
+# === End-to-End-Benchmark aller Pipeline-Stufen auf synthetischen Daten ===
+# Je Stufe und Datenmenge: beste Laufzeit aus `repeat` Läufen (perf_counter) und, in einem eigenen
+# Lauf unter tracemalloc, der Spitzen-Speicher der Python-/NumPy-Allokationen (SQLite/Arrow intern
+# werden nicht erfasst). Jeder Lauf wird als eine JSON-Zeile an die Historie angehängt; `--compare`
+# prüft gegen eine gespeicherte Baseline und endet mit Exit-Code 1 bei Regressionen.
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+BENCH_TICKERS = 40          # DAX-Größenordnung
+BENCH_DAYS = 365
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.15    # +15 % Laufzeit bzw. Speicher gilt als Regression
+MIN_DELTA_SECONDS = 0.02    # kleinere Unterschiede sind Messrauschen
+MIN_DELTA_MB = 1.0
+EMOMOOD_RANGES = [1, 7, 14, 30]
+REPORT_TICKERS = 10
+
+
+# === Testdaten: bewertete Artikel aus dem synthetischen Generator (nur im Speicher) ===
+def synthetic_articles(n_articles, n_tickers=BENCH_TICKERS, n_days=BENCH_DAYS, seed=42):
+    """Rund `n_articles` Artikel (Poisson) für `n_tickers` Ticker über `n_days` Tage inkl. Krisen-Bursts."""
+    rng = np.random.default_rng(seed)
+    vocab = load_vocabulary()
+    tickers = make_tickers(n_tickers)
+    dates = pd.date_range(end=pd.Timestamp("today").normalize(), periods=n_days, freq="D")
+    rates = np.full(n_tickers, n_articles / (n_tickers * n_days))
+    moods = rng.normal(0.05, 0.15, n_tickers)
+    bursts = make_bursts(rng, tickers, n_days, max(1, n_tickers // 10), 5, 5.0, -0.6)
+    df = generate_block(rng, vocab, tickers, dates, rates, moods, bursts, 0, n_tickers, 0)
+    df["text"] = df["title"] + ". " + df["description"]
+    return df
+
+
+# === Stufen: setup(df, workdir) → parameterlose Funktion, deren Aufruf gemessen wird ===
+def _setup_news(df, workdir):
+    raw = df[["date", "ticker", "company_name", "title", "description", "url", "source"]].assign(
+        date=df["date"].dt.strftime("%Y-%m-%d")
+    )
+    batches = {ticker: part.to_dict(orient="records") for ticker, part in raw.groupby("ticker", sort=False)}
+
+    def run():
+        # Neuer Speicher je Lauf; zweiter Durchgang besteht nur aus Dubletten
+        with tempfile.TemporaryDirectory(dir=workdir) as store:
+            index = url_index.UrlIndex(Path(store) / article_store.URL_INDEX_NAME)
+            try:
+                for _ in range(2):
+                    for ticker, articles in batches.items():
+                        article_store.append_articles(ticker, articles, base_dir=store, index=index)
+            finally:
+                index.close()
+    return run
+
+
+def _setup_vader(df, workdir, workers=None):
+    texts = df["text"]
+    return lambda: score_texts(texts, workers=workers, backend="vader")
+
+
+def _setup_numpy_vader(df, workdir):
+    texts = df["text"]
+    return lambda: score_texts(texts, backend="numpy")
+
+
+def _setup_z_scores(df, workdir):
+    scored = df[["date", "ticker", "sentiment_score"]]
+    return lambda: z_score_panel(daily_means(scored))
+
+
+def _setup_volcano(df, workdir):
+    title, description = df["title"], df["description"]
+    return lambda: RISK_MATCHER.count_distinct(title) + RISK_MATCHER.count_distinct(description)
+
+
+def _setup_esg(df, workdir):
+    texts = df["title"] + " " + df["description"]
+    return lambda: ESG_MATCHER.group_counts(texts)
+
+
+def _setup_emomood(df, workdir):
+    def run():
+        # Würfel bauen und die Fenster der EmoMood-Seite (aktueller + vorheriger Zeitraum) abfragen
+        cube = DailyCube(build_cube(df))
+        for days in EMOMOOD_RANGES:
+            end = cube.max_date
+            start = end - pd.Timedelta(days=days)
+            cube.window(start, end)
+            cube.window(start - pd.Timedelta(days=days), start - pd.Timedelta(days=1))
+    return run
+
+
+def _setup_report(df, workdir):
+    import streamlit.config
+    import streamlit.logger
+    from utils.zscore_report_generator import generate_zscore_report_html
+
+    # Außerhalb von `streamlit run` warnt Streamlit bei jedem Widget-Aufruf; Konfiguration zuerst laden,
+    # sonst setzt sie den Log-Level beim ersten Aufruf zurück
+    streamlit.config.get_option("logger.level")
+    streamlit.logger.set_log_level("error")
+
+    legacy = to_legacy_frame(z_score_panel(daily_means(df[["date", "ticker", "sentiment_score"]])))
+    tickers = legacy["ticker"].value_counts().index[:REPORT_TICKERS]
+    frames = {
+        ticker: part.rename(columns={"mean_sentiment": "sentiment_score", "rolling_mean": "mean"})
+        for ticker, part in legacy[legacy["ticker"].isin(tickers)].groupby("ticker")
+    }
+
+    def run():
+        for ticker, df_daily in frames.items():
+            generate_zscore_report_html(ticker, df_daily, company_name=ticker)
+    return run
+
+
+STAGES = {
+    "news_save_dedup": _setup_news,
+    "vader_scoring": _setup_vader,
+    "numpy_scoring": _setup_numpy_vader,
+    "z_score_rolling": _setup_z_scores,
+    "volcano_keywords": _setup_volcano,
+    "esg_tagging": _setup_esg,
+    "emomood_window": _setup_emomood,
+    "report_render": _setup_report
+}
+
+
+# === Messung ===
+def measure(run, repeat=DEFAULT_REPEAT, memory=True):
+    """(Laufzeiten aller Wiederholungen, Spitzen-Speicher in MB oder None)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        # Eigener Lauf: tracemalloc verlangsamt Python-Code deutlich und würde die Zeiten verfälschen
+        tracemalloc.start()
+        try:
+            run()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return timings, peak_mb
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, stages=None, repeat=DEFAULT_REPEAT, memory=True, workers=None):
+    stages = stages or list(STAGES)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="emotect_bench_") as workdir:
+        for size in sizes:
+            df = synthetic_articles(size)
+            print(f"📦 {len(df):,} Artikel ({size:,} angefragt)")
+            for stage in stages:
+                setup = STAGES[stage]
+                run = setup(df, workdir, workers) if stage == "vader_scoring" else setup(df, workdir)
+                timings, peak_mb = measure(run, repeat, memory)
+                best = min(timings)
+                results.append({
+                    "stage": stage,
+                    "size": size,
+                    "articles": len(df),
+                    "seconds": best,
+                    "mean_seconds": float(np.mean(timings)),
+                    "articles_per_second": len(df) / best if best > 0 else None,
+                    "peak_mb": peak_mb
+                })
+                memory_note = f", Peak {peak_mb:,.1f} MB" if peak_mb is not None else ""
+                print(f"   {stage:<18} {best:9.3f}s  ({len(df) / best:,.0f} Artikel/s{memory_note})")
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent.parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_record(results, repeat):
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results
+    }
+
+
+# === Historie & Baseline ===
+def append_history(record, history_file=BENCHMARK_HISTORY_FILE):
+    history_file = Path(history_file)
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_history(history_file=BENCHMARK_HISTORY_FILE):
+    history_file = Path(history_file)
+    if not history_file.exists():
+        return []
+    with open(history_file, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_baseline(record, baseline_file=BENCHMARK_BASELINE_FILE):
+    baseline_file = Path(baseline_file)
+    baseline_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(baseline_file, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+
+
+def load_baseline(baseline_file=BENCHMARK_BASELINE_FILE):
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(record, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Vergleich je (Stufe, Größe) mit der Baseline; `regression` markiert Ausreißer bei Zeit oder Speicher."""
+    base = {(r["stage"], r["size"]): r for r in baseline["results"]}
+    rows = []
+    for current in record["results"]:
+        reference = base.get((current["stage"], current["size"]))
+        if reference is None:
+            continue
+        time_ratio = current["seconds"] / reference["seconds"] if reference["seconds"] > 0 else np.nan
+        slower = (time_ratio > 1 + tolerance) and (current["seconds"] - reference["seconds"] > MIN_DELTA_SECONDS)
+
+        mem_ratio, larger = np.nan, False
+        if current.get("peak_mb") is not None and reference.get("peak_mb"):
+            mem_ratio = current["peak_mb"] / reference["peak_mb"]
+            larger = (mem_ratio > 1 + tolerance) and (current["peak_mb"] - reference["peak_mb"] > MIN_DELTA_MB)
+        rows.append({
+            "stage": current["stage"],
+            "size": current["size"],
+            "seconds": current["seconds"],
+            "baseline_seconds": reference["seconds"],
+            "time_ratio": time_ratio,
+            "peak_mb": current.get("peak_mb"),
+            "baseline_peak_mb": reference.get("peak_mb"),
+            "memory_ratio": mem_ratio,
+            "regression": bool(slower or larger)
+        })
+    return pd.DataFrame(rows)
+
+
+def main(sizes=DEFAULT_SIZES, stages=None, repeat=DEFAULT_REPEAT, memory=True, workers=None,
+         history_file=BENCHMARK_HISTORY_FILE, baseline_file=BENCHMARK_BASELINE_FILE,
+         compare_baseline=False, update_baseline=False, tolerance=DEFAULT_TOLERANCE):
+    results = run_benchmarks(sizes, stages, repeat, memory, workers)
+    record = make_record(results, repeat)
+    append_history(record, history_file)
+    print(f"✅ {len(results)} Messungen an die Historie angehängt → {history_file}")
+
+    exit_code = 0
+    if compare_baseline:
+        if not Path(baseline_file).exists():
+            print(f"⚠️ Keine Baseline unter {baseline_file} – Vergleich übersprungen.")
+        else:
+            baseline = load_baseline(baseline_file)
+            table = compare(record, baseline, tolerance)
+            print(f"📊 Vergleich mit Baseline {baseline.get('commit') or ''} ({baseline['timestamp']}), "
+                  f"Toleranz {tolerance:.0%}:")
+            print(table.to_string(index=False, float_format=lambda v: f"{v:.3f}") if not table.empty
+                  else "   (keine gemeinsamen Messungen)")
+            regressions = table[table["regression"]] if not table.empty else table
+            if len(regressions):
+                print(f"❌ {len(regressions)} Regression(en): "
+                      + ", ".join(f"{r.stage}@{r.size:,}" for r in regressions.itertuples()))
+                exit_code = 1
+            else:
+                print("✅ Keine Regressionen.")
+
+    if update_baseline:
+        save_baseline(record, baseline_file)
+        print(f"📌 Baseline aktualisiert → {baseline_file}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Laufzeit & Spitzen-Speicher aller Pipeline-Stufen auf synthetischen Daten")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Artikelanzahlen")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), help="Nur diese Stufen messen")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Wiederholungen je Messung (beste zählt)")
+    parser.add_argument("--no-memory", action="store_true", help="Spitzen-Speicher nicht messen")
+    parser.add_argument("--workers", type=int, help="Prozesse für das VADER-Scoring (Standard: alle Kerne)")
+    parser.add_argument("--history", type=Path, default=BENCHMARK_HISTORY_FILE, help="JSON-Lines-Historie")
+    parser.add_argument("--baseline", type=Path, default=BENCHMARK_BASELINE_FILE, help="Baseline-Datei")
+    parser.add_argument("--compare", action="store_true", help="Gegen die Baseline vergleichen (Exit-Code 1 bei Regression)")
+    parser.add_argument("--save-baseline", action="store_true", help="Diesen Lauf als neue Baseline speichern")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Erlaubte relative Verschlechterung")
+    args = parser.parse_args()
+    sys.exit(main(sizes=args.sizes, stages=args.stages, repeat=args.repeat, memory=not args.no_memory,
+                  workers=args.workers, history_file=args.history, baseline_file=args.baseline,
+                  compare_baseline=args.compare, update_baseline=args.save_baseline, tolerance=args.tolerance))
@@ -0,0 +1,178 @@
+import os
+import sys
+import pandas as pd
+import streamlit as st
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    DUMMY_SENTIMENT_DATASET_DIR,
+    DUMMY_FULL_SENTIMENT_FILE,
+    DUMMY_DAILY_CUBE_DATASET_DIR,
+    DUMMY_Z_SCORE_DATASET_DIR,
+    PRICE_MATRIX_DIR,
+    DUMMY_LEAD_LAG_SUMMARY_FILE
+)
+from modules.processed_store import read_sentiment, read_date_bounds, list_tickers, read_cube, read_z_scores
+from modules.daily_cube import DailyCube, build_cube
+from modules.price_matrix import PriceMatrix
+from modules.rolling_stats import z_score_panel
+from modules.keyword_matcher import TAG_COLUMNS
+
+# === Gemeinsamer, gecachter Datenzugriff für alle Streamlit-Seiten ===
+# Jede Abfrage (Ticker, Zeitraum, Spalten) wird einmal pro Datenstand geladen; der Datenstand ist
+# ein Fingerabdruck aus Dateianzahl, Größe und mtime des Datasets bzw. der Fallback-CSV.
+# Widget-Interaktionen treffen danach nur noch den Cache statt Parquet/CSV neu zu parsen.
+
+CATEGORICAL_COLUMNS = ["ticker", "source"]
+MAX_CACHED_QUERIES = 32
+
+# Copy-on-Write: flache Kopien teilen sich die Puffer mit dem Cache; erst ein Schreibzugriff
+# einer Seite erzeugt eine eigene Kopie (ab pandas 3 immer aktiv)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def data_version(dataset_dir=DUMMY_SENTIMENT_DATASET_DIR, fallback_csv=DUMMY_FULL_SENTIMENT_FILE):
+    """Fingerabdruck des aktuellen Datenstands, ohne Daten zu lesen."""
+    dataset_dir = Path(dataset_dir)
+    if dataset_dir.exists():
+        files = size = latest = 0
+        for root, _, names in os.walk(dataset_dir):
+            for name in names:
+                stat = os.stat(os.path.join(root, name))
+                files += 1
+                size += stat.st_size
+                latest = max(latest, stat.st_mtime_ns)
+        return ("dataset", files, size, latest)
+    if fallback_csv is not None and Path(fallback_csv).exists():
+        stat = os.stat(fallback_csv)
+        return ("csv", stat.st_size, stat.st_mtime_ns)
+    return ("missing",)
+
+
+def data_available(dataset_dir=DUMMY_SENTIMENT_DATASET_DIR, fallback_csv=DUMMY_FULL_SENTIMENT_FILE):
+    return data_version(dataset_dir, fallback_csv) != ("missing",)
+
+
+@st.cache_resource(max_entries=MAX_CACHED_QUERIES, show_spinner=False)
+def _load_sentiment(dataset_dir, fallback_csv, version, tickers, start, end, columns):
+    df = read_sentiment(
+        tickers=list(tickers) if tickers is not None else None,
+        start=start, end=end,
+        columns=list(columns) if columns is not None else None,
+        dataset_dir=dataset_dir,
+        fallback_csv=fallback_csv
+    )
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    if "sentiment_score" in df.columns:
+        df["sentiment_score"] = pd.to_numeric(df["sentiment_score"], errors="coerce")
+    return df
+
+
+def get_sentiment(tickers=None, start=None, end=None, columns=None,
+                  dataset_dir=DUMMY_SENTIMENT_DATASET_DIR, fallback_csv=DUMMY_FULL_SENTIMENT_FILE):
+    """Gecachte Variante von `read_sentiment`; liefert eine schreibgeschützte Sicht (flache CoW-Kopie)."""
+    df = _load_sentiment(
+        str(dataset_dir),
+        str(fallback_csv) if fallback_csv is not None else None,
+        data_version(dataset_dir, fallback_csv),
+        tuple(str(t) for t in tickers) if tickers is not None else None,
+        pd.Timestamp(start) if start is not None else None,
+        pd.Timestamp(end) if end is not None else None,
+        tuple(columns) if columns is not None else None
+    )
+    return df.copy(deep=False)
+
+
+@st.cache_data(max_entries=MAX_CACHED_QUERIES, show_spinner=False)
+def _load_date_bounds(dataset_dir, fallback_csv, version):
+    return read_date_bounds(dataset_dir, fallback_csv=fallback_csv)
+
+
+def get_date_bounds(dataset_dir=DUMMY_SENTIMENT_DATASET_DIR, fallback_csv=DUMMY_FULL_SENTIMENT_FILE):
+    return _load_date_bounds(str(dataset_dir), str(fallback_csv), data_version(dataset_dir, fallback_csv))
+
+
+@st.cache_data(max_entries=MAX_CACHED_QUERIES, show_spinner=False)
+def _load_tickers(dataset_dir, fallback_csv, version):
+    if Path(dataset_dir).exists():
+        return list_tickers(dataset_dir)
+    df = read_sentiment(columns=["ticker"], dataset_dir=dataset_dir, fallback_csv=fallback_csv)
+    return sorted(df["ticker"].astype(str).unique())
+
+
+def get_tickers(dataset_dir=DUMMY_SENTIMENT_DATASET_DIR, fallback_csv=DUMMY_FULL_SENTIMENT_FILE):
+    return _load_tickers(str(dataset_dir), str(fallback_csv), data_version(dataset_dir, fallback_csv))
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_cube(cube_dir, dataset_dir, fallback_csv, version):
+    if Path(cube_dir).exists():
+        return DailyCube(read_cube(dataset_dir=cube_dir))
+    # Noch kein materialisierter Würfel → einmalig aus den Artikeln aggregieren
+    df = read_sentiment(
+        columns=["date", "ticker", "title", "description", "sentiment_score"] + TAG_COLUMNS,
+        dataset_dir=dataset_dir, fallback_csv=fallback_csv
+    )
+    return DailyCube(build_cube(df))
+
+
+def get_cube(cube_dir=DUMMY_DAILY_CUBE_DATASET_DIR, dataset_dir=DUMMY_SENTIMENT_DATASET_DIR,
+             fallback_csv=DUMMY_FULL_SENTIMENT_FILE):
+    """Tages-Würfel (Ticker × Tag), einmal pro Datenstand geladen; nur lesend verwenden."""
+    version = (data_version(cube_dir, None), data_version(dataset_dir, fallback_csv))
+    return _load_cube(str(cube_dir), str(dataset_dir), str(fallback_csv), version)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_z_scores(z_dir, cube_dir, dataset_dir, fallback_csv, version):
+    if Path(z_dir).exists():
+        return read_z_scores(dataset_dir=z_dir)
+    # Kein Z-Score-Dataset → alle Fenster einmalig aus den Tagesmitteln des Würfels berechnen
+    daily = _load_cube(cube_dir, dataset_dir, fallback_csv, version[1:]).frame()
+    daily = daily.rename(columns={"sentiment_mean": "mean_sentiment", "article_count": "count"})
+    return z_score_panel(daily[["ticker", "date", "mean_sentiment", "count"]])
+
+
+def get_z_scores(tickers=None, start=None, end=None, z_dir=DUMMY_Z_SCORE_DATASET_DIR,
+                 cube_dir=DUMMY_DAILY_CUBE_DATASET_DIR, dataset_dir=DUMMY_SENTIMENT_DATASET_DIR,
+                 fallback_csv=DUMMY_FULL_SENTIMENT_FILE):
+    """Z-Scores aller Rolling-Fenster (Spalten z_score_{w}), einmal pro Datenstand geladen."""
+    version = (data_version(z_dir, None), data_version(cube_dir, None), data_version(dataset_dir, fallback_csv))
+    df = _load_z_scores(str(z_dir), str(cube_dir), str(dataset_dir), str(fallback_csv), version)
+    mask = pd.Series(True, index=df.index)
+    if tickers is not None:
+        mask &= df["ticker"].astype(str).isin([str(t) for t in tickers])
+    if start is not None:
+        mask &= df["date"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df["date"] <= pd.Timestamp(end)
+    return df[mask].reset_index(drop=True)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_price_matrix(matrix_dir, version):
+    return PriceMatrix(matrix_dir)
+
+
+def get_price_matrix(matrix_dir=PRICE_MATRIX_DIR):
+    """Memory-mapped Kursmatrix (None, falls noch nicht gebaut); Slices sind Views ohne Kopie."""
+    if not PriceMatrix.exists(matrix_dir):
+        return None
+    return _load_price_matrix(str(matrix_dir), data_version(matrix_dir, None))
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _load_lead_lag_summary(summary_file, version):
+    return pd.read_csv(summary_file, dtype={"ticker": str})
+
+
+def get_lead_lag_summary(summary_file=DUMMY_LEAD_LAG_SUMMARY_FILE):
+    """Lead/Lag-Matrix (ticker, lag, pearson, spearman, n) aus `lead_lag.py`; None, falls nicht berechnet."""
+    if not Path(summary_file).exists():
+        return None
+    stat = os.stat(summary_file)
+    return _load_lead_lag_summary(str(summary_file), (stat.st_size, stat.st_mtime_ns))
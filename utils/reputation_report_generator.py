@@ -6,25 +6,16 @@ from pathlib import Path
 import tempfile
 from datetime import datetime
 from utils.html_export_utils import offer_html_download
+from modules.keyword_matcher import ESG_BITS, keyword_tags, has_tags
 
-# === ESG Schlüsselwörter ===
-ESG_KEYWORDS = {
-    "E": ["sustainability", "emissions", "climate", "pollution", "greenwashing", "carbon"],
-    "S": ["diversity", "inclusion", "human rights", "labor", "health", "equality"],
-    "G": ["corruption", "bribery", "whistleblower", "audit", "compliance", "governance"]
-}
-
-def matches_esg_category(text):
-    matches = []
-    lower = text.lower()
-    for cat, words in ESG_KEYWORDS.items():
-        if any(word in lower for word in words):
-            matches.append(cat)
-    return matches
+def matches_esg_category(df):
+    # Liste der getroffenen ESG-Kategorien je Artikel aus der Bitmaske (E=1, S=2, G=4)
+    masks = df["esg_mask"] if has_tags(df) else keyword_tags(df)["esg_mask"]
+    return [[cat for cat, bit in ESG_BITS.items() if mask & bit] for mask in masks.astype(int)]
 
 def generate_reputation_html(ticker, df_filtered, start_date, end_date):
     df_filtered = df_filtered.copy()
-    df_filtered["esg_tags"] = df_filtered["combined_text"].apply(matches_esg_category)
+    df_filtered["esg_tags"] = matches_esg_category(df_filtered)
 
     # === Wordcloud ===
     wc_text = " ".join(df_filtered["combined_text"].fillna(""))